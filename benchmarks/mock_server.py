@@ -0,0 +1,194 @@
+"""
+Local stand-in for SmartScout and Kalodata, serving the fixtures in mock_site/.
+
+    python -m benchmarks.mock_server --port 8765 --latency 0.2
+
+SmartScout lives at ``/`` (point SMARTSCOUT_BASE_URL at the server) and Kalodata
+at ``/kalodata`` (KALODATA_BASE_URL=<server>/kalodata). ``--latency`` delays every
+data request and export, standing in for the real backend. The data API used by
+the HTTP export engine is mocked under ``/api`` as well.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_site")
+
+# path -> (fixture, session cookie required or None, login page to redirect to)
+PAGES = {
+    "/sessions/signin": ("signin.html", None, None),
+    "/app/home": ("home.html", "mock_session", "/sessions/signin"),
+    "/app/subcategories": ("subcategories.html", "mock_session", "/sessions/signin"),
+    "/app/rank-maker": ("rank_maker.html", "mock_session", "/sessions/signin"),
+    "/app/products": ("products.html", "mock_session", "/sessions/signin"),
+    "/kalodata/login": ("kalodata_login.html", None, None),
+    "/kalodata/product": ("kalodata_product.html", "kalo_session", "/kalodata/login"),
+}
+
+# Same paths as scrapers/smartscout/http_export.API_ROUTES
+API_TOOLS = {
+    "/api/subcategories/niche-finder": "niche_finder",
+    "/api/keyword-tools/rank-maker": "rank_maker",
+    "/api/market-research/products": "product_search",
+}
+
+# 1x1 transparent GIF, good enough for the excel/csv icons
+PIXEL = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+
+# SmartScout tool -> (data API field, header of the site's CSV export) per column
+TOOL_COLUMNS = {
+    "niche_finder": [("subcategoryName", "Subcategory"), ("totalRevenue", "Total Revenue"), ("avgPrice", "Avg. Price")],
+    "rank_maker": [("keyword", "Keyword"), ("latestRank", "Latest Rank"), ("searchVolume", "Search Volume")],
+    "product_search": [("asin", "ASIN"), ("title", "Title"), ("mainCategoryRank", "Main Category Rank"),
+                       ("monthlyRevenue", "Monthly Revenue")],
+}
+
+
+def make_rows(tool: str, query: str, max_rank=None, count: int = 50) -> list:
+    """Deterministic fake rows for a tool/query, keyed by data API field."""
+    limit = int(max_rank) if max_rank not in (None, "") else count
+    if tool in TOOL_COLUMNS:
+        rows = []
+        for i in range(min(count, limit)):
+            values = {
+                "subcategoryName": f"{query or 'niche'} {i + 1}",
+                "totalRevenue": round(50000 - i * 731.5, 2),
+                "avgPrice": round(19.99 + i, 2),
+                "keyword": f"{query or 'item'} keyword {i + 1}",
+                "latestRank": i + 1,
+                "searchVolume": 5000 - i * 10,
+                "asin": f"B0MOCK{i:04d}",
+                "title": f"{query or 'item'} #{i + 1}",
+                "mainCategoryRank": i + 1,
+                "monthlyRevenue": round(1000 + i * 137.5, 2),
+            }
+            rows.append({field: values[field] for field, _ in TOOL_COLUMNS[tool]})
+        return rows
+    return [
+        {
+            "tool": tool,
+            "query": query,
+            "rank": i + 1,
+            "asin": f"B0MOCK{i:04d}",
+            "title": f"{query or 'item'} #{i + 1}",
+            "monthly_revenue": round(1000 + i * 137.5, 2),
+        }
+        for i in range(min(count, limit))
+    ]
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    row_count = 50
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path in PAGES:
+            fixture, cookie, login_page = PAGES[url.path]
+            if cookie and cookie not in self._cookies():
+                return self._redirect(login_page)
+            return self._send_file(fixture, "text/html; charset=utf-8")
+        if url.path == "/mock.js":
+            return self._send_file("mock.js", "application/javascript")
+        if url.path.startswith("/assets/"):
+            return self._send(200, PIXEL, "image/gif")
+        if url.path == "/api/rows":
+            time.sleep(self.latency)
+            rows = make_rows(params.get("tool", ""), params.get("q", ""), params.get("max_rank"), self.row_count)
+            return self._send(200, json.dumps(rows).encode(), "application/json")
+        if url.path == "/export.csv":
+            time.sleep(self.latency)
+            rows = make_rows(params.get("tool", ""), params.get("q", ""), params.get("max_rank"), self.row_count)
+            return self._send(200, _to_csv(rows, params.get("tool", "")), "text/csv", {
+                "Content-Disposition": f'attachment; filename="{params.get("tool", "export")}_export.csv"'
+            })
+        self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in API_TOOLS:
+            return self._send(404, b"not found", "text/plain")
+        if "mock_session" not in self._cookies():
+            return self._send(401, b"{}", "application/json")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency)
+        query = body.get("asin") or body.get("keywords") or json.dumps(body.get("filter", {}))
+        rows = make_rows(API_TOOLS[url.path], query, count=self.row_count)
+        page, size = body.get("page", 0), body.get("pageSize", len(rows))
+        self._send(200, json.dumps({"data": rows[page * size:(page + 1) * size]}).encode(), "application/json")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _cookies(self) -> dict:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return {k: m.value for k, m in cookie.items()}
+
+    def _redirect(self, location: str):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.end_headers()
+
+    def _send_file(self, name: str, content_type: str):
+        with open(os.path.join(SITE_DIR, name), "rb") as f:
+            self._send(200, f.read(), content_type)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _to_csv(rows: list, tool: str = "") -> bytes:
+    """CSV export as the site produces it: SmartScout tools use their UI column headers."""
+    headers = dict(TOOL_COLUMNS.get(tool, ()))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fields = list(rows[0]) if rows else [field for field, _ in TOOL_COLUMNS.get(tool, [("rank", "rank")])]
+    writer.writerow([headers.get(field, field) for field in fields])
+    writer.writerows([row[field] for field in fields] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def start_mock_server(port: int = 0, latency: float = 0.0, row_count: int = 50):
+    """Serve the mock site from a background thread; returns (server, base_url)."""
+    handler = type("Handler", (MockSiteHandler,), {"latency": latency, "row_count": row_count})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, name="mock-site", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mock SmartScout/Kalodata site")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to data requests and exports")
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.port, args.latency, args.rows)
+    print(f"Mock SmartScout: {base_url}   Mock Kalodata: {base_url}/kalodata")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
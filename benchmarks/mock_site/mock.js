@@ -0,0 +1,50 @@
+// Shared behaviour of the mock SmartScout/Kalodata pages: fake ag-grid loading,
+// panels that open on click, and CSV exports served as attachments.
+function show(id) { document.getElementById(id).hidden = false; }
+function toggle(id) { var el = document.getElementById(id); el.hidden = !el.hidden; }
+
+var gridState = {};
+
+function loadGrid(params) {
+    Object.assign(gridState, params || {});
+    var host = document.getElementById('grid-host');
+    host.innerHTML =
+        '<div class="ag-root-wrapper"><div class="ag-overlay-loading-wrapper">Loading...</div>' +
+        '<div class="ag-center-cols-container"></div></div>';
+    var query = new URLSearchParams(gridState).toString();
+    return fetch('/api/rows?' + query)
+        .then(function (r) { return r.json(); })
+        .then(function (rows) {
+            var wrapper = host.querySelector('.ag-root-wrapper');
+            wrapper.querySelector('.ag-overlay-loading-wrapper').remove();
+            var body = wrapper.querySelector('.ag-center-cols-container');
+            rows.forEach(function (row, i) {
+                var el = document.createElement('div');
+                el.className = 'ag-row';
+                el.setAttribute('row-index', i);
+                el.textContent = Object.values(row).join(' | ');
+                body.appendChild(el);
+            });
+        });
+}
+
+var debounceTimer = null;
+function debouncedLoad(params) {
+    clearTimeout(debounceTimer);
+    debounceTimer = setTimeout(function () { loadGrid(params); }, 300);
+}
+
+function download(tool) {
+    var a = document.createElement('a');
+    a.href = '/export.csv?' + new URLSearchParams(Object.assign({ tool: tool }, gridState)).toString();
+    a.download = '';
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+}
+
+function login(cookie, next) {
+    document.cookie = cookie + '=1; path=/; max-age=86400';
+    setTimeout(function () { location.href = next; }, 100);
+    return false;
+}
@@ -0,0 +1,161 @@
+"""
+Offline end-to-end benchmark of the scraper workflows against the local mock site.
+
+    python -m benchmarks.offline --runs 5 --latency 0.2
+    python -m benchmarks.offline --json results.json
+    python -m benchmarks.offline --baseline results.json   # show deltas vs an earlier run
+
+Runs run_niche_finder_export, run_keyword_tools_export, run_product_search_export and
+the Kalodata login + click_category_and_simple flow against benchmarks/mock_server.py
+with real headless Chrome. The first run of each flow is "cold" (browser launch and
+login included); later runs reuse the pooled browser. Reports end-to-end latency and
+the median time of every numbered step.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import start_mock_server
+
+USERNAME = "bench@example.com"
+PASSWORD = "bench"
+
+
+def configure(base_url: str, workdir: str):
+    """Point the scrapers at the mock site; must run before they are imported."""
+    os.environ["SMARTSCOUT_BASE_URL"] = base_url
+    os.environ["KALODATA_BASE_URL"] = f"{base_url}/kalodata"
+    os.environ["SMARTSCOUT_SESSIONS_DIR"] = os.path.join(workdir, "sessions")
+    os.environ.setdefault("SMARTSCOUT_EXPORT_ENGINE", "browser")
+
+
+def build_flows(download_path: str) -> dict:
+    from scrapers.smartscout.scrapers.niche_finder import run_niche_finder_export
+    from scrapers.smartscout.scrapers.rank_maker import run_keyword_tools_export
+    from scrapers.smartscout.scrapers.product_search import run_product_search_export
+    from scrapers.kalodata.auth import checkout_kalodata_driver, checkin_kalodata_driver
+    from scrapers.kalodata.scrapers.scraper1 import click_category_and_simple
+
+    def kalodata():
+        driver = checkout_kalodata_driver(USERNAME, PASSWORD, headless=True)
+        try:
+            return click_category_and_simple(driver, 10, 0.2)
+        finally:
+            checkin_kalodata_driver(driver)
+
+    return {
+        "niche_finder": lambda: run_niche_finder_export("kitchen", USERNAME, PASSWORD, download_path=download_path),
+        "rank_maker": lambda: run_keyword_tools_export("B0MOCK0001", USERNAME, PASSWORD, download_path=download_path, max_rank=65),
+        "product_search": lambda: run_product_search_export("garlic press", USERNAME, PASSWORD, max_rank=1000, download_path=download_path),
+        "kalodata": kalodata,
+    }
+
+
+def timed_run(flow) -> dict:
+    """Run one flow and split its wall time by step (time before the first step is "setup")."""
+    from scrapers.metrics import step_label
+    from scrapers.steps import track_steps
+
+    marks = []
+    started = time.time()
+    with track_steps(lambda message: marks.append((step_label(message), time.time()))):
+        flow()
+    finished = time.time()
+
+    steps = {"setup": (marks[0][1] if marks else finished) - started}
+    for i, (label, at) in enumerate(marks):
+        end = marks[i + 1][1] if i + 1 < len(marks) else finished
+        if label:
+            steps[label] = steps.get(label, 0) + end - at
+    return {"total": finished - started, "steps": steps}
+
+
+def summarize(runs: list) -> dict:
+    warm = runs[1:] or runs
+    totals = [r["total"] for r in warm]
+    labels = []
+    for r in runs:
+        labels += [label for label in r["steps"] if label not in labels]
+    return {
+        "cold_s": round(runs[0]["total"], 3),
+        "warm_median_s": round(statistics.median(totals), 3),
+        "warm_max_s": round(max(totals), 3),
+        "steps_median_s": {
+            label: round(statistics.median(r["steps"].get(label, 0) for r in warm), 3) for label in labels
+        },
+    }
+
+
+def print_report(results: dict, baseline: dict = None):
+    for name, summary in results.items():
+        old = (baseline or {}).get(name)
+        print(f"\n== {name} ==")
+        print(f"  cold {summary['cold_s']:.2f}s   warm median {summary['warm_median_s']:.2f}s"
+              f"   warm max {summary['warm_max_s']:.2f}s{_delta(summary['warm_median_s'], old and old['warm_median_s'])}")
+        for label, seconds in summary["steps_median_s"].items():
+            previous = old and old["steps_median_s"].get(label)
+            print(f"    {label:10} {seconds:7.3f}s{_delta(seconds, previous)}")
+
+
+def _delta(now, before) -> str:
+    if not before:
+        return ""
+    change = (now - before) / before
+    return f"   ({'+' if change >= 0 else ''}{change:.0%} vs baseline)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper workflows against a local mock site")
+    parser.add_argument("--runs", type=int, default=3, help="runs per flow (first one is cold)")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock backend latency in seconds")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--flow", action="append", help="only run these flows")
+    parser.add_argument("--json", help="write the summary to this file")
+    parser.add_argument("--baseline", help="compare against a summary written with --json")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="scraper_bench_")
+    server, base_url = start_mock_server(0, args.latency, args.rows)
+    configure(base_url, workdir)
+    print(f"Mock site at {base_url} (latency {args.latency}s)")
+
+    from scrapers.smartscout.auth import SMARTSCOUT_POOL
+    from scrapers.kalodata.auth import KALODATA_POOL
+
+    flows = build_flows(os.path.join(workdir, "downloads"))
+    results = {}
+    try:
+        for name, flow in flows.items():
+            if args.flow and name not in args.flow:
+                continue
+            runs = []
+            for n in range(args.runs):
+                run = timed_run(flow)
+                print(f"  {name} run {n + 1}: {run['total']:.2f}s")
+                runs.append(run)
+            results[name] = summarize(runs)
+    finally:
+        SMARTSCOUT_POOL.close()
+        KALODATA_POOL.close()
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Page-load benchmark with and without resource blocking.
+
+    python -m benchmarks.resource_blocking --runs 5
+    python -m benchmarks.resource_blocking --url smartscout=https://app.smartscout.com/sessions/signin
+
+Each URL is loaded ``--runs`` times in a fresh headless Chrome per mode (cache
+disabled), and the Navigation Timing load time, request count and transferred
+bytes are reported for the "off" and "on" runs.
+"""
+import argparse
+import statistics
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+load_dotenv()
+
+from scrapers import blocking
+from scrapers.chromedriver import get_chrome_service
+
+DEFAULT_URLS = [
+    ("smartscout", "https://app.smartscout.com/sessions/signin"),
+    ("kalodata", "https://www.kalodata.com/login"),
+    ("kalodata", "https://www.kalodata.com/product"),
+]
+
+PAGE_STATS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    load_ms: nav ? nav.loadEventEnd - nav.startTime : null,
+    dom_ready_ms: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+    requests: resources.length,
+    bytes: resources.reduce((sum, r) => sum + (r.transferSize || 0), 0)
+};
+"""
+
+
+def build_driver(site: str, blocked: bool):
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    if blocked:
+        blocking.apply_blocking_prefs(options, site)
+    driver = webdriver.Chrome(service=get_chrome_service(), options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    if blocked:
+        blocking.block_resources(driver, site)
+    return driver
+
+
+def measure(site: str, url: str, blocked: bool, runs: int) -> list:
+    driver = build_driver(site, blocked)
+    samples = []
+    try:
+        for _ in range(runs):
+            driver.get("about:blank")
+            driver.get(url)
+            samples.append(driver.execute_script(PAGE_STATS_JS))
+    finally:
+        driver.quit()
+    return samples
+
+
+def summarize(samples: list) -> dict:
+    loads = [s["load_ms"] for s in samples if s["load_ms"]]
+    return {
+        "load_ms_median": round(statistics.median(loads)) if loads else None,
+        "load_ms_mean": round(statistics.mean(loads)) if loads else None,
+        "requests": round(statistics.mean(s["requests"] for s in samples)),
+        "kb": round(statistics.mean(s["bytes"] for s in samples) / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare page-load time with resource blocking off and on")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--url", action="append", default=[], help="site=URL (site picks the blocking profile)")
+    args = parser.parse_args()
+
+    urls = [tuple(u.split("=", 1)) for u in args.url] or DEFAULT_URLS
+    blocking.BLOCKING_ENABLED = True
+
+    print(f"{'url':60} {'mode':4} {'median ms':>10} {'mean ms':>8} {'requests':>9} {'KB':>7}")
+    for site, url in urls:
+        results = {}
+        for mode, blocked in (("off", False), ("on", True)):
+            results[mode] = summarize(measure(site, url, blocked, args.runs))
+            r = results[mode]
+            print(f"{url[:60]:60} {mode:4} {r['load_ms_median']!s:>10} {r['load_ms_mean']!s:>8} {r['requests']:>9} {r['kb']:>7}")
+        off, on = results["off"]["load_ms_median"], results["on"]["load_ms_median"]
+        if off and on:
+            print(f"{'':60} {'Δ':4} {off - on:>10} ms faster ({(off - on) / off:.0%})")
+
+
+if __name__ == "__main__":
+    main()
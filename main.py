@@ -1,38 +1,180 @@
 import asyncio
 import os
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+import tempfile
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel
+from typing import List, Optional
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor
 
+# Load environment variables before the scrapers read their settings
+load_dotenv()
+
 # Selenium helpers for kalodata endpoint
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 # kalodata auth helper
-from scrapers.kalodata.auth import get_kalodata_driver
+from scrapers.kalodata.auth import checkout_kalodata_driver, checkin_kalodata_driver, KALODATA_POOL
 from scrapers.kalodata.scrapers.scraper1 import click_category_and_simple
 
 # Import scrapers
-from scrapers.smartscout.scrapers.niche_finder import run_niche_finder_export
-from scrapers.smartscout.scrapers.rank_maker import run_keyword_tools_export
-from scrapers.smartscout.scrapers.product_search import run_product_search_export
+from scrapers.tasks import TASKS
+from scrapers.taskqueue import RemoteRunner, open_queue
+from scrapers.artifacts import open_artifact_store
+from scrapers.smartscout.auth import warm_pool, SMARTSCOUT_POOL, SMARTSCOUT_TABS, TABS_PER_BROWSER, MAX_PARALLEL_JOBS, JOB_RSS_MB
+from scrapers.jobs import JobManager, QueueFullError
+from scrapers.admission import AdmissionController
+from scrapers.scheduler import FairScheduler, account_tenant, api_key_tenant, parse_weights, PRIORITIES
+from scrapers.cache import ResultCache, make_key, filter_by_rank
+from scrapers.history import HistoryStore
+from scrapers.prefetch import QueryTracker, Prefetcher, parse_window
+from scrapers.downloads import private_copy
+from scrapers.chromedriver import resolve_chromedriver_path
+from scrapers.metrics import bind_job_manager, REQUESTS
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
-# Load environment variables
-load_dotenv()
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DOWNLOADS_DIR = os.path.join(PROJECT_DIR, "downloads")
+
+# "local" runs scrapers in this process; "queue" hands them to worker.py processes
+# (on this or other nodes) through a durable task queue and shared artifact store
+JOB_BACKEND = os.getenv("JOB_BACKEND", "local")
+REMOTE_RUNNER = None
+if JOB_BACKEND == "queue":
+    REMOTE_RUNNER = RemoteRunner(
+        open_queue(os.getenv("TASK_QUEUE_URL", f"sqlite:///{PROJECT_DIR}/data/task_queue.db")),
+        open_artifact_store(os.getenv("ARTIFACT_STORE_URL", f"file://{PROJECT_DIR}/data/artifacts")),
+        DOWNLOADS_DIR,
+        timeout=int(os.getenv("REMOTE_TASK_TIMEOUT", "900")),
+    )
+
+# Browsers this node may run at once: SCRAPER_MAX_CONCURRENCY, further capped by
+# free memory, and per site by its own limit (its driver pool size by default).
+# With SmartScout tabs a job is a tab, so more of them fit per CPU and per MB. Never
+# below the 3 workers the API always had (small hosts): memory admission limits those
+MAX_CONCURRENCY = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "0")) or max(
+    3, (os.cpu_count() or 1) * max(1, TABS_PER_BROWSER)
+)
+REMOTE_MAX_IN_FLIGHT = int(os.getenv("REMOTE_MAX_IN_FLIGHT", "50"))
+SITE_LIMITS = {
+    "smartscout": int(os.getenv("SMARTSCOUT_MAX_CONCURRENCY", str(MAX_PARALLEL_JOBS))),
+    "kalodata": int(os.getenv("KALODATA_MAX_CONCURRENCY", str(KALODATA_POOL.size))),
+}
+if REMOTE_RUNNER is not None:
+    # SmartScout browsers run on the workers; here they only hold a waiting thread
+    SITE_LIMITS["smartscout"] = REMOTE_MAX_IN_FLIGHT
+ADMISSION = AdmissionController(
+    MAX_CONCURRENCY,
+    site_limits=SITE_LIMITS,
+    remote_sites=("smartscout",) if REMOTE_RUNNER is not None else (),
+    site_rss_mb={"smartscout": JOB_RSS_MB},
+)
+
+# Thread pool for browser work; the job manager keeps it within the admission limits
+SCRAPER_WORKERS = MAX_CONCURRENCY + (REMOTE_MAX_IN_FLIGHT if REMOTE_RUNNER is not None else 0)
+SCRAPER_EXECUTOR = ThreadPoolExecutor(max_workers=SCRAPER_WORKERS)
 
-# Create limited thread pool
-SCRAPER_EXECUTOR = ThreadPoolExecutor(max_workers=3)
+# Fair queuing across tenants (API key or SmartScout/Kalodata account) with optional
+# per-tenant weights, concurrency caps, queue share and rate limits
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "20"))
+SCHEDULER = FairScheduler(
+    weights=parse_weights(os.getenv("TENANT_WEIGHTS")),
+    max_running=int(os.getenv("TENANT_MAX_CONCURRENCY", "0")),
+    max_queued=int(os.getenv("TENANT_MAX_QUEUED", str(max(1, JOB_QUEUE_SIZE // 2)))),
+    rate_per_minute=float(os.getenv("TENANT_RATE_PER_MINUTE", "0")),
+    burst=int(os.getenv("TENANT_BURST", "10")),
+)
+
+# Bounded job queue in front of the executor; every browser job goes through it
+JOB_MANAGER = JobManager(
+    SCRAPER_EXECUTOR,
+    max_workers=SCRAPER_WORKERS,
+    max_queued=JOB_QUEUE_SIZE,
+    result_ttl=int(os.getenv("JOB_RESULT_TTL", "3600")),
+    admission=ADMISSION,
+    scheduler=SCHEDULER,
+)
+# Queue depth, active workers and per-job timings for /metrics
+bind_job_manager(JOB_MANAGER)
+
+# On-disk TTL cache of finished exports
+RESULT_CACHE = ResultCache(
+    os.getenv("RESULT_CACHE_DIR", os.path.join(DOWNLOADS_DIR, "cache")),
+    ttl=int(os.getenv("RESULT_CACHE_TTL", "900")),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_MB", "500")) * 1024 * 1024,
+)
+
+# Request counts per query, so the hottest ones can be refreshed before they expire
+QUERY_TRACKER = QueryTracker(half_life=float(os.getenv("PREFETCH_HALF_LIFE_HOURS", "6")) * 3600)
+
+# Every SmartScout export is also kept in a queryable history store ("" disables it)
+HISTORY_DB = os.getenv("HISTORY_DB", os.path.join(PROJECT_DIR, "data", "history.db"))
+HISTORY = HistoryStore(
+    HISTORY_DB,
+    retention_days=float(os.getenv("HISTORY_RETENTION_DAYS", "0")),
+) if HISTORY_DB else None
 
 app = FastAPI(title="Unified Scraper API")
 
+@app.on_event("startup")
+async def resolve_chromedriver():
+    """Resolve the chromedriver binary once so driver factories never hit webdriver-manager per job."""
+    try:
+        await asyncio.get_event_loop().run_in_executor(None, resolve_chromedriver_path)
+    except Exception as e:
+        print(f"⚠️ Could not resolve chromedriver at startup (will retry on first use): {e}")
+
+@app.on_event("startup")
+async def prewarm_driver_pools():
+    """Log pooled SmartScout drivers in ahead of the first request when credentials are configured."""
+    username = os.getenv("SMARTSCOUT_USERNAME")
+    password = os.getenv("SMARTSCOUT_PASSWORD")
+    warm_count = int(os.getenv("SMARTSCOUT_POOL_WARM", "1"))
+    # In queue mode SmartScout browsers live in the workers, not here
+    if username and password and warm_count > 0 and REMOTE_RUNNER is None:
+        # Run in the background so the API starts serving immediately
+        job = JOB_MANAGER.submit(
+            "smartscout/warm", warm_pool, username, password, warm_count,
+            cost=warm_count, tenant=account_tenant(username),
+        )
+        job.future.add_done_callback(_report_warm_failure)
+
+def _report_warm_failure(future):
+    if future.exception() is not None:
+        print(f"⚠️ Driver pool warm-up failed: {future.exception()}")
+
+@app.on_event("startup")
+async def start_prefetcher():
+    if PREFETCHER is not None:
+        PREFETCHER.start()
+
+@app.on_event("shutdown")
+async def close_driver_pools():
+    if PREFETCHER is not None:
+        PREFETCHER.stop()
+    SMARTSCOUT_POOL.close()
+    KALODATA_POOL.close()
+
 class ScrapeRequest(BaseModel):
     search_text: str
     username: str 
     password: str
     max_rank: int = 65  # Added optional max_rank
+    priority: Optional[str] = None  # "interactive" or "bulk"; default depends on the endpoint
+    delta: bool = False  # only rows added/removed/changed since the previous export of this query
+
+
+class BatchScrapeRequest(BaseModel):
+    search_texts: List[str]
+    username: str
+    password: str
+    max_rank: int = 65
+    output: str = "zip"  # "zip" (one CSV per input) or "csv" (merged)
+    workers: Optional[int] = None  # parallel browsers; default sized from CPU/RAM
+    priority: Optional[str] = None
 
 
 class KalodataRequest(BaseModel):
@@ -41,6 +183,7 @@ class KalodataRequest(BaseModel):
     headless: bool = True
     wait_timeout: int = 20
     click_delay: float = 0.5
+    priority: Optional[str] = None
 
 def cleanup_file(file_path: str):
     """Delete file after it's been sent"""
@@ -51,93 +194,459 @@ def cleanup_file(file_path: str):
     except Exception as e:
         print(f"⚠️ Could not delete {file_path}: {e}")
 
+def resolve_tenant(username: str, api_key: Optional[str]) -> str:
+    """Whose share of the scraper a request uses: its API key if sent, else the account it logs into
+    (both hashed, since tenants show up in /health and metric labels)."""
+    return api_key_tenant(api_key) if api_key else account_tenant(username)
+
+def resolve_priority(requested: Optional[str], default: str) -> str:
+    if requested is None:
+        return default
+    if requested not in PRIORITIES:
+        raise HTTPException(status_code=422, detail=f"priority must be one of {', '.join(PRIORITIES)}")
+    return requested
+
+def queue_full(kind: str, error: QueueFullError) -> HTTPException:
+    """429 telling the client when a queue slot is likely to free up."""
+    REQUESTS.labels(kind, "rejected").inc()
+    return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Unified Scraper API", "status": "online"}
 
 # --- SmartScout Endpoints ---
 
-@app.post("/smartscout/niche-finder")
-async def smartscout_niche_finder(request: ScrapeRequest, background_tasks: BackgroundTasks):
+def run_task(name: str, *args):
+    """Run a named task from scrapers.tasks here, or on a worker when JOB_BACKEND=queue."""
+    if REMOTE_RUNNER is not None:
+        return REMOTE_RUNNER.run(name, *args)
+    return TASKS[name](*args)
+
+# tool name -> (task name, builder for its positional arguments)
+SMARTSCOUT_TOOLS = {
+    "niche-finder": (
+        "smartscout/niche-finder",
+        lambda r: (r.search_text, r.username, r.password),
+    ),
+    "rank-maker": (
+        "smartscout/rank-maker",
+        lambda r: (r.search_text, r.username, r.password, None, True, r.max_rank),
+    ),
+    "product-search": (
+        "smartscout/product-search",
+        # search_text used as keywords, max_rank used as iRank
+        lambda r: (r.search_text, r.username, r.password, r.max_rank, None),
+    ),
+}
+
+# tool name -> builder for the positional arguments of its batch function
+SMARTSCOUT_BATCH_TOOLS = {
+    "niche-finder": lambda r: (r.search_texts, r.username, r.password, None, r.workers),
+    "rank-maker": lambda r: (r.search_texts, r.username, r.password, r.max_rank, None, r.workers),
+    "product-search": lambda r: (r.search_texts, r.username, r.password, r.max_rank, None, r.workers),
+}
+
+def smartscout_cache_key(tool: str, request: ScrapeRequest) -> tuple:
+    # Niche finder ignores max_rank, so it must not split the cache
+    max_rank = None if tool == "niche-finder" else request.max_rank
+    return make_key(tool, request.search_text, max_rank)
+
+def run_cached_export(cache_key: tuple, task_name: str, *args):
+    """Run an export in the worker thread and keep a copy of its CSV in the result cache and history."""
+    result = run_task(task_name, *args)
+    if HISTORY is not None:
+        tool, _, max_rank = cache_key
+        try:
+            # Every SmartScout task takes the search text first
+            result["history_id"] = HISTORY.ingest_csv(tool, args[0], max_rank, result["file_path"])
+        except Exception as e:
+            print(f"⚠️ Could not add {result.get('file_name')} to history: {e}")
     try:
-        result = await asyncio.get_event_loop().run_in_executor(
-            SCRAPER_EXECUTOR,
-            run_niche_finder_export,
-            request.search_text,
-            request.username,
-            request.password
-        )
-        
-        file_path = result["file_path"]
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=500, detail="File was not created")
-        
-        background_tasks.add_task(cleanup_file, file_path)
-        
-        return FileResponse(
-            path=file_path,
-            filename=result["file_name"],
-            media_type="text/csv"
-        )
+        # Cache hits then diff exactly the rows they serve in delta mode
+        RESULT_CACHE.put(cache_key, result["file_path"], result["file_name"],
+                         info={"history_id": result.get("history_id")})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"⚠️ Could not cache {result.get('file_name')}: {e}")
+    return result
 
-@app.post("/smartscout/rank-maker")
-async def smartscout_rank_maker(request: ScrapeRequest, background_tasks: BackgroundTasks):
+# tool -> CSV column its max_rank filter applies to; a cached export with a larger
+# max_rank answers a smaller one by filtering on it
+RANK_COLUMNS = {
+    "rank-maker": "Latest Rank",
+    "product-search": "Main Category Rank",
+}
+
+def narrow_cached_result(tool: str, request: ScrapeRequest):
+    """Answer from a fresh cached export with a larger max_rank, filtered locally; None if there is none."""
+    cache_key = smartscout_cache_key(tool, request)
+    meta = RESULT_CACHE.get_wider(cache_key)
+    if meta is None:
+        return None
+    os.makedirs(DOWNLOADS_DIR, exist_ok=True)
+    fd, file_path = tempfile.mkstemp(dir=DOWNLOADS_DIR, prefix="cached_", suffix=".csv")
+    os.close(fd)
     try:
-        result = await asyncio.get_event_loop().run_in_executor(
-            SCRAPER_EXECUTOR,
-            run_keyword_tools_export,
-            request.search_text,
-            request.username,
-            request.password,
-            None,
-            True,
-            request.max_rank
+        kept = filter_by_rank(meta["path"], file_path, RANK_COLUMNS[tool], request.max_rank)
+    except OSError:
+        # Evicted between lookup and read
+        kept = None
+    if kept is None:
+        cleanup_file(file_path)
+        return None
+    wider_rank = meta["key"][2]
+    print(f"⚡ Cache hit for {tool} '{request.search_text}' (max_rank {request.max_rank} from {wider_rank})")
+    history_id = None
+    if HISTORY is not None:
+        try:
+            # Recorded as an export of this max_rank, dated like its source, so delta
+            # mode diffs the rows served here against the previous export of this key
+            history_id = HISTORY.ingest_csv(tool, request.search_text, cache_key[2], file_path,
+                                            scraped_at=meta["created_at"])
+        except Exception as e:
+            print(f"⚠️ Could not add narrowed {meta['file_name']} to history: {e}")
+    try:
+        # Later requests for this max_rank hit exactly, until the wider export expires
+        RESULT_CACHE.put(cache_key, file_path, meta["file_name"], created_at=meta["created_at"],
+                         info={"history_id": history_id})
+    except Exception as e:
+        print(f"⚠️ Could not cache narrowed {meta['file_name']}: {e}")
+    return {
+        "status": "success",
+        "file_path": file_path,
+        "file_name": meta["file_name"],
+        "file_size": os.path.getsize(file_path),
+        "row_count": kept,
+        "narrowed_from_max_rank": wider_rank,
+        "history_id": history_id,
+    }
+
+def lookup_cached_result(tool: str, request: ScrapeRequest):
+    """Return a result dict pointing at a private copy of a cached export, or None on a miss."""
+    meta = RESULT_CACHE.get(smartscout_cache_key(tool, request))
+    if meta is None:
+        return narrow_cached_result(tool, request) if tool in RANK_COLUMNS else None
+    try:
+        file_path = RESULT_CACHE.copy_out(meta, DOWNLOADS_DIR)
+    except OSError:
+        # Evicted between lookup and copy
+        return None
+    print(f"⚡ Cache hit for {tool} '{request.search_text}'")
+    return {
+        "status": "success",
+        "file_path": file_path,
+        "file_name": meta["file_name"],
+        "file_size": meta["size"],
+        "history_id": meta.get("history_id"),
+    }
+
+def submit_smartscout_job(tool: str, request: ScrapeRequest, tenant: str, priority: str):
+    """Queue a SmartScout export and return its Job (raises HTTPException if it cannot be queued)."""
+    if tool not in SMARTSCOUT_TOOLS:
+        raise HTTPException(status_code=404, detail=f"Unknown SmartScout tool '{tool}'")
+    task_name, build_args = SMARTSCOUT_TOOLS[tool]
+    params = {"search_text": request.search_text, "max_rank": request.max_rank}
+    
+    QUERY_TRACKER.record(smartscout_cache_key(tool, request), (tool, request.search_text, request.max_rank))
+    cached = lookup_cached_result(tool, request)
+    if cached is not None:
+        return JOB_MANAGER.add_completed(f"smartscout/{tool}", cached, params=params, cache_hit=True)
+    
+    try:
+        cache_key = smartscout_cache_key(tool, request)
+        # Identical requests already queued or running share that job
+        return JOB_MANAGER.submit(
+            f"smartscout/{tool}",
+            run_cached_export,
+            cache_key,
+            task_name,
+            *build_args(request),
+            params=params,
+            dedupe_key=cache_key,
+            tenant=tenant,
+            priority=resolve_priority(request.priority, priority),
         )
+    except QueueFullError as e:
+        raise queue_full(f"smartscout/{tool}", e)
+
+def delta_export(tool: str, search_text: str, max_rank, result: dict):
+    """Write the rows of an export that changed since the previous one for the same query to a
+    private CSV; returns ``(file_path, file_name, headers)``."""
+    if HISTORY is None:
+        raise HTTPException(status_code=400, detail="Delta mode needs the export history (HISTORY_DB)")
+    max_rank = None if tool == "niche-finder" else max_rank
+    # Cache entries written before history ids were kept with them: use the latest stored export
+    export_id = result.get("history_id") or HISTORY.latest_export_id(tool, search_text, max_rank)
+    if export_id is None:
+        raise HTTPException(status_code=409, detail="This export is not in the history store")
+    file_name = os.path.splitext(result["file_name"])[0] + "_delta.csv"
+    os.makedirs(DOWNLOADS_DIR, exist_ok=True)
+    fd, file_path = tempfile.mkstemp(dir=DOWNLOADS_DIR, prefix="delta_", suffix=".csv")
+    os.close(fd)
+    delta = HISTORY.write_delta_csv(export_id, file_path)
+    headers = {f"X-Delta-{change.title()}": str(count) for change, count in delta["counts"].items()}
+    headers["X-Delta-Base"] = str(delta["base_id"]) if delta["base_id"] is not None else "none"
+    return file_path, file_name, headers
+
+def prefetch_export(cache_key: tuple, payload: tuple):
+    """Re-run a hot export with the configured account as low-priority work, refreshing its cache entry."""
+    tool, search_text, max_rank = payload
+    task_name, build_args = SMARTSCOUT_TOOLS[tool]
+    request = ScrapeRequest(
+        search_text=search_text,
+        username=os.getenv("SMARTSCOUT_USERNAME"),
+        password=os.getenv("SMARTSCOUT_PASSWORD"),
+        max_rank=max_rank,
+    )
+    return JOB_MANAGER.submit(
+        f"smartscout/{tool}",
+        run_cached_export,
+        cache_key,
+        task_name,
+        *build_args(request),
+        params={"search_text": search_text, "max_rank": max_rank, "prefetch": True},
+        dedupe_key=cache_key,
+        tenant="prefetch",
+        priority="bulk",
+    )
+
+# Refreshes hot queries before their cache entries expire, in off-peak windows and
+# only while no live job is waiting; needs an account to scrape with
+PREFETCHER = Prefetcher(
+    QUERY_TRACKER,
+    prefetch_export,
+    RESULT_CACHE.ttl_left,
+    top_n=int(os.getenv("PREFETCH_TOP_N", "10")),
+    budget=int(os.getenv("PREFETCH_MAX_BROWSERS", "1")),
+    lead=float(os.getenv("PREFETCH_LEAD_SECONDS", str(max(60, RESULT_CACHE.ttl // 5)))),
+    interval=float(os.getenv("PREFETCH_INTERVAL", "60")),
+    window=parse_window(os.getenv("PREFETCH_WINDOW", "")),
+    busy=lambda: JOB_MANAGER.stats()["queued"] > 0,
+    min_score=float(os.getenv("PREFETCH_MIN_SCORE", "2")),
+) if (
+    int(os.getenv("PREFETCH_TOP_N", "10")) > 0
+    and RESULT_CACHE.enabled
+    and os.getenv("SMARTSCOUT_USERNAME")
+    and os.getenv("SMARTSCOUT_PASSWORD")
+) else None
+
+async def run_smartscout_sync(tool: str, request: ScrapeRequest, background_tasks: BackgroundTasks,
+                              api_key: Optional[str]):
+    """Submit a job and hold the connection until its CSV is ready (the original blocking API)."""
+    if request.delta and HISTORY is None:
+        raise HTTPException(status_code=400, detail="Delta mode needs the export history (HISTORY_DB)")
+    job = submit_smartscout_job(tool, request, resolve_tenant(request.username, api_key), "interactive")
+    try:
+        result = await asyncio.wrap_future(job.future)
         
-        file_path = result["file_path"]
-        if not os.path.exists(file_path):
+        if not os.path.exists(result["file_path"]):
             raise HTTPException(status_code=500, detail="File was not created")
         
+        headers = {"X-Cache": "HIT" if job.cache_hit else "MISS"}
+        if request.delta:
+            file_path, file_name, delta_headers = delta_export(tool, request.search_text, request.max_rank, result)
+            headers.update(delta_headers)
+        else:
+            # The job's file may be shared with coalesced callers and the job API,
+            # so every synchronous caller sends and deletes its own copy
+            file_path, file_name = private_copy(result["file_path"], DOWNLOADS_DIR), result["file_name"]
         background_tasks.add_task(cleanup_file, file_path)
         
         return FileResponse(
             path=file_path,
-            filename=result["file_name"],
-            media_type="text/csv"
+            filename=file_name,
+            media_type="text/csv",
+            headers=headers
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def run_batch_export(tool: str, output: str, max_rank, *args):
+    """Run a batch in the worker thread, bundle its per-input CSVs into one file and record them in history."""
+    result = run_task("smartscout/batch", tool, output, *args)
+    if HISTORY is not None:
+        try:
+            HISTORY.ingest_batch(tool, max_rank, result)
+        except Exception as e:
+            print(f"⚠️ Could not add {result.get('file_name')} to history: {e}")
+    return result
 
-@app.post("/smartscout/product-search")
-async def smartscout_product_search(request: ScrapeRequest, background_tasks: BackgroundTasks):
+def submit_smartscout_batch(tool: str, request: BatchScrapeRequest, tenant: str):
+    """Queue one job that exports every input with a single logged-in driver."""
+    if tool not in SMARTSCOUT_BATCH_TOOLS:
+        raise HTTPException(status_code=404, detail=f"Unknown SmartScout tool '{tool}'")
+    if not request.search_texts:
+        raise HTTPException(status_code=422, detail="search_texts must not be empty")
+    if request.output not in ("zip", "csv"):
+        raise HTTPException(status_code=422, detail="output must be 'zip' or 'csv'")
+    if request.workers is not None and request.workers < 1:
+        raise HTTPException(status_code=422, detail="workers must be at least 1")
+    build_args = SMARTSCOUT_BATCH_TOOLS[tool]
+    params = {
+        "search_texts": request.search_texts,
+        "max_rank": request.max_rank,
+        "output": request.output,
+        "workers": request.workers,
+    }
     try:
-        result = await asyncio.get_event_loop().run_in_executor(
-            SCRAPER_EXECUTOR,
-            run_product_search_export,
-            request.search_text,  # search_text used as keywords
-            request.username,
-            request.password,
-            request.max_rank,     # max_rank used as iRank
-            None
+        return JOB_MANAGER.submit(
+            f"smartscout/{tool}/batch",
+            run_batch_export,
+            tool,
+            request.output,
+            None if tool == "niche-finder" else request.max_rank,
+            *build_args(request),
+            params=params,
+            # One browser per parallel worker (clamped to the SmartScout limit)
+            cost=request.workers or len(request.search_texts),
+            tenant=tenant,
+            priority=resolve_priority(request.priority, "bulk"),
         )
+    except QueueFullError as e:
+        raise queue_full(f"smartscout/{tool}/batch", e)
+
+def batch_status_header(result: dict) -> str:
+    items = result.get("items") or []
+    succeeded = sum(1 for item in items if item["status"] == "success")
+    return f"{succeeded}/{len(items)}"
+
+@app.post("/smartscout/niche-finder")
+async def smartscout_niche_finder(request: ScrapeRequest, background_tasks: BackgroundTasks,
+                   x_api_key: Optional[str] = Header(None)):
+    return await run_smartscout_sync("niche-finder", request, background_tasks, x_api_key)
+
+@app.post("/smartscout/rank-maker")
+async def smartscout_rank_maker(request: ScrapeRequest, background_tasks: BackgroundTasks,
+                   x_api_key: Optional[str] = Header(None)):
+    return await run_smartscout_sync("rank-maker", request, background_tasks, x_api_key)
+
+
+@app.post("/smartscout/product-search")
+async def smartscout_product_search(request: ScrapeRequest, background_tasks: BackgroundTasks,
+                   x_api_key: Optional[str] = Header(None)):
+    return await run_smartscout_sync("product-search", request, background_tasks, x_api_key)
+
+@app.post("/smartscout/{tool}/batch")
+async def smartscout_batch(tool: str, request: BatchScrapeRequest, background_tasks: BackgroundTasks,
+                           x_api_key: Optional[str] = Header(None)):
+    """Export many inputs in one browser session and return them as a zip or merged CSV."""
+    job = submit_smartscout_batch(tool, request, resolve_tenant(request.username, x_api_key))
+    try:
+        result = await asyncio.wrap_future(job.future)
         
-        file_path = result["file_path"]
-        if not os.path.exists(file_path):
+        if not os.path.exists(result["file_path"]):
             raise HTTPException(status_code=500, detail="File was not created")
         
+        file_path = private_copy(result["file_path"], DOWNLOADS_DIR)
         background_tasks.add_task(cleanup_file, file_path)
         
         return FileResponse(
             path=file_path,
             filename=result["file_name"],
-            media_type="text/csv"
+            media_type=result["media_type"],
+            headers={
+                "X-Batch-Succeeded": batch_status_header(result),
+                "X-Batch-Items-Per-Minute": str((result.get("batch_stats") or {}).get("items_per_minute")),
+                "X-Job-Id": job.id,
+            }
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- Job Endpoints ---
+
+@app.post("/jobs/smartscout/{tool}", status_code=202)
+async def submit_job(tool: str, request: ScrapeRequest, x_api_key: Optional[str] = Header(None)):
+    """Queue a SmartScout export and return its job id immediately."""
+    job = submit_smartscout_job(tool, request, resolve_tenant(request.username, x_api_key), "bulk")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result",
+    }
+
+@app.post("/jobs/smartscout/{tool}/batch", status_code=202)
+async def submit_batch_job(tool: str, request: BatchScrapeRequest, x_api_key: Optional[str] = Header(None)):
+    """Queue a SmartScout batch; per-input status is listed under "items" once it finishes."""
+    job = submit_smartscout_batch(tool, request, resolve_tenant(request.username, x_api_key))
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result",
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, background_tasks: BackgroundTasks, delta: bool = False):
+    """The job's file; ``delta=true`` returns only rows changed since the previous export of its query."""
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    
+    file_path = job.result["file_path"]
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=410, detail="Result file is no longer available")
+    
+    headers = {"X-Cache": "HIT" if job.cache_hit else "MISS"}
+    if delta:
+        tool = job.kind[len("smartscout/"):]
+        if not job.kind.startswith("smartscout/") or tool not in SMARTSCOUT_TOOLS:
+            raise HTTPException(status_code=400, detail="Delta mode is only available for single SmartScout exports")
+        file_path, file_name, delta_headers = delta_export(tool, job.params["search_text"], job.params["max_rank"], job.result)
+        headers.update(delta_headers)
+        background_tasks.add_task(cleanup_file, file_path)
+        return FileResponse(path=file_path, filename=file_name, media_type="text/csv", headers=headers)
+    
+    return FileResponse(
+        path=file_path,
+        filename=job.result["file_name"],
+        media_type=job.result.get("media_type", "text/csv"),
+        headers=headers
+    )
+
+# --- History Endpoints ---
+
+def history_store() -> HistoryStore:
+    if HISTORY is None:
+        raise HTTPException(status_code=404, detail="Export history is disabled (HISTORY_DB is empty)")
+    return HISTORY
+
+@app.get("/history/exports")
+async def history_exports(endpoint: Optional[str] = None, query: Optional[str] = None,
+                          since: Optional[float] = None, until: Optional[float] = None,
+                          limit: int = Query(50, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """Past SmartScout exports, newest first (``since``/``until`` are Unix timestamps)."""
+    return history_store().exports(endpoint, query, since, until, limit, offset)
+
+@app.get("/history/rows")
+async def history_rows(endpoint: Optional[str] = None, asin: Optional[str] = None, keyword: Optional[str] = None,
+                       subcategory: Optional[str] = None, query: Optional[str] = None,
+                       export_id: Optional[int] = None, since: Optional[float] = None, until: Optional[float] = None,
+                       sort: str = "-scraped_at",
+                       limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """Rows of past exports, filtered by indexed fields and sorted by any column (``-`` for descending)."""
+    try:
+        return history_store().rows(endpoint, asin, keyword, subcategory, query, export_id, since, until,
+                                    sort, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # @app.post("/website2/scrape")
 # async def website2_scrape():
 #     return {"message": "Endpoint not yet implemented"}
@@ -148,43 +657,60 @@ async def smartscout_product_search(request: ScrapeRequest, background_tasks: Ba
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "jobs": JOB_MANAGER.stats(),
+        "result_cache": RESULT_CACHE.stats(),
+        "history": HISTORY.stats() if HISTORY is not None else None,
+        "prefetch": PREFETCHER.stats() if PREFETCHER is not None else None,
+        "driver_pools": {
+            "smartscout": SMARTSCOUT_POOL.stats(),
+            "smartscout_tabs": SMARTSCOUT_TABS.stats() if SMARTSCOUT_TABS is not None else None,
+            "kalodata": KALODATA_POOL.stats(),
+        },
+        "task_queue": REMOTE_RUNNER.queue.stats() if REMOTE_RUNNER is not None else None,
+    }
+
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+def run_kalodata_login_click(email: str, password: str, headless: bool, wait_timeout: float, click_delay: float):
+    driver = checkout_kalodata_driver(email, password, headless)
+    try:
+        # Use scraper1 to click Category and Simple divs
+        return click_category_and_simple(driver, wait_timeout, click_delay)
+    finally:
+        checkin_kalodata_driver(driver)
 
 @app.post("/kalodata/login_click")
-async def kalodata_login_click(request: KalodataRequest):
+async def kalodata_login_click(request: KalodataRequest, x_api_key: Optional[str] = Header(None)):
     """Log into Kalodata, click the Category div and a Simple div, then return status."""
     try:
-        loop = asyncio.get_event_loop()
-        driver = await loop.run_in_executor(
-            SCRAPER_EXECUTOR,
-            get_kalodata_driver,
+        # Queued like every other browser job, so it counts against the Kalodata and node limits
+        job = JOB_MANAGER.submit(
+            "kalodata/login_click",
+            run_kalodata_login_click,
             request.email,
             request.password,
             request.headless,
+            request.wait_timeout,
+            request.click_delay,
+            tenant=resolve_tenant(request.email, x_api_key),
+            priority=resolve_priority(request.priority, "interactive"),
         )
+    except QueueFullError as e:
+        raise queue_full("kalodata/login_click", e)
 
-        try:
-            # Use scraper1 to click Category and Simple divs
-            results = await loop.run_in_executor(
-                None,
-                click_category_and_simple,
-                driver,
-                request.wait_timeout,
-                request.click_delay,
-            )
-
-            return {
-                "status": "ok",
-                "category_clicked": results["category_clicked"],
-                "simple_clicked": results["simple_clicked"],
-            }
-        finally:
-            try:
-                driver.quit()
-            except Exception:
-                pass
-
+    try:
+        results = await asyncio.wrap_future(job.future)
+        return {
+            "status": "ok",
+            "category_clicked": results["category_clicked"],
+            "simple_clicked": results["simple_clicked"],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
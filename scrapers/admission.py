@@ -0,0 +1,108 @@
+import math
+import threading
+import time
+
+from .resources import CHROME_RSS_MB, MEMORY_RESERVE_MB, available_memory_mb
+
+
+class AdmissionController:
+    """Decide how many browsers may run at once on this node, overall and per site.
+
+    A job asks for ``cost`` browsers of one site (``smartscout``, ``kalodata``, ...).
+    It is admitted while its site stays within ``site_limits`` and the node within
+    its capacity: ``max_total`` capped by how many more CHROME_RSS_MB browsers fit in
+    free memory above MEMORY_RESERVE_MB. Memory is re-read at most every ``refresh``
+    seconds, so the limit tightens when RAM runs short and grows back when it frees.
+
+    Sites in ``remote_sites`` run their browsers on queue workers, so they only count
+    against their own site limit, not this node's memory. ``site_rss_mb`` overrides
+    the memory one job of a site costs (e.g. a tab in a shared browser instead of a
+    whole Chrome).
+    """
+
+    def __init__(self, max_total: int, site_limits: dict = None, remote_sites=(), refresh: float = 5.0,
+                 site_rss_mb: dict = None):
+        self.max_total = max(1, max_total)
+        self.site_limits = dict(site_limits or {})
+        self.remote_sites = set(remote_sites)
+        self.refresh = refresh
+        self.site_rss_mb = dict(site_rss_mb or {})
+
+        self._lock = threading.Lock()
+        self._active = 0     # local browsers admitted
+        self._active_mb = 0  # their estimated memory
+        self._by_site = {}   # site -> browsers admitted
+        self._budget_mb = None
+        self._checked_at = 0.0
+
+    def try_acquire(self, site: str, cost: int = 1) -> int:
+        """Admit ``cost`` browsers for ``site`` if they fit; returns the number granted (0 = not now).
+
+        A cost larger than the site limit or node capacity is clamped to it, so big
+        batches wait for the node to drain instead of never being admitted.
+        """
+        with self._lock:
+            local = site not in self.remote_sites
+            site_limit = self.site_limits.get(site, math.inf)
+            rss_mb = self.site_rss_mb.get(site, CHROME_RSS_MB)
+            capacity = self._capacity_locked(rss_mb) if local else math.inf
+            cost = int(max(1, min(cost, site_limit, capacity)))
+
+            used = self._by_site.get(site, 0)
+            if used + cost > site_limit:
+                return 0
+            if local:
+                # An idle node always takes one job, even when memory looks short
+                if self._active and (self._active + cost > self.max_total
+                                     or self._active_mb + cost * rss_mb > self._budget_locked()):
+                    return 0
+                self._active += cost
+                self._active_mb += cost * rss_mb
+            self._by_site[site] = used + cost
+            return cost
+
+    def release(self, site: str, granted: int):
+        with self._lock:
+            self._by_site[site] = max(0, self._by_site.get(site, 0) - granted)
+            if site not in self.remote_sites:
+                self._active = max(0, self._active - granted)
+                rss_mb = self.site_rss_mb.get(site, CHROME_RSS_MB)
+                self._active_mb = max(0, self._active_mb - granted * rss_mb)
+
+    def capacity(self) -> int:
+        """Browsers (of CHROME_RSS_MB) the node can run in total right now."""
+        with self._lock:
+            return self._capacity_locked(CHROME_RSS_MB)
+
+    def stats(self) -> dict:
+        with self._lock:
+            budget_mb = self._budget_locked()
+            return {
+                "capacity": self._capacity_locked(CHROME_RSS_MB),
+                "max_total": self.max_total,
+                "active": self._active,
+                "active_mb": self._active_mb,
+                "budget_mb": None if budget_mb == math.inf else budget_mb,
+                "by_site": dict(self._by_site),
+                "site_limits": dict(self.site_limits),
+                "site_rss_mb": dict(self.site_rss_mb),
+            }
+
+    def _capacity_locked(self, rss_mb: int) -> int:
+        """Jobs of ``rss_mb`` each that fit in total (admitted ones included)."""
+        budget_mb = self._budget_locked()
+        if budget_mb == math.inf:
+            # Memory is not being read (no /proc/meminfo), so only max_total applies
+            return self.max_total
+        limit = min(self.max_total, self._active + (budget_mb - self._active_mb) // rss_mb)
+        return int(max(1, limit))
+
+    def _budget_locked(self) -> float:
+        """Memory admitted jobs may use: what they hold plus free memory above the reserve."""
+        now = time.time()
+        if self._budget_mb is None or now - self._checked_at >= self.refresh:
+            free_mb = available_memory_mb()
+            # Browsers already admitted are part of the memory in use
+            self._budget_mb = math.inf if free_mb is None else self._active_mb + free_mb - MEMORY_RESERVE_MB
+            self._checked_at = now
+        return self._budget_mb
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from urllib.parse import urlparse
+
+
+class ArtifactStore:
+    """Where workers leave result files for the API tier to pick up.
+
+    Keys are relative names such as ``<task_id>/<file_name>``. Implementations for
+    other storage (S3, GCS, ...) subclass this and are registered with
+    ``register_artifact_store``.
+    """
+
+    def put(self, file_path: str, key: str) -> str:
+        raise NotImplementedError
+
+    def fetch(self, key: str, dest_dir: str) -> str:
+        """Copy the artifact into ``dest_dir`` and return the local path (named after
+        the whole key, so same-named files of different tasks do not collide)."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class FileArtifactStore(ArtifactStore):
+    """Artifacts in a directory every node can reach (local disk, NFS, SMB, ...)."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def put(self, file_path: str, key: str) -> str:
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # Copy under a temp name first so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, dest)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def fetch(self, key: str, dest_dir: str) -> str:
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = os.path.join(dest_dir, key.replace("/", "_"))
+        shutil.copyfile(self._path(key), dest)
+        return dest
+
+    def delete(self, key: str):
+        path = self._path(key)
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Artifact key escapes the store: {key}")
+        return path
+
+
+ARTIFACT_STORES = {"file": lambda url: FileArtifactStore(urlparse(url).path)}
+
+
+def register_artifact_store(scheme: str, factory):
+    """Make ``<scheme>://...`` URLs open with ``factory(url)``."""
+    ARTIFACT_STORES[scheme] = factory
+
+
+def open_artifact_store(url: str) -> ArtifactStore:
+    scheme = urlparse(url).scheme
+    if scheme not in ARTIFACT_STORES:
+        raise ValueError(f"Unsupported artifact store '{url}' (known: {', '.join(ARTIFACT_STORES)})")
+    return ARTIFACT_STORES[scheme](url)
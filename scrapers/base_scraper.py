@@ -1,14 +1,17 @@
 import os
-import time
-import glob
 import shutil
 from datetime import datetime
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from .chromedriver import get_chrome_service
+from .downloads import wait_for_download, enable_download_events
+from .blocking import apply_blocking_prefs, block_resources
+from .metrics import DRIVER_LAUNCH, timed
 
 class BaseScraper:
+    # Resource-blocking profile from scrapers.blocking; subclasses set their site
+    blocking_profile = "default"
+
     def __init__(self, download_dir=None):
         if download_dir is None:
             self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -28,41 +31,21 @@ class BaseScraper:
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
+        enable_download_events(options)
+        apply_blocking_prefs(options, self.blocking_profile)
         
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
+        with timed(DRIVER_LAUNCH, site=self.blocking_profile):
+            driver = webdriver.Chrome(
+                service=get_chrome_service(),
+                options=options
+            )
+        block_resources(driver, self.blocking_profile)
         return driver
 
-    def get_latest_download(self, pattern: str = "*.csv", timeout: int = 20, search_dir: str = None):
+    def get_latest_download(self, pattern: str = "*.csv", timeout: int = 20, search_dir: str = None, since: float = None, driver=None):
         """Get the most recently downloaded file with timeout"""
         target_dir = search_dir or self.system_downloads
-        print(f"  Checking for files in: {target_dir}")
-        
-        files_before = set(glob.glob(os.path.join(target_dir, pattern)))
-        files_before = {f for f in files_before if not f.endswith('.crdownload')}
-        
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            files_now = set(glob.glob(os.path.join(target_dir, pattern)))
-            files_now = {f for f in files_now if not f.endswith('.crdownload')}
-            
-            new_files = files_now - files_before
-            if new_files:
-                latest_file = max(new_files, key=os.path.getctime)
-                
-                # Wait for file to finish downloading
-                size1 = -1
-                while True:
-                    size2 = os.path.getsize(latest_file)
-                    if size1 == size2 and size1 > 0:
-                        return latest_file
-                    size1 = size2
-                    time.sleep(1)
-            
-            time.sleep(1)
-        return None
+        return wait_for_download(target_dir, pattern=pattern, timeout=timeout, since=since, driver=driver)
 
     def move_to_output(self, source_file, prefix, search_text, cleanup=True):
         """Move downloaded file to project output directory with renamed filename"""
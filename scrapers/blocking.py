@@ -0,0 +1,153 @@
+import functools
+import os
+
+# Set BLOCK_RESOURCES=0 to load pages exactly as a normal browser would
+BLOCKING_ENABLED = os.getenv("BLOCK_RESOURCES", "1") not in ("0", "false", "no")
+
+FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+MEDIA = ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg"]
+TRACKERS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*segment.io*",
+    "*segment.com/analytics*",
+    "*intercom.io*",
+    "*intercomcdn.com*",
+    "*fullstory.com*",
+    "*mixpanel.com*",
+    "*amplitude.com*",
+    "*heapanalytics.com*",
+    "*sentry.io*",
+    "*tiktok.com/i18n/pixel*",
+    "*analytics.tiktok.com*",
+]
+IMAGES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"]
+
+# Per-site blocking profile:
+#   block_images  - turn images off through Chrome's content settings (no exceptions
+#                   possible, so a site whose allowlist needs images blocks them by URL)
+#   blocked_urls  - CDP Network.setBlockedURLs patterns ("*" wildcards)
+#   allowed_urls  - resources the workflows need, as "*<text>*" (URL contains) or
+#                   "*/<path>*" (path starts with); they load even when a blocked
+#                   pattern matches them, see block_resources
+BLOCKING_PROFILES = {
+    "smartscout": {
+        # The export buttons are images (csv.ico, excel icon), so images stay on
+        "block_images": False,
+        "blocked_urls": FONTS + MEDIA + TRACKERS,
+        "allowed_urls": ["*csv.ico*", "*excel*", "*/api/*"],
+    },
+    "kalodata": {
+        # Images are blocked by URL so captcha images can still load
+        "block_images": False,
+        "blocked_urls": FONTS + MEDIA + TRACKERS + IMAGES,
+        "allowed_urls": ["*/api/*", "*captcha*"],
+    },
+    "default": {
+        "block_images": False,
+        "blocked_urls": MEDIA + TRACKERS,
+        "allowed_urls": [],
+    },
+}
+
+
+def get_profile(site: str) -> dict:
+    return BLOCKING_PROFILES.get(site, BLOCKING_PROFILES["default"])
+
+
+# First Chrome whose Network.setBlockedURLs takes "urlPatterns" with allow (block: false)
+# entries that win over "urls"; older versions ignore the parameter
+URL_PATTERNS_MIN_CHROME = 142
+
+
+def blocked_url_patterns(site: str, narrow: bool = False) -> list:
+    """The site's blocked URL patterns, plus ``BLOCKED_URLS_EXTRA`` (comma-separated).
+
+    With ``narrow`` (no allow exceptions available), every pattern that could match
+    an allowlisted URL is dropped, so the allowlist still wins at the cost of
+    blocking less.
+    """
+    profile = get_profile(site)
+    patterns = list(profile["blocked_urls"])
+    patterns += [p.strip() for p in os.getenv("BLOCKED_URLS_EXTRA", "").split(",") if p.strip()]
+    if narrow:
+        patterns = [p for p in patterns if not any(_globs_overlap(p, a) for a in profile["allowed_urls"])]
+    return patterns
+
+
+def allowed_url_patterns(site: str) -> list:
+    """The site's allowlist as CDP BlockPatterns (URLPattern syntax) that exempt it from blocking."""
+    patterns = []
+    for allowed in get_profile(site)["allowed_urls"]:
+        text = allowed.strip("*")
+        if text.startswith("/"):
+            patterns.append(f"*://*:*{text}*")
+        else:
+            patterns.append(f"*://*{text}*:*/*")
+            patterns.append(f"*://*:*/*{text}*")
+    return [{"urlPattern": pattern, "block": False} for pattern in patterns]
+
+
+def url_is_blocked(url: str, patterns: list) -> bool:
+    """Whether Network.setBlockedURLs ``urls`` patterns block ``url``."""
+    return any(_globs_overlap(pattern, url) for pattern in patterns)
+
+
+def _globs_overlap(a: str, b: str) -> bool:
+    """Whether some string matches both ``a`` and ``b`` ("*" wildcards only)."""
+
+    @functools.lru_cache(maxsize=None)
+    def match(i: int, j: int) -> bool:
+        if i == len(a) and j == len(b):
+            return True
+        if i < len(a) and a[i] == "*":
+            return match(i + 1, j) or (j < len(b) and match(i, j + 1))
+        if j < len(b) and b[j] == "*":
+            return match(i, j + 1) or (i < len(a) and match(i + 1, j))
+        return i < len(a) and j < len(b) and a[i] == b[j] and match(i + 1, j + 1)
+
+    return match(0, 0)
+
+
+def _chrome_major(driver) -> int:
+    try:
+        return int(str(driver.capabilities.get("browserVersion", "0")).split(".")[0])
+    except (AttributeError, ValueError):
+        return 0
+
+
+def apply_blocking_prefs(options, site: str):
+    """Add the site's content-settings prefs (images off, no notifications) to Chrome options."""
+    if not BLOCKING_ENABLED:
+        return options
+    prefs = dict(options.experimental_options.get("prefs", {}))
+    prefs["profile.managed_default_content_settings.notifications"] = 2
+    if get_profile(site)["block_images"]:
+        prefs["profile.managed_default_content_settings.images"] = 2
+    options.add_experimental_option("prefs", prefs)
+    options.add_argument("--mute-audio")
+    return options
+
+
+def block_resources(driver, site: str):
+    """Drop the site's fonts, media and tracker requests before they hit the network (CDP),
+    except the site's allowlisted resources."""
+    if not BLOCKING_ENABLED:
+        return
+    if _chrome_major(driver) >= URL_PATTERNS_MIN_CHROME:
+        params = {"urls": blocked_url_patterns(site), "urlPatterns": allowed_url_patterns(site)}
+    else:
+        params = {"urls": blocked_url_patterns(site, narrow=True)}
+        if get_profile(site)["allowed_urls"]:
+            print(f"⚠️ Chrome {_chrome_major(driver) or '?'} has no blocking exceptions; "
+                  f"blocking only what cannot hit {site}'s allowlist (Chrome {URL_PATTERNS_MIN_CHROME}+ blocks more)")
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", params)
+    except Exception as e:
+        # Blocking is an optimisation only; never fail driver creation over it
+        print(f"⚠️ Could not enable resource blocking for {site}: {e}")
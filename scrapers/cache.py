@@ -0,0 +1,219 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .downloads import private_copy
+
+
+def normalize_query(search_text: str) -> str:
+    """Case- and whitespace-insensitive form of a search term."""
+    return " ".join((search_text or "").lower().split())
+
+
+def make_key(endpoint: str, search_text: str, max_rank=None) -> tuple:
+    return (endpoint, normalize_query(search_text), max_rank)
+
+
+def filter_by_rank(file_path: str, dest_path: str, column: str, max_rank) -> int:
+    """Copy the rows of a CSV whose ``column`` (matched case-insensitively) is at most ``max_rank``.
+
+    Rows with an empty or non-numeric rank are dropped, as the site's max filter does.
+    Returns the number of rows kept, or None when the CSV has no such column.
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as src:
+        reader = csv.DictReader(src)
+        header = reader.fieldnames or []
+        match = next((name for name in header if name.strip().lower() == column.lower()), None)
+        if match is None:
+            return None
+        kept = 0
+        with open(dest_path, "w", newline="", encoding="utf-8") as dest:
+            writer = csv.DictWriter(dest, fieldnames=header)
+            writer.writeheader()
+            for row in reader:
+                try:
+                    rank = float((row.get(match) or "").replace(",", "").lstrip("#").strip())
+                except ValueError:
+                    continue
+                if rank <= max_rank:
+                    writer.writerow(row)
+                    kept += 1
+    return kept
+
+
+class ResultCache:
+    """On-disk TTL cache of export files with size-bounded LRU eviction.
+
+    Each entry is a copy of the export (``<digest>.csv``) plus a small JSON sidecar
+    holding its key and timestamps, so the cache survives restarts. Entries older
+    than ``ttl`` seconds are treated as misses, and the least recently used ones
+    are evicted once the total size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, ttl: int = 900, max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # digest -> meta, least recently used first
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: tuple):
+        """Return the entry metadata for a fresh hit, or None."""
+        if not self.enabled:
+            return None
+        digest = _digest(key)
+        with self._lock:
+            meta = self._entries.get(digest)
+            if meta is None:
+                return None
+            if self._expired(meta):
+                self._remove_locked(digest)
+                return None
+            meta["last_access"] = time.time()
+            self._entries.move_to_end(digest)
+            self._write_meta(digest, meta)
+            return dict(meta)
+
+    def ttl_left(self, key: tuple):
+        """Seconds until the entry for ``key`` expires (without counting as an access), or None if absent."""
+        with self._lock:
+            meta = self._entries.get(_digest(key))
+            if meta is None:
+                return None
+            left = meta["created_at"] + self.ttl - time.time()
+            return left if left > 0 else None
+
+    def get_wider(self, key: tuple):
+        """Fresh entry for the same endpoint and query with a larger max_rank (the smallest such),
+        whose rows contain every row of ``key``; None if there is none."""
+        if not self.enabled or not isinstance(key[2], int):
+            return None
+        best = None
+        with self._lock:
+            for digest, meta in list(self._entries.items()):
+                endpoint, query, max_rank = meta["key"]
+                if endpoint != key[0] or query != key[1] or not isinstance(max_rank, int) or max_rank <= key[2]:
+                    continue
+                if self._expired(meta):
+                    self._remove_locked(digest)
+                    continue
+                if best is None or max_rank < best[1]["key"][2]:
+                    best = (digest, meta)
+            if best is None:
+                return None
+            digest, meta = best
+            meta["last_access"] = time.time()
+            self._entries.move_to_end(digest)
+            self._write_meta(digest, meta)
+            return dict(meta)
+
+    def put(self, key: tuple, file_path: str, file_name: str, created_at: float = None, info: dict = None):
+        """Store a copy of ``file_path`` under ``key``; ``created_at`` backdates data derived from an older entry,
+        ``info`` is kept in the entry's metadata (e.g. its history id)."""
+        if not self.enabled:
+            return None
+        digest = _digest(key)
+        data_path = self._data_path(digest)
+        # Copy next to the target first so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copy2(file_path, tmp_path)
+        os.replace(tmp_path, data_path)
+
+        now = time.time()
+        meta = {
+            "key": list(key),
+            "file_name": file_name,
+            "path": data_path,
+            "size": os.path.getsize(data_path),
+            "created_at": created_at or now,
+            "last_access": now,
+        }
+        meta.update(info or {})
+        with self._lock:
+            self._entries[digest] = meta
+            self._entries.move_to_end(digest)
+            self._write_meta(digest, meta)
+            self._evict_locked()
+        return dict(meta)
+
+    def copy_out(self, meta: dict, dest_dir: str) -> str:
+        """Copy a cached file to ``dest_dir`` so the caller can delete it freely."""
+        return private_copy(meta["path"], dest_dir, prefix="cached_")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(m["size"] for m in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+    def _expired(self, meta: dict) -> bool:
+        return time.time() - meta["created_at"] > self.ttl
+
+    def _evict_locked(self):
+        total = sum(m["size"] for m in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            digest, meta = next(iter(self._entries.items()))
+            total -= meta["size"]
+            print(f"🧹 Evicting cached export {meta['file_name']}")
+            self._remove_locked(digest)
+
+    def _remove_locked(self, digest: str):
+        self._entries.pop(digest, None)
+        for path in (self._data_path(digest), self._meta_path(digest)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load(self):
+        metas = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.cache_dir, name))
+                continue
+            if not name.endswith(".json"):
+                continue
+            digest = name[:-5]
+            try:
+                with open(self._meta_path(digest)) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if os.path.exists(meta.get("path", "")) and not self._expired(meta):
+                metas.append((meta["last_access"], digest, meta))
+            else:
+                self._remove_locked(digest)
+        for _, digest, meta in sorted(metas):
+            self._entries[digest] = meta
+
+    def _write_meta(self, digest: str, meta: dict):
+        tmp_path = self._meta_path(digest) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path(digest))
+
+    def _data_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.csv")
+
+    def _meta_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+
+def _digest(key: tuple) -> str:
+    return hashlib.sha256(json.dumps(list(key)).encode()).hexdigest()[:32]
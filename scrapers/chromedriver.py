@@ -0,0 +1,63 @@
+import glob
+import os
+import threading
+from pathlib import Path
+from selenium.webdriver.chrome.service import Service
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# webdriver-manager keeps downloaded drivers in ~/.wdm (or ./.wdm with WDM_LOCAL=1)
+WDM_CACHE_DIRS = [Path.home() / ".wdm", PROJECT_ROOT / ".wdm"]
+
+_lock = threading.Lock()
+_driver_path = None
+
+
+def resolve_chromedriver_path(force: bool = False) -> str:
+    """Resolve the chromedriver binary once per process and cache the path.
+
+    Order of precedence:
+      1. ``CHROMEDRIVER_PATH`` - an explicit binary, used as-is.
+      2. ``CHROMEDRIVER_OFFLINE=1`` - pick a driver already in the webdriver-manager
+         cache (``CHROMEDRIVER_VERSION`` pins one), never touching the network.
+      3. webdriver-manager ``install()`` (optionally pinned by ``CHROMEDRIVER_VERSION``).
+    """
+    global _driver_path
+    with _lock:
+        if _driver_path and not force:
+            return _driver_path
+
+        override = os.getenv("CHROMEDRIVER_PATH")
+        version = os.getenv("CHROMEDRIVER_VERSION") or None
+        if override:
+            if not os.path.isfile(override):
+                raise RuntimeError(f"CHROMEDRIVER_PATH does not exist: {override}")
+            path = override
+        elif os.getenv("CHROMEDRIVER_OFFLINE", "").lower() in ("1", "true", "yes"):
+            path = _find_cached_driver(version)
+        else:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager(driver_version=version).install()
+
+        _driver_path = path
+        print(f"🧭 Using chromedriver: {path}")
+        return path
+
+
+def get_chrome_service() -> Service:
+    """A fresh Service for the cached chromedriver path."""
+    return Service(resolve_chromedriver_path())
+
+
+def _find_cached_driver(version: str = None) -> str:
+    binary = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+    candidates = []
+    for cache_dir in WDM_CACHE_DIRS:
+        candidates += glob.glob(str(cache_dir / "drivers" / "chromedriver" / "**" / binary), recursive=True)
+    if version:
+        candidates = [c for c in candidates if f"{os.sep}{version}{os.sep}" in c]
+    if not candidates:
+        pinned = f" version {version}" if version else ""
+        raise RuntimeError(f"Offline mode: no cached chromedriver{pinned} found in {', '.join(map(str, WDM_CACHE_DIRS))}")
+    # Newest download wins when nothing is pinned
+    return max(candidates, key=os.path.getmtime)
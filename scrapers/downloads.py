@@ -0,0 +1,233 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+from .metrics import DOWNLOAD_WAIT
+
+PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+# inotify(7) flags
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+CDP_DOWNLOAD_EVENTS = ("Page.downloadProgress", "Browser.downloadProgress")
+
+
+def enable_download_events(options):
+    """Ask chromedriver to buffer Page-domain CDP events so download progress can be read back."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": False, "enablePage": True})
+    return options
+
+
+def create_job_download_dir(output_path: str, driver=None, prefix: str = "job") -> str:
+    """Create a private download directory for one job and point the driver's tab at it.
+
+    The directory lives under ``<output_path>/jobs`` so the finished file can be
+    moved out with a cheap rename. Concurrent jobs therefore never see each
+    other's downloads.
+    """
+    jobs_root = os.path.join(os.path.abspath(output_path), "jobs")
+    os.makedirs(jobs_root, exist_ok=True)
+    job_dir = tempfile.mkdtemp(prefix=f"{prefix}_", dir=jobs_root)
+    if driver is not None:
+        set_download_dir(driver, job_dir)
+    return job_dir
+
+
+def set_download_dir(driver, path: str):
+    """Route the driver's downloads into ``path`` (CDP, Chrome only).
+
+    Download behavior applies to a whole browser context: a tab from scrapers.tabs
+    has a context of its own, any other driver is a browser used by one job.
+    """
+    params = {"behavior": "allow", "downloadPath": path, "eventsEnabled": True}
+    context_id = getattr(driver, "_tab_context", None)
+    if context_id is not None:
+        params["browserContextId"] = context_id
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", params)
+
+
+def remove_job_download_dir(job_dir: str):
+    """Delete a job's download directory and anything left in it."""
+    if job_dir:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def private_copy(file_path: str, dest_dir: str, prefix: str = "copy_") -> str:
+    """Give a caller its own handle on ``file_path`` that it may delete independently.
+
+    A hard link is used when possible (instant, no extra disk space); otherwise the
+    file is copied.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, dest_path = tempfile.mkstemp(dir=dest_dir, prefix=prefix, suffix=os.path.splitext(file_path)[1])
+    os.close(fd)
+    os.remove(dest_path)
+    try:
+        os.link(file_path, dest_path)
+    except OSError:
+        shutil.copy2(file_path, dest_path)
+    return dest_path
+
+
+def wait_for_download(download_dir: str, pattern: str = "*.csv", timeout: float = 60, since: float = None, driver=None, poll: float = 0.5):
+    """Block until a new file matching ``pattern`` has finished downloading into ``download_dir``.
+
+    Chrome writes to ``<name>.crdownload`` and renames it once complete, so the
+    rename is the completion signal. It is picked up from inotify on Linux and from
+    CDP download progress events when ``driver`` has performance logging enabled;
+    otherwise the directory is polled every ``poll`` seconds. Files that already
+    existed are ignored unless they were created after ``since`` (minus 2s slack).
+    Tabs of one browser share its performance log, so an event drained by another
+    tab only costs a poll. Returns the file path, or None on timeout.
+    """
+    started = time.time()
+    found = _wait_for_download(download_dir, pattern, timeout, since, driver, poll)
+    DOWNLOAD_WAIT.labels("success" if found else "timeout").observe(time.time() - started)
+    return found
+
+
+def _wait_for_download(download_dir, pattern, timeout, since, driver, poll):
+    print(f"  Checking for files in: {download_dir}")
+    download_dir = os.path.abspath(download_dir)
+    before = set(_completed_files(download_dir, pattern))
+    cutoff = None if since is None else since - 2  # 2s buffer
+
+    def scan():
+        candidates = []
+        for path in _completed_files(download_dir, pattern):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            is_new = path not in before or (cutoff is not None and stat.st_ctime >= cutoff)
+            if is_new and stat.st_size > 0:
+                candidates.append((stat.st_ctime, path))
+        return max(candidates)[1] if candidates else None
+
+    # Watch before the first scan, so a download finishing in between still raises an event
+    watcher = _Inotify.open(download_dir)
+    deadline = time.time() + timeout
+    try:
+        found = scan()
+        if found:
+            return found
+        while time.time() < deadline:
+            triggered = False
+            remaining = max(deadline - time.time(), 0)
+
+            if watcher is not None:
+                names = watcher.read(min(poll, remaining))
+                triggered = any(_is_completed_name(name, pattern) for name in names)
+            elif driver is None:
+                time.sleep(min(poll, remaining))
+                triggered = True
+
+            if driver is not None and _download_completed_event(driver):
+                triggered = True
+            elif driver is not None and watcher is None:
+                # CDP log unavailable or nothing yet: fall back to polling
+                time.sleep(min(poll, remaining))
+                triggered = True
+
+            if triggered:
+                found = scan()
+                if found:
+                    return found
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+    return None
+
+
+def _is_completed_name(name: str, pattern: str) -> bool:
+    return fnmatch.fnmatch(name, pattern) and not name.endswith(PARTIAL_SUFFIXES)
+
+
+def _completed_files(download_dir: str, pattern: str):
+    try:
+        with os.scandir(download_dir) as entries:
+            return [e.path for e in entries if e.is_file() and _is_completed_name(e.name, pattern)]
+    except FileNotFoundError:
+        return []
+
+
+def _download_completed_event(driver) -> bool:
+    """Drain the performance log and report whether any download reached 'completed'."""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return False
+    completed = False
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        if message.get("method") in CDP_DOWNLOAD_EVENTS and message.get("params", {}).get("state") == "completed":
+            completed = True
+    return completed
+
+
+class _Inotify:
+    """Minimal ctypes wrapper around Linux inotify, watching one directory for renames."""
+
+    _libc = None
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    @classmethod
+    def open(cls, path: str):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            if cls._libc is None:
+                cls._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            fd = cls._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            wd = cls._libc.inotify_add_watch(fd, os.fsencode(path), IN_MOVED_TO | IN_CLOSE_WRITE)
+            if wd < 0:
+                os.close(fd)
+                return None
+            return cls(fd)
+        except (OSError, AttributeError):
+            return None
+
+    def read(self, timeout: float):
+        """Return the file names of events that arrive within ``timeout`` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.append(data[offset:offset + length].rstrip(b"\0").decode(errors="replace"))
+            offset += length
+        return names
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
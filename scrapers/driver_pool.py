@@ -0,0 +1,162 @@
+import threading
+import time
+
+
+class DriverPool:
+    """Keep logged-in browser drivers alive between jobs.
+
+    Drivers are grouped by a key (usually the account they are logged into) so a
+    job only ever receives a session for its own account. ``size`` caps the total
+    number of live browsers, idle drivers of other accounts are evicted when the
+    pool is full, and a driver is quit once it has served ``max_jobs`` jobs.
+    """
+
+    def __init__(self, factory, health_check=None, size: int = 3, max_jobs: int = 25, name: str = "driver"):
+        self.factory = factory
+        self.health_check = health_check
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self.name = name
+
+        self._lock = threading.Condition()
+        self._idle = {}      # key -> list of idle drivers
+        self._meta = {}      # id(driver) -> {"key", "jobs", "created_at"}
+        self._live = 0
+        self._closed = False
+
+    def checkout(self, key, *factory_args, **factory_kwargs):
+        """Return a healthy driver for ``key``, creating one if none is idle."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError(f"{self.name} pool is closed")
+
+                idle = self._idle.get(key)
+                if idle:
+                    driver = idle.pop()
+                    reuse = True
+                elif self._live < self.size:
+                    self._live += 1
+                    driver = None
+                    reuse = False
+                elif self._evict_idle_locked():
+                    continue
+                else:
+                    self._lock.wait()
+                    continue
+
+            if reuse:
+                if self._is_healthy(driver):
+                    print(f"♻️ Reusing pooled {self.name} for {key}")
+                    return driver
+                print(f"⚠️ Pooled {self.name} for {key} failed health check, replacing")
+                self._destroy(driver)
+                continue
+
+            try:
+                driver = self.factory(*factory_args, **factory_kwargs)
+            except Exception:
+                with self._lock:
+                    self._live -= 1
+                    self._lock.notify()
+                raise
+
+            with self._lock:
+                self._meta[id(driver)] = {"key": key, "jobs": 0, "created_at": time.time()}
+            return driver
+
+    def checkin(self, driver, discard: bool = False):
+        """Return a driver to the pool, or quit it if it is worn out or broken."""
+        with self._lock:
+            meta = self._meta.get(id(driver))
+            if meta is None:
+                meta_missing = True
+            else:
+                meta_missing = False
+                meta["jobs"] += 1
+                recycle = discard or self._closed or meta["jobs"] >= self.max_jobs
+                if not recycle:
+                    self._idle.setdefault(meta["key"], []).append(driver)
+                    self._lock.notify()
+                    return
+
+        if meta_missing:
+            # Not one of ours, just make sure the browser goes away.
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        if not discard and meta["jobs"] >= self.max_jobs:
+            print(f"🔁 Recycling {self.name} for {meta['key']} after {meta['jobs']} jobs")
+        self._destroy(driver)
+
+    def warm(self, key, count: int, *factory_args, **factory_kwargs):
+        """Pre-launch up to ``count`` drivers for ``key`` and park them as idle."""
+        drivers = []
+        try:
+            for _ in range(min(count, self.size)):
+                drivers.append(self.checkout(key, *factory_args, **factory_kwargs))
+        finally:
+            for driver in drivers:
+                self.checkin(driver)
+        print(f"🔥 Warmed {len(drivers)} {self.name}(s) for {key}")
+        return len(drivers)
+
+    def close(self):
+        """Quit every idle driver and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            drivers = [d for idle in self._idle.values() for d in idle]
+            self._idle.clear()
+            self._lock.notify_all()
+        for driver in drivers:
+            self._destroy(driver)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "live": self._live,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+            }
+
+    def _is_healthy(self, driver) -> bool:
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(driver))
+        except Exception as e:
+            print(f"⚠️ {self.name} health check error: {e}")
+            return False
+
+    def _evict_idle_locked(self) -> bool:
+        """Quit the oldest idle driver (any key) to make room. Caller holds the lock."""
+        oldest_key, oldest = None, None
+        for key, idle in self._idle.items():
+            for driver in idle:
+                created = self._meta[id(driver)]["created_at"]
+                if oldest is None or created < self._meta[id(oldest)]["created_at"]:
+                    oldest_key, oldest = key, driver
+        if oldest is None:
+            return False
+        self._idle[oldest_key].remove(oldest)
+        self._meta.pop(id(oldest), None)
+        self._live -= 1
+        threading.Thread(target=_quit_quietly, args=(oldest,), daemon=True).start()
+        return True
+
+    def _destroy(self, driver):
+        with self._lock:
+            if self._meta.pop(id(driver), None) is not None:
+                self._live -= 1
+            self._lock.notify()
+        _quit_quietly(driver)
+
+
+def _quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
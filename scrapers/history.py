@@ -0,0 +1,400 @@
+"""
+History of every SmartScout export, kept in SQLite so past results can be filtered,
+sorted and paged through without re-scraping (the CSVs themselves are deleted once
+they are sent).
+
+Each export becomes one ``exports`` row (endpoint, query, max_rank, time) and one
+``export_rows`` row per CSV line, with the ASIN, keyword and subcategory pulled out
+into indexed columns and the full line kept as JSON. Rows also carry a key (what
+the row is about, e.g. the keyword of a Rank Maker row) and a content hash, so an
+export can be diffed against the previous one for the same query.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+import zipfile
+from contextlib import contextmanager
+
+from .cache import normalize_query
+
+# Header names (lower-cased, spaces/underscores ignored) that hold each indexed field
+ASIN_COLUMNS = ("asin",)
+KEYWORD_COLUMNS = ("keyword", "keywords", "searchterm", "searchterms")
+SUBCATEGORY_COLUMNS = ("subcategory", "subcategoryname", "niche", "nichename")
+
+# The query itself fills the indexed field its tool searches by when the CSV lacks it
+QUERY_FIELD = {
+    "rank-maker": "asin",
+    "product-search": "keyword",
+    "niche-finder": "subcategory",
+}
+
+# The indexed field that identifies a row within one export of each tool
+ROW_KEY_FIELD = {
+    "rank-maker": "keyword",
+    "product-search": "asin",
+    "niche-finder": "subcategory",
+}
+CHANGE_TYPES = ("added", "removed", "changed")
+
+# Sortable without looking inside the JSON row
+SORT_COLUMNS = ("scraped_at", "asin", "keyword", "subcategory", "endpoint", "query", "max_rank")
+MAX_PAGE_SIZE = 1000
+
+
+class HistoryStore:
+    """Append-only SQLite store of export rows; safe to use from several threads and processes."""
+
+    def __init__(self, path: str, retention_days: float = 0):
+        self.path = os.path.abspath(path)
+        self.retention_days = retention_days
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS exports (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    query_norm TEXT NOT NULL,
+                    max_rank INTEGER,
+                    file_name TEXT,
+                    columns TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    scraped_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS exports_by_query ON exports (endpoint, query_norm, scraped_at);
+                CREATE INDEX IF NOT EXISTS exports_by_time ON exports (scraped_at);
+                CREATE TABLE IF NOT EXISTS export_rows (
+                    export_id INTEGER NOT NULL REFERENCES exports (id) ON DELETE CASCADE,
+                    line INTEGER NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    scraped_at REAL NOT NULL,
+                    asin TEXT,
+                    keyword TEXT,
+                    subcategory TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (export_id, line)
+                );
+            """)
+            # Stores created before delta exports lack the row key/hash columns
+            existing = {row["name"] for row in db.execute("PRAGMA table_info(export_rows)")}
+            for column in ("row_key", "row_hash"):
+                if column not in existing:
+                    db.execute(f"ALTER TABLE export_rows ADD COLUMN {column} TEXT")
+            db.executescript("""
+                CREATE INDEX IF NOT EXISTS rows_by_key ON export_rows (export_id, row_key, row_hash);
+                CREATE INDEX IF NOT EXISTS rows_by_asin ON export_rows (asin, scraped_at);
+                CREATE INDEX IF NOT EXISTS rows_by_keyword ON export_rows (keyword COLLATE NOCASE, scraped_at);
+                CREATE INDEX IF NOT EXISTS rows_by_subcategory ON export_rows (subcategory COLLATE NOCASE, scraped_at);
+                CREATE INDEX IF NOT EXISTS rows_by_endpoint ON export_rows (endpoint, scraped_at);
+            """)
+
+    def ingest_csv(self, endpoint: str, query: str, max_rank, file_path: str, scraped_at: float = None) -> int:
+        """Store one export CSV; returns its export id."""
+        with open(file_path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            columns = list(reader.fieldnames or [])
+        return self.ingest_rows(endpoint, query, max_rank, columns, rows, os.path.basename(file_path), scraped_at)
+
+    def ingest_batch(self, endpoint: str, max_rank, result: dict, scraped_at: float = None) -> list:
+        """Store every successful input of a packaged batch (zip of CSVs or merged CSV); returns export ids."""
+        ids = []
+        if result.get("media_type") == "application/zip":
+            with zipfile.ZipFile(result["file_path"]) as archive:
+                for item in result.get("items") or []:
+                    if item["status"] != "success" or not item.get("file_name"):
+                        continue
+                    with archive.open(item["file_name"]) as member:
+                        reader = csv.DictReader(io.TextIOWrapper(member, encoding="utf-8-sig", newline=""))
+                        rows = list(reader)
+                        ids.append(self.ingest_rows(endpoint, item["input"], max_rank, list(reader.fieldnames or []),
+                                                    rows, item["file_name"], scraped_at))
+            return ids
+
+        with open(result["file_path"], newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            columns = [c for c in reader.fieldnames or [] if c not in ("batch_input", "batch_status")]
+            by_input = {}
+            for row in reader:
+                if row.get("batch_status") != "success":
+                    continue
+                by_input.setdefault(row.get("batch_input"), []).append({c: row.get(c) for c in columns})
+        for query, rows in by_input.items():
+            ids.append(self.ingest_rows(endpoint, query, max_rank, columns, rows, result.get("file_name"), scraped_at))
+        return ids
+
+    def ingest_rows(self, endpoint: str, query: str, max_rank, columns: list, rows: list,
+                    file_name: str = None, scraped_at: float = None) -> int:
+        scraped_at = scraped_at or time.time()
+        fields = _field_columns(columns)
+        query_field = QUERY_FIELD.get(endpoint)
+        key_field = ROW_KEY_FIELD.get(endpoint)
+        seen_keys = {}
+
+        def row_values(line, row):
+            indexed = _indexed_values(row, fields, query_field, query)
+            row_hash = _row_hash(row)
+            key = dict(zip(("asin", "keyword", "subcategory"), indexed)).get(key_field)
+            key = key.lower() if key else row_hash
+            # The same key twice in one export (e.g. two identical lines) stays two distinct rows
+            seen_keys[key] = seen_keys.get(key, 0) + 1
+            if seen_keys[key] > 1:
+                key = f"{key}#{seen_keys[key]}"
+            return (export_id, line, endpoint, scraped_at, *indexed, json.dumps(_typed(row)), key, row_hash)
+
+        with self._db() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                export_id = db.execute(
+                    "INSERT INTO exports (endpoint, query, query_norm, max_rank, file_name, columns, row_count, scraped_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (endpoint, query, normalize_query(query), max_rank, file_name, json.dumps(columns), len(rows), scraped_at),
+                ).lastrowid
+                db.executemany(
+                    "INSERT INTO export_rows (export_id, line, endpoint, scraped_at, asin, keyword, subcategory, data, "
+                    "row_key, row_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (row_values(line, row) for line, row in enumerate(rows)),
+                )
+                if self.retention_days > 0:
+                    self._prune(db, scraped_at - self.retention_days * 86400)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return export_id
+
+    def latest_export_id(self, endpoint: str, query: str, max_rank=None):
+        """Id of the newest export of ``query`` by ``endpoint`` with ``max_rank``, or None."""
+        with self._db() as db:
+            row = db.execute(
+                "SELECT id FROM exports WHERE endpoint = ? AND query_norm = ? AND max_rank IS ? ORDER BY id DESC LIMIT 1",
+                (endpoint, normalize_query(query), max_rank),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def delta(self, export_id: int) -> dict:
+        """Rows of ``export_id`` that differ from the previous export of the same endpoint/query/max_rank.
+
+        Returns ``base_id`` (None when there is no earlier export, so every row is
+        "added"), the union of both exports' ``columns``, ``counts`` per change type and
+        ``rows`` as ``(change_type, data)``: new rows for "added"/"changed", the old
+        row for "removed", in the order of the new export (removed rows last).
+        """
+        with self._db() as db:
+            export = db.execute("SELECT * FROM exports WHERE id = ?", (export_id,)).fetchone()
+            if export is None:
+                raise KeyError(export_id)
+            base = db.execute(
+                "SELECT id, columns FROM exports WHERE endpoint = ? AND query_norm = ? AND max_rank IS ? AND id < ? "
+                "ORDER BY id DESC LIMIT 1",
+                (export["endpoint"], export["query_norm"], export["max_rank"], export_id),
+            ).fetchone()
+            base_id = base["id"] if base else None
+            changed = db.execute(
+                "SELECT n.data, o.row_key AS base_key FROM export_rows n "
+                "LEFT JOIN export_rows o ON o.export_id = ? AND o.row_key = n.row_key "
+                "WHERE n.export_id = ? AND (o.row_key IS NULL OR o.row_hash IS NOT n.row_hash) ORDER BY n.line",
+                (base_id, export_id),
+            ).fetchall()
+            removed = db.execute(
+                "SELECT o.data FROM export_rows o WHERE o.export_id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM export_rows n WHERE n.export_id = ? AND n.row_key = o.row_key) ORDER BY o.line",
+                (base_id, export_id),
+            ).fetchall()
+
+        columns = json.loads(export["columns"])
+        if base is not None:
+            columns += [c for c in json.loads(base["columns"]) if c not in columns]
+        rows = [("added" if row["base_key"] is None else "changed", json.loads(row["data"])) for row in changed]
+        rows += [("removed", json.loads(row["data"])) for row in removed]
+        return {
+            "export_id": export_id,
+            "base_id": base_id,
+            "columns": columns,
+            "counts": {change: sum(1 for c, _ in rows if c == change) for change in CHANGE_TYPES},
+            "rows": rows,
+        }
+
+    def write_delta_csv(self, export_id: int, file_path: str) -> dict:
+        """Write ``delta(export_id)`` as a CSV with a leading ``change_type`` column; returns the delta
+        without its rows."""
+        delta = self.delta(export_id)
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["change_type"] + delta["columns"], extrasaction="ignore")
+            writer.writeheader()
+            for change_type, data in delta.pop("rows"):
+                writer.writerow({**data, "change_type": change_type})
+        return delta
+
+    def exports(self, endpoint: str = None, query: str = None, since: float = None, until: float = None,
+                limit: int = 50, offset: int = 0) -> dict:
+        """Past exports, newest first."""
+        where, params = _filters(endpoint=endpoint, since=since, until=until)
+        if query:
+            where.append("query_norm = ?")
+            params.append(normalize_query(query))
+        clause = " WHERE " + " AND ".join(where) if where else ""
+        limit = _page_size(limit)
+        with self._db() as db:
+            total = db.execute(f"SELECT COUNT(*) FROM exports{clause}", params).fetchone()[0]
+            found = db.execute(
+                f"SELECT id, endpoint, query, max_rank, file_name, columns, row_count, scraped_at FROM exports{clause} "
+                "ORDER BY scraped_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "exports": [dict(row, columns=json.loads(row["columns"])) for row in found],
+        }
+
+    def rows(self, endpoint: str = None, asin: str = None, keyword: str = None, subcategory: str = None,
+             query: str = None, export_id: int = None, since: float = None, until: float = None,
+             sort: str = "-scraped_at", limit: int = 100, offset: int = 0) -> dict:
+        """Export rows matching every given filter.
+
+        ``sort`` is a column name, ``-`` prefixed for descending; names other than
+        SORT_COLUMNS sort by that CSV column. ``query`` matches the export's search text.
+        Raises ValueError for a column name that cannot be used as a JSON path key.
+        """
+        where, params = _filters(endpoint=endpoint, since=since, until=until, prefix="r.")
+        if asin:
+            where.append("r.asin = ?")
+            params.append(asin.strip().upper())
+        if keyword:
+            where.append("r.keyword = ? COLLATE NOCASE")
+            params.append(keyword.strip())
+        if subcategory:
+            where.append("r.subcategory = ? COLLATE NOCASE")
+            params.append(subcategory.strip())
+        if query:
+            where.append("e.query_norm = ?")
+            params.append(normalize_query(query))
+        if export_id is not None:
+            where.append("r.export_id = ?")
+            params.append(export_id)
+        clause = " WHERE " + " AND ".join(where) if where else ""
+
+        descending = sort.startswith("-")
+        column = sort.lstrip("-+") or "scraped_at"
+        order_params = []
+        if column in SORT_COLUMNS:
+            order = f"{'e' if column in ('query', 'max_rank') else 'r'}.{column}"
+        elif '"' in column:
+            # A JSON path key cannot escape a double quote, SQLite would reject the whole path
+            raise ValueError(f"Cannot sort by column {column!r}")
+        else:
+            order = "json_extract(r.data, ?)"
+            order_params.append(f'$."{column}"')
+        order += " DESC" if descending else " ASC"
+
+        limit = _page_size(limit)
+        from_clause = "FROM export_rows r JOIN exports e ON e.id = r.export_id"
+        with self._db() as db:
+            total = db.execute(f"SELECT COUNT(*) {from_clause}{clause}", params).fetchone()[0]
+            found = db.execute(
+                f"SELECT r.export_id, r.endpoint, e.query, e.max_rank, r.scraped_at, r.asin, r.keyword, r.subcategory, r.data "
+                f"{from_clause}{clause} ORDER BY {order}, r.export_id DESC, r.line LIMIT ? OFFSET ?",
+                params + order_params + [limit, offset],
+            ).fetchall()
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "rows": [dict(row, data=json.loads(row["data"])) for row in found],
+        }
+
+    def stats(self) -> dict:
+        with self._db() as db:
+            exports, rows = db.execute("SELECT COUNT(*), COALESCE(SUM(row_count), 0) FROM exports").fetchone()
+        return {"path": self.path, "exports": exports, "rows": rows, "retention_days": self.retention_days}
+
+    def _prune(self, db, cutoff: float):
+        db.execute("DELETE FROM export_rows WHERE export_id IN (SELECT id FROM exports WHERE scraped_at < ?)", (cutoff,))
+        db.execute("DELETE FROM exports WHERE scraped_at < ?", (cutoff,))
+
+    @contextmanager
+    def _db(self):
+        # Autocommit; ingestion wraps its inserts in BEGIN IMMEDIATE
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+def _header_key(name: str) -> str:
+    return "".join(ch for ch in (name or "").lower() if ch.isalnum())
+
+
+def _field_columns(columns: list) -> dict:
+    """Which CSV column feeds each indexed field (first match wins)."""
+    keys = {_header_key(c): c for c in reversed(columns)}
+    fields = {}
+    for field, names in (("asin", ASIN_COLUMNS), ("keyword", KEYWORD_COLUMNS), ("subcategory", SUBCATEGORY_COLUMNS)):
+        fields[field] = next((keys[n] for n in names if n in keys), None)
+    return fields
+
+
+def _indexed_values(row: dict, fields: dict, query_field: str, query: str) -> tuple:
+    values = {}
+    for field, column in fields.items():
+        value = (row.get(column) or "").strip() if column else ""
+        if not value and field == query_field:
+            value = (query or "").strip()
+        values[field] = value or None
+    if values["asin"]:
+        values["asin"] = values["asin"].upper()
+    return values["asin"], values["keyword"], values["subcategory"]
+
+
+def _row_hash(row: dict) -> str:
+    # csv.DictReader files fields beyond the header under None, which sort_keys cannot order
+    row = {column: value for column, value in row.items() if column is not None}
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _typed(row: dict) -> dict:
+    """Row with plain numbers (``1,234`` included) stored as numbers, so they sort numerically."""
+    typed = {}
+    for column, value in row.items():
+        if column is None:
+            continue
+        typed[column] = value
+        text = (value or "").replace(",", "").strip()
+        if not text:
+            continue
+        try:
+            typed[column] = int(text)
+        except ValueError:
+            try:
+                typed[column] = float(text)
+            except ValueError:
+                pass
+    return typed
+
+
+def _filters(endpoint=None, since=None, until=None, prefix: str = ""):
+    where, params = [], []
+    if endpoint:
+        where.append(f"{prefix}endpoint = ?")
+        params.append(endpoint)
+    if since is not None:
+        where.append(f"{prefix}scraped_at >= ?")
+        params.append(since)
+    if until is not None:
+        where.append(f"{prefix}scraped_at < ?")
+        params.append(until)
+    return where, params
+
+
+def _page_size(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
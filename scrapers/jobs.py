@@ -0,0 +1,302 @@
+import math
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+from .steps import track_steps
+from .scheduler import FairScheduler
+
+_local = threading.local()
+
+
+def granted_slots():
+    """Browsers admission granted the job running in this thread (None outside a JobManager job)."""
+    job = getattr(_local, "job", None)
+    return job.granted if job is not None else None
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot take more work.
+
+    ``retry_after`` is a rough number of seconds until a queue slot frees up.
+    """
+
+    def __init__(self, message: str, retry_after: int = 30):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Job:
+    """One unit of scraper work plus its progress, tracked from submit to result."""
+
+    def __init__(self, kind: str, func, args: tuple = (), kwargs: dict = None, params: dict = None, cost: int = 1,
+                 tenant: str = "default", priority: str = "bulk"):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        # "smartscout/rank-maker" -> "smartscout"; admission limits are per site
+        self.site = kind.split("/")[0]
+        self.cost = cost
+        self.granted = 0
+        self.tenant = tenant
+        self.priority = priority
+        self.sort_key = None
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.params = params or {}
+        self.status = "queued"
+        self.steps = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cache_hit = False
+        self.dedupe_key = None
+        self.subscribers = 1
+        self.future = Future()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def record_step(self, message: str):
+        now = time.time()
+        if self.steps and self.steps[-1]["duration"] is None:
+            self.steps[-1]["duration"] = round(now - self.steps[-1]["started_at"], 3)
+        self.steps.append({"name": message, "started_at": now, "duration": None})
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "tenant": self.tenant,
+            "priority": self.priority,
+            "params": self.params,
+            "current_step": self.steps[-1]["name"] if self.steps and not self.done else None,
+            "steps": [
+                {
+                    "name": s["name"],
+                    "started_at": datetime.fromtimestamp(s["started_at"]).isoformat(),
+                    "duration": s["duration"],
+                }
+                for s in self.steps
+            ],
+            "error": self.error,
+            "cache": "hit" if self.cache_hit else "miss",
+            "subscribers": self.subscribers,
+            "file_name": (self.result or {}).get("file_name"),
+            # Per-input outcome of batch jobs
+            "items": (self.result or {}).get("items"),
+            "batch_stats": (self.result or {}).get("batch_stats"),
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+        }
+
+
+class JobManager:
+    """Bounded job queue in front of the scraper executor.
+
+    ``submit`` returns immediately; a dispatcher thread hands queued jobs to the
+    executor only when one of its ``max_workers`` slots is free and, if an
+    ``admission`` controller is given, when it admits the job's browsers. A job
+    whose site is at its limit does not hold up jobs for other sites behind it.
+    Which waiting job goes next is decided by ``scheduler`` (fair queuing across
+    tenants, see FairScheduler). At most ``max_queued`` jobs ever wait. Finished jobs (and their result files)
+    are kept for ``result_ttl`` seconds so clients can poll and download them.
+
+    Submitting with a ``dedupe_key`` that matches a job still queued or running
+    returns that job instead of starting another one (single-flight), so identical
+    concurrent requests share one browser session and one result file.
+    """
+
+    def __init__(self, executor, max_workers: int = 3, max_queued: int = 20, result_ttl: int = 3600,
+                 admission=None, scheduler: FairScheduler = None):
+        self.executor = executor
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.admission = admission
+        self._scheduler = scheduler if scheduler is not None else FairScheduler()
+        self._jobs = {}
+        self._in_flight = {}  # dedupe_key -> Job
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._dispatched = 0
+        self._running = 0
+        self._avg_run = None  # moving average of job run time, for Retry-After
+        self._listeners = []
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, kind: str, func, *args, params: dict = None, dedupe_key=None, cost: int = 1,
+               tenant: str = "default", priority: str = "bulk", **kwargs) -> Job:
+        """Queue ``func(*args, **kwargs)`` and return its Job without waiting.
+
+        ``cost`` is the number of browsers the job opens (e.g. a parallel batch).
+        ``tenant`` and ``priority`` ("interactive" or "bulk") feed the fair scheduler.
+        """
+        self.purge_expired()
+        with self._lock:
+            if dedupe_key is not None and dedupe_key in self._in_flight:
+                job = self._in_flight[dedupe_key]
+                job.subscribers += 1
+                print(f"🔗 Attached to in-flight {kind} job {job.id} ({job.subscribers} callers)")
+                return job
+
+            if len(self._scheduler) >= self.max_queued:
+                raise QueueFullError(
+                    f"Job queue is full ({self.max_queued} waiting)",
+                    retry_after=self._retry_after_locked(),
+                )
+            refusal = self._scheduler.refusal(tenant)
+            if refusal is not None:
+                message, retry_after = refusal
+                raise QueueFullError(message, retry_after=retry_after or self._retry_after_locked())
+            job = Job(kind, func, args, kwargs, params, cost=cost, tenant=tenant, priority=priority)
+            job.dedupe_key = dedupe_key
+            self._scheduler.add(job)
+            self._wakeup.notify()
+            self._jobs[job.id] = job
+            if dedupe_key is not None:
+                self._in_flight[dedupe_key] = job
+        print(f"📥 Queued {kind} job {job.id} for {tenant} ({priority})")
+        return job
+
+    def add_completed(self, kind: str, result: dict, params: dict = None, cache_hit: bool = False) -> Job:
+        """Register a job whose result is already available (e.g. served from cache)."""
+        job = Job(kind, None, params=params)
+        job.cache_hit = cache_hit
+        job.started_at = job.created_at
+        self._finish(job, result=result)
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def add_listener(self, callback):
+        """Call ``callback(job)`` whenever a job finishes (succeeded, failed or served from cache)."""
+        self._listeners.append(callback)
+
+    def get(self, job_id: str):
+        self.purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = len(self._scheduler)
+            running = self._running
+            tenants = self._scheduler.stats()
+        return {
+            "queued": queued,
+            "running": running,
+            "max_workers": self.max_workers,
+            "max_queued": self.max_queued,
+            "admission": self.admission.stats() if self.admission is not None else None,
+            "tenants": tenants,
+        }
+
+    def purge_expired(self):
+        """Forget finished jobs older than ``result_ttl`` and delete their files."""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [j for j in self._jobs.values() if j.done and j.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            file_path = (job.result or {}).get("file_path")
+            if file_path and os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                except OSError as e:
+                    print(f"⚠️ Could not delete expired result {file_path}: {e}")
+
+    def _dispatch_loop(self):
+        while True:
+            with self._wakeup:
+                job = self._next_admitted_locked()
+                while job is None:
+                    # Also re-check on a timer: memory-based capacity can grow without a job finishing
+                    self._wakeup.wait(timeout=5)
+                    job = self._next_admitted_locked()
+            try:
+                self.executor.submit(self._run, job)
+            except Exception as e:
+                # Executor shut down: fail the job rather than losing it
+                self._release(job)
+                self._finish(job, error=e)
+
+    def _next_admitted_locked(self):
+        """Take the first waiting job, in scheduler order, that can start now. Caller holds the lock."""
+        if self._dispatched >= self.max_workers:
+            return None
+        for job in self._scheduler.candidates():
+            granted = self.admission.try_acquire(job.site, job.cost) if self.admission is not None else 1
+            if granted:
+                job.granted = granted
+                self._scheduler.start(job)
+                self._dispatched += 1
+                return job
+        return None
+
+    def _release(self, job: Job):
+        with self._wakeup:
+            self._dispatched -= 1
+            self._scheduler.finish(job)
+            if self.admission is not None:
+                self.admission.release(job.site, job.granted)
+            self._wakeup.notify()
+
+    def _retry_after_locked(self) -> int:
+        """Rough seconds until a running job finishes and frees a queue slot."""
+        slots = self.admission.capacity() if self.admission is not None else self.max_workers
+        return max(1, math.ceil((self._avg_run or 30) / max(1, min(slots, self.max_workers))))
+
+    def _run(self, job: Job):
+        with self._lock:
+            self._running += 1
+        job.status = "running"
+        job.started_at = time.time()
+        _local.job = job
+        try:
+            with track_steps(job.record_step):
+                result = job.func(*job.args, **job.kwargs)
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}\n{traceback.format_exc()}")
+            self._finish(job, error=e)
+        else:
+            self._finish(job, result=result)
+        finally:
+            _local.job = None
+            elapsed = time.time() - job.started_at
+            with self._lock:
+                self._running -= 1
+                self._avg_run = elapsed if self._avg_run is None else 0.8 * self._avg_run + 0.2 * elapsed
+            self._release(job)
+
+    def _finish(self, job: Job, result=None, error: Exception = None):
+        with self._lock:
+            if job.dedupe_key is not None and self._in_flight.get(job.dedupe_key) is job:
+                del self._in_flight[job.dedupe_key]
+        job.finished_at = time.time()
+        if job.steps and job.steps[-1]["duration"] is None:
+            job.steps[-1]["duration"] = round(job.finished_at - job.steps[-1]["started_at"], 3)
+        if error is not None:
+            job.status = "failed"
+            job.error = str(error)
+            job.future.set_exception(error)
+        else:
+            job.status = "succeeded"
+            job.result = result
+            job.future.set_result(result)
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"⚠️ Job listener failed: {e}")
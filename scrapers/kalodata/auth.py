@@ -1,19 +1,32 @@
+import os
 import time
 from pathlib import Path
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
 try:
 	import undetected_chromedriver as uc
 	_HAS_UC = True
 except Exception:
 	from selenium import webdriver
-	from selenium.webdriver.chrome.service import Service
 	from selenium.webdriver.chrome.options import Options
-	from webdriver_manager.chrome import ChromeDriverManager
 	_HAS_UC = False
 
+from ..driver_pool import DriverPool
+from ..chromedriver import get_chrome_service
+from ..blocking import apply_blocking_prefs, block_resources
+from ..waits import PageWaiter
+from ..metrics import DRIVER_LAUNCH, SESSION_SETUP, timed
+
+# Overridable so the flow can run against a local mock site (benchmarks/)
+BASE_URL = os.getenv("KALODATA_BASE_URL", "https://www.kalodata.com").rstrip("/")
+LOGIN_URL = f"{BASE_URL}/login"
+PRODUCT_URL = f"{BASE_URL}/product"
+POOL_SIZE = int(os.getenv("KALODATA_POOL_SIZE", "2"))
+POOL_MAX_JOBS = int(os.getenv("KALODATA_POOL_MAX_JOBS", "25"))
+
 
 def _build_options_uc(headless: bool = False):
 	opts = uc.ChromeOptions()
@@ -25,6 +38,7 @@ def _build_options_uc(headless: bool = False):
 	opts.add_argument("--start-maximized")
 	opts.add_experimental_option("excludeSwitches", ["enable-automation"])
 	opts.add_experimental_option('useAutomationExtension', False)
+	apply_blocking_prefs(opts, "kalodata")
 	return opts
 
 
@@ -36,6 +50,7 @@ def _build_options_selenium(headless: bool = False):
 	options.add_argument("--disable-blink-features=AutomationControlled")
 	options.add_experimental_option("excludeSwitches", ["enable-automation"])
 	options.add_experimental_option('useAutomationExtension', False)
+	apply_blocking_prefs(options, "kalodata")
 	return options
 
 
@@ -43,41 +58,74 @@ def get_kalodata_driver(email: str, password: str, headless: bool = False, timeo
 	"""Create a Chrome driver, perform login to kalodata and return the logged-in driver.
 
 	The function prefers `undetected_chromedriver` if available, otherwise falls back
-	to Selenium + webdriver_manager. On successful login the driver is returned and
+	to Selenium with the chromedriver resolved once at startup. On successful login the driver is returned and
 	left running (caller is responsible for quitting it).
 	"""
-	if _HAS_UC:
-		options = _build_options_uc(headless=headless)
-		driver = uc.Chrome(options=options)
-	else:
-		options = _build_options_selenium(headless=headless)
-		driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+	with timed(DRIVER_LAUNCH, site="kalodata"):
+		if _HAS_UC:
+			options = _build_options_uc(headless=headless)
+			driver = uc.Chrome(options=options)
+		else:
+			options = _build_options_selenium(headless=headless)
+			driver = webdriver.Chrome(service=get_chrome_service(), options=options)
+
+	# Drop fonts, images, media and trackers before the first page load
+	block_resources(driver, "kalodata")
 
 	wait = WebDriverWait(driver, timeout)
+	waiter = PageWaiter(driver, timeout=timeout)
 
+	started = time.time()
 	try:
-		driver.get("https://www.kalodata.com/login")
+		driver.get(LOGIN_URL)
 
 		# Wait for the email input and fill credentials
 		wait.until(EC.presence_of_element_located((By.ID, "register_email"))).send_keys(email)
 		driver.find_element(By.ID, "register_password").send_keys(password)
 		driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
 
-		# Wait until URL changes away from /login or some known post-login element appears
-		for _ in range(timeout):
-			if "login" not in driver.current_url:
-				break
-			time.sleep(1)
+		# Wait until URL changes away from /login
+		try:
+			waiter.url_excludes("login", label="login_redirect")
+		except TimeoutException:
+			pass
 
 		# Basic verification: ensure product page loads
-		driver.get("https://www.kalodata.com/product")
+		driver.get(PRODUCT_URL)
 		wait.until(EC.presence_of_element_located((By.CLASS_NAME, "ant-table-row")))
+		SESSION_SETUP.labels("kalodata", "login", "success").observe(time.time() - started)
 
 		return driver
 
 	except Exception:
+		SESSION_SETUP.labels("kalodata", "login", "failure").observe(time.time() - started)
 		try:
 			driver.quit()
 		except Exception:
 			pass
 		raise
+
+
+def is_session_alive(driver):
+	"""Health check for pooled drivers: the product page must load without a login redirect."""
+	driver.get(PRODUCT_URL)
+	return "login" not in driver.current_url
+
+
+KALODATA_POOL = DriverPool(
+	factory=get_kalodata_driver,
+	health_check=is_session_alive,
+	size=POOL_SIZE,
+	max_jobs=POOL_MAX_JOBS,
+	name="Kalodata driver",
+)
+
+
+def checkout_kalodata_driver(email: str, password: str, headless: bool = False):
+	"""Take a logged-in Kalodata driver from the pool (launching one if needed)."""
+	return KALODATA_POOL.checkout((email, headless), email, password, headless=headless)
+
+
+def checkin_kalodata_driver(driver, discard: bool = False):
+	"""Hand a Kalodata driver back to the pool."""
+	KALODATA_POOL.checkin(driver, discard=discard)
@@ -1,10 +1,9 @@
 """
 Kalodata Scraper - Click Category and Simple divs after login
 """
-import time
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from ...waits import PageWaiter
+from ...steps import step
 
 
 def click_category_and_simple(driver, wait_timeout: int = 20, click_delay: float = 0.5):
@@ -13,13 +12,13 @@ def click_category_and_simple(driver, wait_timeout: int = 20, click_delay: float
     
     Args:
         driver: Selenium WebDriver (assumed to be logged in)
-        wait_timeout: Timeout in seconds for WebDriverWait
-        click_delay: Delay in seconds between clicks
+        wait_timeout: Timeout in seconds for each readiness wait
+        click_delay: Quiet period (seconds without pending XHR) required after each click
     
     Returns:
         dict with click results: {"category_clicked": bool, "simple_clicked": bool}
     """
-    wait = WebDriverWait(driver, wait_timeout)
+    waiter = PageWaiter(driver, timeout=wait_timeout)
     results = {
         "category_clicked": False,
         "simple_clicked": False,
@@ -27,36 +26,35 @@ def click_category_and_simple(driver, wait_timeout: int = 20, click_delay: float
 
     # Click an element whose text contains 'Category'
     try:
-        cat = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//div[contains(text(),'Category') or contains(.,'Category')]")
-            )
+        step("Step 1: Clicking Category div...")
+        waiter.settle(label="product_page")
+        cat = waiter.clickable(
+            (By.XPATH, "//div[contains(text(),'Category') or contains(.,'Category')]"),
+            label="category_div"
         )
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", cat)
-        time.sleep(10)
         driver.execute_script("arguments[0].click();", cat)
         results["category_clicked"] = True
         print("✅ Category div clicked")
-        time.sleep(10)
+        waiter.settle(label="category_opened", quiet=click_delay)
     except Exception as e:
         print(f"⚠️ Could not click Category: {e}")
 
     # Click a div containing 'simple' (case-insensitive)
     try:
-        simple = wait.until(
-            EC.element_to_be_clickable(
-                (
-                    By.XPATH,
-                    "//div[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'simple')]",
-                )
-            )
+        step("Step 2: Clicking Simple div...")
+        simple = waiter.clickable(
+            (
+                By.XPATH,
+                "//div[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'simple')]",
+            ),
+            label="simple_div"
         )
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", simple)
-        time.sleep(click_delay)
         driver.execute_script("arguments[0].click();", simple)
         results["simple_clicked"] = True
         print("✅ Simple div clicked")
-        time.sleep(click_delay)
+        waiter.settle(label="simple_applied", quiet=click_delay)
     except Exception as e:
         print(f"⚠️ Could not click Simple: {e}")
 
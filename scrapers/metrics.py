@@ -0,0 +1,140 @@
+"""
+Prometheus series for the scrapers, served by ``GET /metrics``.
+"""
+import re
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .steps import track_steps
+
+# Browser work is slow: buckets from 100 ms up to 5 minutes
+BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+STEP_DURATION = Histogram(
+    "scraper_step_duration_seconds",
+    "Time spent in each numbered workflow step",
+    ["workflow", "step"],
+    buckets=BUCKETS,
+)
+WAIT_DURATION = Histogram(
+    "scraper_wait_duration_seconds",
+    "Time spent in each PageWaiter wait",
+    ["label", "outcome"],
+    buckets=BUCKETS,
+)
+DRIVER_LAUNCH = Histogram(
+    "scraper_driver_launch_seconds",
+    "Time to start a Chrome/chromedriver instance",
+    ["site", "outcome"],
+    buckets=BUCKETS,
+)
+SESSION_SETUP = Histogram(
+    "scraper_session_setup_seconds",
+    "Time to get a browser logged in, by fresh login or stored-cookie restore",
+    ["site", "method", "outcome"],
+    buckets=BUCKETS,
+)
+DOWNLOAD_WAIT = Histogram(
+    "scraper_download_wait_seconds",
+    "Time from starting to watch for an export until the file is complete",
+    ["outcome"],
+    buckets=BUCKETS,
+)
+JOB_DURATION = Histogram(
+    "scraper_job_duration_seconds",
+    "Run time of finished jobs",
+    ["kind", "status"],
+    buckets=BUCKETS,
+)
+JOB_QUEUE_WAIT = Histogram(
+    "scraper_job_queue_wait_seconds",
+    "Time jobs spent queued before a worker picked them up",
+    ["kind"],
+    buckets=BUCKETS,
+)
+TENANT_QUEUE_WAIT = Histogram(
+    "scraper_tenant_queue_wait_seconds",
+    "Time each tenant's jobs spent queued, by priority class",
+    ["tenant", "priority"],
+    buckets=BUCKETS,
+)
+REQUESTS = Counter(
+    "scraper_requests_total",
+    "Finished scraper requests per endpoint",
+    ["endpoint", "outcome"],
+)
+QUEUE_DEPTH = Gauge("scraper_queue_depth", "Jobs waiting for a scraper worker")
+ACTIVE_WORKERS = Gauge("scraper_active_workers", "Scraper workers currently running a job")
+
+_STEP_NUMBER = re.compile(r"^\s*(Step [\d.]+)")
+
+
+def step_label(message: str):
+    """'Step 7: Setting max rank value to 65...' -> 'Step 7' (None for other messages)."""
+    match = _STEP_NUMBER.match(message)
+    return match.group(1) if match else None
+
+
+def observe_steps(workflow: str, steps: list):
+    """Record finished ``{"name", "duration"}`` steps (the Job.steps format)."""
+    for s in steps:
+        label = step_label(s["name"])
+        if label and s["duration"] is not None:
+            STEP_DURATION.labels(workflow, label).observe(s["duration"])
+
+
+def observe_job(job):
+    """JobManager finish listener: per-endpoint outcome, run time, queue wait and step timings."""
+    outcome = "cache_hit" if job.cache_hit else ("success" if job.status == "succeeded" else "failure")
+    REQUESTS.labels(job.kind, outcome).inc()
+    if job.cache_hit or job.started_at is None:
+        return
+    JOB_QUEUE_WAIT.labels(job.kind).observe(job.started_at - job.created_at)
+    TENANT_QUEUE_WAIT.labels(job.tenant, job.priority).observe(job.started_at - job.created_at)
+    JOB_DURATION.labels(job.kind, job.status).observe(job.finished_at - job.started_at)
+    # Steps of parallel batches interleave across browsers, so their durations are not per-step
+    if not job.kind.endswith("/batch"):
+        observe_steps(job.kind, job.steps)
+
+
+def bind_job_manager(manager):
+    """Report the manager's queue depth and running workers on every scrape, and observe its jobs."""
+    QUEUE_DEPTH.set_function(lambda: manager.stats()["queued"])
+    ACTIVE_WORKERS.set_function(lambda: manager.stats()["running"])
+    manager.add_listener(observe_job)
+
+
+@contextmanager
+def time_steps(workflow: str):
+    """Time every ``step()`` this thread makes inside the block (for work that is not a Job)."""
+    current = {}
+
+    def on_step(message):
+        now = time.time()
+        _close(current, now)
+        current.update(label=step_label(message), started_at=now)
+
+    def _close(state, now):
+        if state.get("label"):
+            STEP_DURATION.labels(workflow, state["label"]).observe(now - state["started_at"])
+        state.clear()
+
+    with track_steps(on_step):
+        try:
+            yield
+        finally:
+            _close(current, time.time())
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the block's duration, labelled ``outcome="success"`` or ``"failure"`` (if it raised)."""
+    started = time.time()
+    outcome = "failure"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.time() - started)
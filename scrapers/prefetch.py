@@ -0,0 +1,181 @@
+"""
+Background refresh of the most requested exports, so popular queries are served
+from the cache instead of waiting for a cold scrape when their entry expires.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+def parse_window(text: str):
+    """``"01:00-06:00"`` -> (60, 360) minutes after midnight; empty means no window (always allowed).
+    A window may wrap past midnight (``"22:00-05:00"``)."""
+    if not text or not text.strip():
+        return None
+    start, end = (part.strip() for part in text.split("-", 1))
+
+    def minutes(hhmm: str) -> int:
+        hours, _, mins = hhmm.partition(":")
+        return int(hours) * 60 + int(mins or 0)
+
+    return minutes(start), minutes(end)
+
+
+def in_window(window, now: datetime = None) -> bool:
+    if window is None:
+        return True
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    start, end = window
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+class QueryTracker:
+    """Request counts per cache key that halve every ``half_life`` seconds, so the
+    ranking follows current traffic. ``payload`` is what is needed to re-run the
+    query (the latest one recorded is kept)."""
+
+    def __init__(self, half_life: float = 6 * 3600, max_keys: int = 1000):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._scores = {}  # key -> [score, updated_at, payload]
+
+    def record(self, key, payload):
+        now = time.time()
+        with self._lock:
+            entry = self._scores.get(key)
+            score = self._decayed(entry, now) if entry else 0.0
+            self._scores[key] = [score + 1, now, payload]
+            if len(self._scores) > 2 * self.max_keys:
+                # Drop the coldest half rather than trimming on every request
+                ranked = sorted(self._scores.items(), key=lambda kv: self._decayed(kv[1], now), reverse=True)
+                self._scores = dict(ranked[:self.max_keys])
+
+    def top(self, n: int) -> list:
+        """``(key, payload, score)`` of the ``n`` hottest keys, hottest first."""
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                ((key, entry[2], self._decayed(entry, now)) for key, entry in self._scores.items()),
+                key=lambda item: item[2],
+                reverse=True,
+            )
+        return ranked[:n]
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _decayed(self, entry, now: float) -> float:
+        score, updated_at, _ = entry
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+
+class Prefetcher:
+    """Every ``interval`` seconds, re-export the ``top_n`` hottest keys whose cache entry
+    is missing or expires within ``lead`` seconds.
+
+    Refreshes only start inside ``window`` (see parse_window) and while ``busy()`` is
+    false (no live request waiting), and at most ``budget`` run at once, so they
+    never take browsers that live requests are waiting for. A key whose refresh
+    failed is left alone for ``retry_after`` seconds. ``refresh(key, payload)``
+    starts one and returns its Job; ``ttl_left(key)`` reports the cache entry's
+    remaining lifetime (None when absent).
+    """
+
+    def __init__(self, tracker: QueryTracker, refresh, ttl_left, top_n: int = 10, budget: int = 1,
+                 lead: float = 120, interval: float = 60, window=None, busy=None, min_score: float = 2,
+                 retry_after: float = 900):
+        self.tracker = tracker
+        self.refresh = refresh
+        self.ttl_left = ttl_left
+        self.top_n = top_n
+        self.budget = max(1, budget)
+        self.lead = lead
+        self.interval = interval
+        self.window = window
+        self.busy = busy or (lambda: False)
+        self.min_score = min_score
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._failed_until = {}  # key -> time before which it is not retried
+        self._refreshed = 0
+        self._failed = 0
+        self._last_run = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prefetcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self) -> int:
+        """Start the refreshes that are due now; returns how many were started."""
+        self._last_run = time.time()
+        if not in_window(self.window):
+            return 0
+        started = 0
+        for key, payload, score in self.tracker.top(self.top_n):
+            if score < self.min_score:
+                break
+            with self._lock:
+                if len(self._in_flight) >= self.budget:
+                    break
+                if key in self._in_flight or self._failed_until.get(key, 0) > time.time():
+                    continue
+            left = self.ttl_left(key)
+            if left is not None and left > self.lead:
+                continue
+            # Checked per refresh: live requests that arrived meanwhile go first
+            if self.busy():
+                break
+            try:
+                job = self.refresh(key, payload)
+            except Exception as e:
+                print(f"⚠️ Prefetch of {key} not started: {e}")
+                break
+            with self._lock:
+                self._in_flight.add(key)
+            job.future.add_done_callback(lambda future, key=key: self._finished(key, future))
+            print(f"🔄 Prefetching {key} (score {score:.1f})")
+            started += 1
+        return started
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = [list(key) for key in self._in_flight]
+        return {
+            "tracked_keys": len(self.tracker),
+            "top": [{"key": list(key), "score": round(score, 2)} for key, _, score in self.tracker.top(self.top_n)],
+            "in_flight": in_flight,
+            "budget": self.budget,
+            "refreshed": self._refreshed,
+            "failed": self._failed,
+            "last_run": self._last_run,
+        }
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._in_flight.discard(key)
+            if future.exception() is None:
+                self._refreshed += 1
+                self._failed_until.pop(key, None)
+            else:
+                self._failed += 1
+                self._failed_until[key] = time.time() + self.retry_after
+                print(f"⚠️ Prefetch of {key} failed: {future.exception()}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Prefetch round failed: {e}")
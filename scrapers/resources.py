@@ -0,0 +1,32 @@
+import os
+
+# Rough resident size of one Chrome instance (browser + renderer + GPU processes)
+CHROME_RSS_MB = int(os.getenv("CHROME_RSS_MB", "400"))
+# Rough extra resident size of one more tab (renderer process) in a shared Chrome
+TAB_RSS_MB = int(os.getenv("TAB_RSS_MB", "120"))
+# Memory left untouched for the API process and the OS
+MEMORY_RESERVE_MB = int(os.getenv("MEMORY_RESERVE_MB", "512"))
+
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo in MB, or None where it cannot be read."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def max_browser_workers(cap: int = None, rss_mb: int = CHROME_RSS_MB, per_cpu: int = 1) -> int:
+    """How many extra browsers (or ``rss_mb`` tabs, ``per_cpu`` per CPU) this node can run
+    right now, bounded by CPUs and free RAM."""
+    limit = (os.cpu_count() or 1) * per_cpu
+    free_mb = available_memory_mb()
+    if free_mb is not None:
+        limit = min(limit, (free_mb - MEMORY_RESERVE_MB) // rss_mb)
+    if cap is not None:
+        limit = min(limit, cap)
+    return max(1, limit)
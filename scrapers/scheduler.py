@@ -0,0 +1,171 @@
+import hashlib
+import itertools
+import math
+import time
+
+# Interactive jobs (a caller holding the connection) start before bulk ones
+PRIORITIES = ("interactive", "bulk")
+
+
+def api_key_tenant(api_key: str) -> str:
+    """Tenant id for an API key that is safe to show in stats and metric labels."""
+    return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+def account_tenant(username: str) -> str:
+    """Tenant id for a site account (an e-mail address), hashed like api_key_tenant."""
+    return "user:" + hashlib.sha256(username.strip().lower().encode()).hexdigest()[:12]
+
+
+def parse_weights(text: str) -> dict:
+    """'alice@example.com=2,key:1a2b3c4d5e6f=3' -> {tenant: weight}.
+
+    Accounts may be given as the username or as its ``user:<hash>`` tenant id.
+    """
+    weights = {}
+    for part in (text or "").split(","):
+        if "=" in part:
+            tenant, weight = part.rsplit("=", 1)
+            tenant = tenant.strip()
+            weights[tenant] = float(weight)
+            if not tenant.startswith(("key:", "user:")):
+                weights[account_tenant(tenant)] = float(weight)
+    return weights
+
+
+class TokenBucket:
+    """``rate`` requests per second on average, with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.time()
+
+    def take(self) -> float:
+        """Spend a token; returns 0 on success, else the seconds until one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.burst
+
+    def _refill(self):
+        now = time.time()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class _Tenant:
+    def __init__(self, weight: float, bucket):
+        self.weight = weight
+        self.bucket = bucket
+        self.queued = 0
+        self.running = 0
+        self.last_finish = 0.0
+
+    def idle(self) -> bool:
+        return not self.queued and not self.running and (self.bucket is None or self.bucket.full())
+
+
+class FairScheduler:
+    """Order of waiting jobs across tenants (API keys or SmartScout accounts).
+
+    Start-time fair queuing: each job gets a virtual start tag after the previous
+    job of its tenant, spaced by ``cost / weight``, and jobs start in tag order. A
+    tenant with hundreds of queued jobs therefore takes turns with a tenant that
+    has one, and a tenant with weight 2 gets twice the turns. Interactive jobs go
+    before bulk ones. Optional hard limits per tenant: ``max_running`` jobs at
+    once, ``max_queued`` jobs waiting, and ``rate_per_minute`` submissions (token
+    bucket with ``burst``); ``0`` disables a limit.
+
+    Not thread-safe on its own; JobManager calls it while holding its lock.
+    """
+
+    def __init__(self, weights: dict = None, max_running: int = 0, max_queued: int = 0,
+                 rate_per_minute: float = 0, burst: int = 10):
+        self.weights = dict(weights or {})
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+
+        self._tenants = {}
+        self._waiting = []
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._waiting)
+
+    def refusal(self, tenant: str):
+        """Why ``tenant`` may not queue another job right now, as ``(message, retry_after)``, or None.
+
+        Spends one of the tenant's rate-limit tokens when the job is accepted. Only
+        tenants with jobs or a spent bucket are tracked, so callers that are turned
+        away (e.g. rotating API keys) do not grow the tenant table.
+        """
+        self._forget_idle()
+        state = self._tenants.get(tenant)
+        if state is None:
+            if not self.rate_per_minute:
+                return None
+            # A new tenant has a full bucket; keep it so the token spent below counts
+            state = self._tenant(tenant)
+        if self.max_queued and state.queued >= self.max_queued:
+            return f"Tenant {tenant} already has {state.queued} jobs waiting", None
+        if state.bucket is not None:
+            wait = state.bucket.take()
+            if wait:
+                return f"Tenant {tenant} is over {self.rate_per_minute:g} requests per minute", max(1, math.ceil(wait))
+        return None
+
+    def add(self, job):
+        state = self._tenant(job.tenant)
+        start = max(self._virtual_time, state.last_finish)
+        state.last_finish = start + job.cost / state.weight
+        state.queued += 1
+        job.sort_key = (PRIORITIES.index(job.priority), start, next(self._seq))
+        self._waiting.append(job)
+
+    def candidates(self):
+        """Waiting jobs in the order they should start, skipping tenants at their running cap."""
+        for job in sorted(self._waiting, key=lambda j: j.sort_key):
+            if not self.max_running or self._tenants[job.tenant].running < self.max_running:
+                yield job
+
+    def start(self, job):
+        self._waiting.remove(job)
+        state = self._tenants[job.tenant]
+        state.queued -= 1
+        state.running += 1
+        self._virtual_time = max(self._virtual_time, job.sort_key[1])
+
+    def finish(self, job):
+        state = self._tenants[job.tenant]
+        state.running -= 1
+        if state.idle():
+            del self._tenants[job.tenant]
+
+    def stats(self) -> dict:
+        return {
+            tenant: {"weight": state.weight, "queued": state.queued, "running": state.running}
+            for tenant, state in self._tenants.items()
+        }
+
+    def _forget_idle(self):
+        """Drop idle tenants (nothing queued or running, full bucket) so the table does not grow
+        with every caller ever seen."""
+        for tenant in [t for t, state in self._tenants.items() if state.idle()]:
+            del self._tenants[tenant]
+
+    def _tenant(self, tenant: str) -> _Tenant:
+        state = self._tenants.get(tenant)
+        if state is None:
+            bucket = TokenBucket(self.rate_per_minute / 60, self.burst) if self.rate_per_minute else None
+            state = self._tenants[tenant] = _Tenant(self.weights.get(tenant, 1.0), bucket)
+        return state
@@ -1,18 +1,42 @@
 # scrapper/smartscout/auth.py
 import os
-import pickle
 import time
 from pathlib import Path
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from ..driver_pool import DriverPool
+from ..tabs import TabMultiplexer
+from ..downloads import enable_download_events
+from ..blocking import apply_blocking_prefs, block_resources
+from ..resources import CHROME_RSS_MB, TAB_RSS_MB, max_browser_workers
+from ..chromedriver import get_chrome_service
+from ..waits import PageWaiter
+from ..metrics import DRIVER_LAUNCH, SESSION_SETUP, timed
+from .sessions import SessionStore
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
-COOKIES_PATH = PROJECT_ROOT / "data" / "smartscout_cookies.pkl"
+SESSIONS_DIR = Path(os.getenv("SMARTSCOUT_SESSIONS_DIR", PROJECT_ROOT / "data" / "smartscout_sessions"))
+# Overridable so the workflows can run against a local mock site (benchmarks/)
+BASE_URL = os.getenv("SMARTSCOUT_BASE_URL", "https://app.smartscout.com").rstrip("/")
+HOME_URL = f"{BASE_URL}/app/home"
+SIGNIN_URL = f"{BASE_URL}/sessions/signin"
+
+# Per-account cookies, kept in memory and persisted atomically to SESSIONS_DIR.
+# Their expiry comes from the auth cookies only (HttpOnly ones unless named here)
+AUTH_COOKIES = [name.strip() for name in os.getenv("SMARTSCOUT_AUTH_COOKIES", "").split(",") if name.strip()]
+SESSION_STORE = SessionStore(SESSIONS_DIR, auth_cookies=AUTH_COOKIES)
+
+# Warm driver pool shared by every SmartScout export
+POOL_SIZE = int(os.getenv("SMARTSCOUT_POOL_SIZE", "3"))
+POOL_MAX_JOBS = int(os.getenv("SMARTSCOUT_POOL_MAX_JOBS", "25"))
+# Jobs served as tabs of one pooled browser per account (1 = a browser per job)
+TABS_PER_BROWSER = int(os.getenv("SMARTSCOUT_TABS_PER_BROWSER", "1"))
+# SmartScout jobs that can run at once, and the memory each one adds
+MAX_PARALLEL_JOBS = POOL_SIZE * max(1, TABS_PER_BROWSER)
+JOB_RSS_MB = TAB_RSS_MB if TABS_PER_BROWSER > 1 else CHROME_RSS_MB
 
 def get_chrome_driver(headless=True, download_dir=None):
     """Create a Chrome driver instance - SIMPLIFIED"""
@@ -38,15 +62,24 @@ def get_chrome_driver(headless=True, download_dir=None):
         }
         options.add_experimental_option("prefs", prefs)
     
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), 
-        options=options
-    )
+    # Let the download watcher see CDP download progress events
+    enable_download_events(options)
+    # Skip fonts, media and trackers (images stay on: export buttons are icons)
+    apply_blocking_prefs(options, "smartscout")
+    
+    with timed(DRIVER_LAUNCH, site="smartscout"):
+        driver = webdriver.Chrome(
+            service=get_chrome_service(),
+            options=options
+        )
+    block_resources(driver, "smartscout")
+    return driver
 
 def login_and_save_cookies(driver, username, password):
     """Perform fresh login and save cookies for next time."""
     wait = WebDriverWait(driver, 25)
-    driver.get("https://app.smartscout.com/sessions/signin")
+    started = time.time()
+    driver.get(SIGNIN_URL)
     
     try:
         wait.until(EC.presence_of_element_located((By.ID, "username")))
@@ -57,59 +90,150 @@ def login_and_save_cookies(driver, username, password):
         
         # Wait for home page with longer timeout for login
         wait.until(EC.url_contains("/app/home"))
-        time.sleep(5) # Wait for page to fully load
+        PageWaiter(driver, timeout=15).settle(label="home_after_login")
         
-        COOKIES_PATH.parent.mkdir(exist_ok=True)
-        pickle.dump(driver.get_cookies(), open(COOKIES_PATH, "wb"))
-        print("✅ Fresh login successful, cookies saved.")
+        SESSION_STORE.save(username, driver.get_cookies())
+        SESSION_SETUP.labels("smartscout", "login", "success").observe(time.time() - started)
+        print(f"✅ Fresh login successful, session saved for {username}.")
     except Exception as e:
+        SESSION_SETUP.labels("smartscout", "login", "failure").observe(time.time() - started)
         print(f"❌ Login failed: {e}")
         raise e
 
+def restore_session(driver, cookies):
+    """Load stored cookies into the browser and report whether /app/home stays logged in."""
+    started = time.time()
+    try:
+        # CDP can set cookies before the first navigation, saving a page load
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [_to_cdp_cookie(c) for c in cookies]})
+        driver.get(HOME_URL)
+    except Exception:
+        driver.get(HOME_URL) # Need to be on domain to set cookies
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass
+        # Refresh to apply cookies
+        driver.refresh()
+    
+    PageWaiter(driver, timeout=15).settle(label="session_restore")
+    restored = "/app/home" in driver.current_url
+    SESSION_SETUP.labels("smartscout", "cookie_restore", "success" if restored else "rejected").observe(time.time() - started)
+    return restored
+
 def get_authenticated_driver(headless=True, username=None, password=None, download_dir=None):
-    """Return a driver that is already logged in, reusing cookies if possible."""
+    """Return a driver that is already logged in, reusing the account's stored session if possible."""
     driver = get_chrome_driver(headless=headless, download_dir=download_dir)
-    wait = WebDriverWait(driver, 15)
     
     try:
-        if COOKIES_PATH.exists():
-            print("🍪 Attempting to reuse existing cookies...")
-            driver.get("https://app.smartscout.com/app/home") # Need to be on domain to set cookies
-            
-            cookies = pickle.load(open(COOKIES_PATH, "rb"))
-            for cookie in cookies:
-                try:
-                    driver.add_cookie(cookie)
-                except Exception:
-                    pass
-            
-            # Refresh to apply cookies
-            driver.refresh()
-            time.sleep(5)
-            
-            # Check if we are actually logged in
-            if "/app/home" in driver.current_url:
+        cookies = SESSION_STORE.get(username)
+        if cookies:
+            print(f"🍪 Reusing stored session for {username}...")
+            if restore_session(driver, cookies):
                 print("✅ Session restored from cookies.")
                 return driver
-            else:
-                print("⚠️ Cookies expired or invalid.")
+            print("⚠️ Cookies expired or invalid.")
+            SESSION_STORE.invalidate(username)
         
         # If no cookies or expired, perform fresh login
         if not username or not password:
-            driver.quit()
             raise ValueError("Username and password required for login")
         
-        print("🔑 Performing fresh login...")
-        login_and_save_cookies(driver, username, password)
-        
-    except Exception as e:
-        print(f"⚠️ Auth error: {e}")
-        # Try login one more time if it fails
-        if username and password:
+        with SESSION_STORE.login_lock(username):
+            # Another job may have logged this account in while we waited
+            cookies = SESSION_STORE.get(username)
+            if cookies and restore_session(driver, cookies):
+                print("✅ Session restored from a concurrent login.")
+                return driver
+            
+            print("🔑 Performing fresh login...")
             try:
                 login_and_save_cookies(driver, username, password)
-            except Exception:
-                driver.quit()
-                raise e
+            except Exception as e:
+                print(f"⚠️ Auth error: {e}")
+                # Try login one more time if it fails
+                login_and_save_cookies(driver, username, password)
     
-    return driver
\ No newline at end of file
+    except Exception:
+        driver.quit()
+        raise
+    
+    return driver
+
+
+def _to_cdp_cookie(cookie):
+    """Convert a Selenium cookie dict to a CDP Network.CookieParam."""
+    param = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ".smartscout.com"),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        param["sameSite"] = cookie["sameSite"]
+    if "expiry" in cookie:
+        param["expires"] = cookie["expiry"]
+    return param
+
+
+def is_session_alive(driver):
+    """Health check for pooled drivers: the session must still land on /app/home."""
+    driver.get(HOME_URL)
+    return "/app/home" in driver.current_url
+
+
+SMARTSCOUT_POOL = DriverPool(
+    factory=get_authenticated_driver,
+    health_check=is_session_alive,
+    size=POOL_SIZE,
+    max_jobs=POOL_MAX_JOBS,
+    name="SmartScout driver"
+)
+
+SMARTSCOUT_TABS = TabMultiplexer(
+    SMARTSCOUT_POOL,
+    tabs_per_browser=TABS_PER_BROWSER,
+    on_new_tab=lambda tab: block_resources(tab, "smartscout"),
+    name="SmartScout tab"
+) if TABS_PER_BROWSER > 1 else None
+
+
+def checkout_driver(username, password, download_dir=None):
+    """Take a logged-in driver for ``username`` from the pool (launching one if needed);
+    with SMARTSCOUT_TABS_PER_BROWSER > 1 it is a new tab of a shared browser."""
+    source = SMARTSCOUT_TABS if SMARTSCOUT_TABS is not None else SMARTSCOUT_POOL
+    return source.checkout(
+        username,
+        headless=True,
+        username=username,
+        password=password,
+        download_dir=download_dir
+    )
+
+
+def checkin_driver(driver, discard=False):
+    """Hand a driver back to the pool (closing its tab) once the job is done with it."""
+    if SMARTSCOUT_TABS is not None and SMARTSCOUT_TABS.owns(driver):
+        SMARTSCOUT_TABS.checkin(driver, discard=discard)
+    else:
+        SMARTSCOUT_POOL.checkin(driver, discard=discard)
+
+
+def max_parallel_jobs() -> int:
+    """SmartScout jobs this node can start right now (browsers, or tabs when multiplexing)."""
+    return max_browser_workers(cap=MAX_PARALLEL_JOBS, rss_mb=JOB_RSS_MB, per_cpu=max(1, TABS_PER_BROWSER))
+
+
+def warm_pool(username, password, count=POOL_SIZE, download_dir=None):
+    """Pre-launch logged-in drivers so the first requests skip browser startup."""
+    return SMARTSCOUT_POOL.warm(
+        username,
+        count,
+        headless=True,
+        username=username,
+        password=password,
+        download_dir=download_dir
+    )
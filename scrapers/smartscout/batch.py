@@ -0,0 +1,259 @@
+# scrapper/smartscout/batch.py
+import csv
+import io
+import os
+import queue
+import threading
+import time
+import traceback
+import zipfile
+from datetime import datetime
+
+from .auth import checkout_driver, checkin_driver, max_parallel_jobs
+from ..waits import PageWaiter
+from ..steps import current_listeners, inherit_steps
+from ..jobs import granted_slots
+from ..downloads import create_job_download_dir, remove_job_download_dir
+
+
+# Extra attempts per input before it is reported as failed
+BATCH_RETRIES = int(os.getenv("SMARTSCOUT_BATCH_RETRIES", "1"))
+
+
+class BatchResults(list):
+    """Per-input results in input order, plus run statistics in ``stats``."""
+
+    def __init__(self, items, stats: dict):
+        super().__init__(items)
+        self.stats = stats
+
+
+def run_batch_session(prefix: str, inputs: list, username: str, password: str, output_path: str,
+                      open_tool, export_item, workers: int = None, retries: int = BATCH_RETRIES) -> BatchResults:
+    """Export many inputs across one or more logged-in browsers.
+
+    ``open_tool(driver, waiter)`` navigates to the tool page once per browser;
+    ``export_item(driver, waiter, query, output_path, job_dir)`` re-applies the
+    search/filter for one input and returns its result dict.
+
+    Inputs go into one shared queue that ``workers`` browsers (default: as many as
+    CPU, free RAM and the driver pool allow; never more than admission granted the
+    running job) pull from until it is empty, so a slow
+    browser never holds up work a free one could take. A failed input is queued
+    again up to ``retries`` times (possibly landing on another browser) and the
+    failing browser reopens the tool page, or is replaced if that fails too.
+    Results come back in input order; an input that never succeeded is recorded as
+    ``{"status": "failed", "error": ...}``.
+    """
+    if workers is None:
+        workers = max_parallel_jobs()
+    granted = granted_slots()
+    if granted:
+        workers = min(workers, granted)
+    workers = max(1, min(workers, len(inputs)))
+
+    run = _BatchRun(prefix, inputs, username, password, output_path, open_tool, export_item, retries)
+    started = time.time()
+    if workers == 1:
+        run.worker(1)
+    else:
+        print(f"🚀 Batch {prefix}: {len(inputs)} inputs across {workers} browsers")
+        threads = [
+            threading.Thread(target=run.worker, args=(n,), name=f"{prefix}-batch-{n}", daemon=True)
+            for n in range(1, workers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.time() - started
+
+    results = run.collect()
+    succeeded = sum(1 for item in results if item["status"] == "success")
+    stats = {
+        "workers": workers,
+        "items": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "retries": run.retried,
+        "elapsed_seconds": round(elapsed, 1),
+        "items_per_minute": round(succeeded / elapsed * 60, 2) if elapsed > 0 else None,
+    }
+    print(f"📊 Batch {prefix}: {succeeded}/{len(results)} in {stats['elapsed_seconds']}s "
+          f"({stats['items_per_minute']} items/min, {workers} browsers)")
+    return BatchResults(results, stats)
+
+
+class _BatchRun:
+    """Shared state of one batch: the work queue and the ordered result slots."""
+
+    def __init__(self, prefix, inputs, username, password, output_path, open_tool, export_item, retries):
+        self.prefix = prefix
+        self.inputs = list(inputs)
+        self.username = username
+        self.password = password
+        self.output_path = output_path
+        self.open_tool = open_tool
+        self.export_item = export_item
+        self.retries = max(0, retries)
+        self.retried = 0
+        self.results = [None] * len(self.inputs)
+        self.errors = {}
+        self.session_error = None
+        self.pending = queue.Queue()
+        for index, query in enumerate(self.inputs):
+            self.pending.put((index, query, 0))
+        self.listeners = current_listeners()
+        self._lock = threading.Lock()
+
+    def worker(self, worker_no: int):
+        driver = waiter = job_dir = None
+        with inherit_steps(self.listeners):
+            try:
+                while True:
+                    try:
+                        index, query, attempt = self.pending.get_nowait()
+                    except queue.Empty:
+                        return
+
+                    if driver is None:
+                        try:
+                            driver, waiter, job_dir = self._open_session()
+                        except Exception as e:
+                            # Leave the input to a browser that still has a session
+                            print(f"  ❌ Batch browser {worker_no} could not start: {e}")
+                            self.session_error = e
+                            self.pending.put((index, query, attempt))
+                            return
+
+                    print(f"📦 [{worker_no}] Batch item {index + 1}/{len(self.inputs)}: '{query}'")
+                    try:
+                        result = self.export_item(driver, waiter, query, self.output_path, job_dir)
+                        result["input"] = query
+                        result["attempts"] = attempt + 1
+                        self.results[index] = result
+                        continue
+                    except Exception as e:
+                        print(f"  ❌ '{query}' failed (attempt {attempt + 1}): {e}\n{traceback.format_exc()}")
+                        self.errors[index] = str(e)
+                        if attempt < self.retries:
+                            with self._lock:
+                                self.retried += 1
+                            self.pending.put((index, query, attempt + 1))
+
+                    # Start the next item from a clean page, or a fresh browser
+                    try:
+                        self.open_tool(driver, waiter)
+                    except Exception as e:
+                        print(f"  ⚠️ Could not reopen {self.prefix} in browser {worker_no}, replacing it: {e}")
+                        self._close_session(driver, job_dir, discard=True)
+                        driver = waiter = job_dir = None
+            finally:
+                if driver is not None:
+                    self._close_session(driver, job_dir)
+
+    def collect(self) -> list:
+        results = []
+        for index, query in enumerate(self.inputs):
+            result = self.results[index]
+            if result is None:
+                error = self.errors.get(index)
+                if error is None:
+                    error = f"Session lost: {self.session_error}" if self.session_error else "Not processed"
+                result = {"status": "failed", "input": query, "error": error}
+            results.append(result)
+        return results
+
+    def _open_session(self):
+        driver = checkout_driver(self.username, self.password, download_dir=self.output_path)
+        job_dir = None
+        try:
+            job_dir = create_job_download_dir(self.output_path, driver, prefix=f"{self.prefix}_batch")
+            waiter = PageWaiter(driver, timeout=25)
+            self.open_tool(driver, waiter)
+            return driver, waiter, job_dir
+        except Exception:
+            self._close_session(driver, job_dir, discard=True)
+            raise
+
+    def _close_session(self, driver, job_dir, discard: bool = False):
+        remove_job_download_dir(job_dir)
+        checkin_driver(driver, discard=discard)
+
+
+def package_batch_results(prefix: str, results: list, output_path: str, output: str = "zip") -> dict:
+    """Bundle per-item results into one file.
+
+    ``zip``: every CSV plus ``batch_status.csv``. ``csv``: all rows merged into one CSV
+    with ``batch_input``/``batch_status`` columns (failed inputs get a single status row).
+    The per-item CSVs are removed once packaged.
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if output == "csv":
+        new_filename = f"{prefix}_batch_{timestamp}.csv"
+        final_file_path = os.path.join(output_path, new_filename)
+        _merge_csvs(results, final_file_path)
+        media_type = "text/csv"
+    else:
+        new_filename = f"{prefix}_batch_{timestamp}.zip"
+        final_file_path = os.path.join(output_path, new_filename)
+        _zip_csvs(results, final_file_path)
+        media_type = "application/zip"
+
+    for item in results:
+        if item.get("file_path") and os.path.exists(item["file_path"]):
+            os.remove(item["file_path"])
+
+    succeeded = sum(1 for item in results if item["status"] == "success")
+    return {
+        "status": "success" if succeeded else "failed",
+        "message": f"Batch export: {succeeded}/{len(results)} inputs succeeded",
+        "file_path": final_file_path,
+        "file_name": new_filename,
+        "file_size": os.path.getsize(final_file_path),
+        "media_type": media_type,
+        "timestamp": datetime.now().isoformat(),
+        "items": [
+            {"input": item["input"], "status": item["status"], "file_name": item.get("file_name"), "error": item.get("error")}
+            for item in results
+        ],
+        "batch_stats": getattr(results, "stats", None),
+    }
+
+
+def _zip_csvs(results: list, zip_path: str):
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        status_rows = [["input", "status", "file_name", "error"]]
+        for item in results:
+            if item["status"] == "success":
+                archive.write(item["file_path"], item["file_name"])
+            status_rows.append([item["input"], item["status"], item.get("file_name") or "", item.get("error") or ""])
+        archive.writestr("batch_status.csv", _rows_to_csv(status_rows))
+
+
+def _merge_csvs(results: list, merged_path: str):
+    header = None
+    merged_rows = []
+    for item in results:
+        if item["status"] != "success":
+            merged_rows.append({"batch_input": item["input"], "batch_status": f"failed: {item.get('error')}"})
+            continue
+        with open(item["file_path"], newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            if header is None:
+                header = list(reader.fieldnames or [])
+            for row in reader:
+                row.update({"batch_input": item["input"], "batch_status": "success"})
+                merged_rows.append(row)
+
+    fieldnames = ["batch_input", "batch_status"] + (header or [])
+    with open(merged_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(merged_rows)
+
+
+def _rows_to_csv(rows: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
@@ -0,0 +1,254 @@
+# scrapper/smartscout/http_export.py
+"""
+Browserless export engine: replay SmartScout's data API with the account's session
+cookies and write the CSV ourselves, instead of driving ag-grid through the UI.
+"""
+import csv
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+
+import urllib3
+
+from .auth import BASE_URL, SESSION_STORE, checkout_driver, checkin_driver
+
+# "browser" (default), "http" (HTTP only) or "auto" (HTTP, falling back to the browser)
+EXPORT_ENGINE = os.getenv("SMARTSCOUT_EXPORT_ENGINE", "browser").lower()
+API_BASE = os.getenv("SMARTSCOUT_API_BASE", f"{BASE_URL}/api").rstrip("/")
+PAGE_SIZE = int(os.getenv("SMARTSCOUT_API_PAGE_SIZE", "500"))
+MAX_PAGES = int(os.getenv("SMARTSCOUT_API_MAX_PAGES", "200"))
+
+# Data endpoints behind each tool's grid. Paths/bodies can be overridden with a JSON
+# file (SMARTSCOUT_API_ROUTES) so they can follow recorded traffic without a code change.
+API_ROUTES = {
+    "niche_finder": {
+        "method": "POST",
+        "path": "/subcategories/niche-finder",
+        "body": lambda q, max_rank: {"filter": {"subcategory": {"type": "contains", "filter": q}}},
+    },
+    "rank_maker": {
+        "method": "POST",
+        "path": "/keyword-tools/rank-maker",
+        "body": lambda q, max_rank: {"asin": q, "filter": {"latestRank": {"max": max_rank}}},
+    },
+    "product_search": {
+        "method": "POST",
+        "path": "/market-research/products",
+        "body": lambda q, max_rank: {"keywords": q, "filter": {"mainCategoryRank": {"max": max_rank}}},
+    },
+}
+
+# API field -> column header of the tool's UI export, so both engines produce the same
+# CSV (the cache's rank filter and the history index read these headers). Fields not
+# listed get a title-cased header (``monthlyRevenue`` -> ``Monthly Revenue``); a
+# "columns" object per tool in SMARTSCOUT_API_ROUTES adds to or overrides these.
+API_COLUMNS = {
+    "niche_finder": {
+        "subcategoryName": "Subcategory",
+        "avgPrice": "Avg. Price",
+        "avgReviews": "Avg. Reviews",
+        "avgRating": "Avg. Rating",
+    },
+    "rank_maker": {
+        "keyword": "Keyword",
+        "latestRank": "Latest Rank",
+        "asin": "ASIN",
+    },
+    "product_search": {
+        "asin": "ASIN",
+        "mainCategoryRank": "Main Category Rank",
+        "subcategoryName": "Subcategory",
+    },
+}
+# Words kept upper-case in derived headers
+ACRONYMS = {"asin": "ASIN", "bsr": "BSR", "upc": "UPC", "ttm": "TTM", "id": "ID"}
+
+# Keys under which the API may return the row list
+ROW_KEYS = ("data", "rows", "items", "results")
+
+# One pooled, thread-safe HTTP client for every export
+HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=int(os.getenv("SMARTSCOUT_API_POOL_SIZE", "8")),
+    retries=urllib3.Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504)),
+    timeout=urllib3.Timeout(connect=5, read=60),
+)
+
+
+class HttpExportError(Exception):
+    """The data API could not produce an export (caller should fall back to the browser)."""
+
+
+class SessionRejectedError(HttpExportError):
+    """The data API refused the stored session cookies."""
+
+
+def _load_route_overrides():
+    path = os.getenv("SMARTSCOUT_API_ROUTES")
+    if not path:
+        return
+    with open(path) as f:
+        overrides = json.load(f)
+    for tool, override in overrides.items():
+        route = API_ROUTES.setdefault(tool, {})
+        route.update({k: v for k, v in override.items() if k in ("method", "path")})
+        API_COLUMNS.setdefault(tool, {}).update(override.get("columns", {}))
+        if "body" in override:
+            # Template: "{query}" and "{max_rank}" placeholders in string values
+            template = override["body"]
+            route["body"] = lambda q, max_rank, t=template: _fill_template(t, q, max_rank)
+
+
+def _fill_template(value, query, max_rank):
+    if isinstance(value, dict):
+        return {k: _fill_template(v, query, max_rank) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill_template(v, query, max_rank) for v in value]
+    if value == "{max_rank}":
+        return max_rank
+    if isinstance(value, str):
+        return value.replace("{query}", query)
+    return value
+
+
+_load_route_overrides()
+
+
+def http_engine_enabled() -> bool:
+    return EXPORT_ENGINE in ("http", "auto")
+
+
+def get_session_cookies(username: str, password: str) -> list:
+    """Cookies of a logged-in session: from the session store, or by logging a pooled driver in."""
+    cookies = SESSION_STORE.get(username)
+    if cookies:
+        return cookies
+    driver = checkout_driver(username, password)
+    try:
+        return driver.get_cookies()
+    finally:
+        checkin_driver(driver)
+
+
+def fetch_rows(tool: str, query: str, cookies: list, max_rank: int = None) -> list:
+    """Page through the tool's data endpoint and return every row as a dict."""
+    route = API_ROUTES[tool]
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Cookie": "; ".join(f"{c['name']}={c['value']}" for c in cookies),
+        "X-Requested-With": "XMLHttpRequest",
+    }
+    rows = []
+    for page in range(MAX_PAGES):
+        body = dict(route["body"](query, max_rank))
+        body.update({"page": page, "pageSize": PAGE_SIZE})
+        response = HTTP.request(
+            route["method"],
+            f"{API_BASE}{route['path']}",
+            body=json.dumps(body).encode(),
+            headers=headers,
+        )
+        if response.status in (401, 403):
+            raise SessionRejectedError(f"Session rejected by data API ({response.status})")
+        if response.status != 200:
+            raise HttpExportError(f"Data API returned {response.status} for {route['path']}")
+        try:
+            payload = json.loads(response.data)
+        except ValueError as e:
+            raise HttpExportError(f"Data API returned invalid JSON: {e}")
+
+        batch = _extract_rows(payload)
+        rows.extend(batch)
+        if len(batch) < PAGE_SIZE:
+            break
+    return rows
+
+
+def column_title(tool: str, field: str) -> str:
+    """Header the tool's UI export uses for API ``field``."""
+    mapped = API_COLUMNS.get(tool, {}).get(field)
+    if mapped:
+        return mapped
+    words = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", field).replace("_", " ").split()
+    return " ".join(ACRONYMS.get(w.lower(), w[:1].upper() + w[1:]) for w in words)
+
+
+def write_csv(rows: list, file_path: str, tool: str = None):
+    """Write dict rows to CSV, columns in order of first appearance, headed like the
+    tool's UI export."""
+    fields = []
+    for row in rows:
+        for key in row:
+            if key not in fields:
+                fields.append(key)
+    titles = {field: column_title(tool, field) for field in fields}
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[titles[field] for field in fields])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                titles[k]: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()
+            })
+
+
+def export_via_http(tool: str, query: str, username: str, password: str, output_path: str, max_rank: int = None,
+                    extra: dict = None) -> dict:
+    """Produce the same result dict as the Selenium workflows, without a browser.
+
+    ``extra`` is the workflow's ``message`` and tool-specific fields (Workflow.result).
+    """
+    print(f"⚡ HTTP export: {tool} '{query}'")
+    cookies = get_session_cookies(username, password)
+    try:
+        rows = fetch_rows(tool, query, cookies, max_rank)
+    except SessionRejectedError:
+        # Stale cookies: make the next attempt log in again
+        SESSION_STORE.invalidate(username)
+        raise
+
+    safe_query = query.replace(' ', '_').replace('/', '_')
+    # Same naming as workflow.CollectDownload, random id included
+    new_filename = f"{tool}_{safe_query}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.csv"
+    final_file_path = os.path.join(output_path, new_filename)
+    write_csv(rows, final_file_path, tool)
+    print(f"  ✅ Wrote {len(rows)} rows to {final_file_path}")
+
+    extra = dict(extra or {"message": f"HTTP export completed for '{query}'"})
+    result = {
+        "status": "success",
+        "message": extra.pop("message"),
+        "file_path": final_file_path,
+        "file_name": new_filename,
+        "file_size": os.path.getsize(final_file_path),
+        "timestamp": datetime.now().isoformat(),
+    }
+    result.update(extra)
+    result.update({"engine": "http", "rows": len(rows)})
+    return result
+
+
+def try_http_export(tool: str, query: str, username: str, password: str, output_path: str, max_rank: int = None,
+                    extra: dict = None):
+    """Run the HTTP engine when enabled. Returns None if disabled or (in auto mode) it failed."""
+    if not http_engine_enabled():
+        return None
+    try:
+        return export_via_http(tool, query, username, password, output_path, max_rank, extra)
+    except Exception as e:
+        if EXPORT_ENGINE == "http":
+            raise
+        print(f"⚠️ HTTP export failed, falling back to browser: {e}")
+        return None
+
+
+def _extract_rows(payload):
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in ROW_KEYS:
+            if isinstance(payload.get(key), list):
+                return payload[key]
+    raise HttpExportError("Unrecognised data API response shape")
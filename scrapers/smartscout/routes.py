@@ -0,0 +1,126 @@
+# scrapper/smartscout/routes.py
+"""
+Direct URLs of the SmartScout tool pages, so a workflow reaches its tool with one
+navigation instead of loading the home page and clicking through the side menu.
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+from selenium.common.exceptions import TimeoutException
+
+from .auth import BASE_URL
+from ..steps import step
+from ..workflow import Step, run_steps
+
+# Seconds to wait for the tool page after a direct navigation before using the menu
+DEEP_LINK_TIMEOUT = float(os.getenv("SMARTSCOUT_DEEP_LINK_TIMEOUT", "10"))
+# "0" always navigates through the menus
+DEEP_LINKS_ENABLED = os.getenv("SMARTSCOUT_DEEP_LINKS", "1") != "0"
+# After this many direct URL failures in a row a tool uses the menu, and tries its
+# URL again once DEEP_LINK_COOLDOWN seconds have passed since the last failure
+DEEP_LINK_MAX_FAILURES = int(os.getenv("SMARTSCOUT_DEEP_LINK_MAX_FAILURES", "3"))
+DEEP_LINK_COOLDOWN = float(os.getenv("SMARTSCOUT_DEEP_LINK_COOLDOWN", "600"))
+
+# Page behind each tool. "params" are fixed query-string values (e.g. which tab is
+# open); "filters" are query-string values filled from the export ("{query}" and
+# "{max_rank}" placeholders) for tools whose grid filters can be set from the URL.
+# Overridable with a JSON file (SMARTSCOUT_PAGE_ROUTES) when SmartScout moves a page.
+PAGE_ROUTES = {
+    "niche_finder": {"path": "/app/subcategories", "params": {"tab": "niche-finder"}, "filters": {}},
+    "rank_maker": {"path": "/app/rank-maker", "params": {}, "filters": {}},
+    "product_search": {"path": "/app/products", "params": {}, "filters": {}},
+}
+
+# tool -> (consecutive direct URL failures, time of the last one)
+_failures = {}
+_failures_lock = threading.Lock()
+
+
+def _load_route_overrides():
+    path = os.getenv("SMARTSCOUT_PAGE_ROUTES")
+    if not path:
+        return
+    with open(path) as f:
+        overrides = json.load(f)
+    for tool, override in overrides.items():
+        route = PAGE_ROUTES.setdefault(tool, {"path": None, "params": {}, "filters": {}})
+        route.update({k: v for k, v in override.items() if k in ("path", "params", "filters")})
+
+
+_load_route_overrides()
+
+
+def tool_url(tool: str, query: str = None, max_rank: int = None):
+    """Direct URL of ``tool``'s page (with filter state when given), or None if it has none."""
+    route = PAGE_ROUTES.get(tool)
+    if not route or not route.get("path"):
+        return None
+    params = dict(route.get("params") or {})
+    if query is not None:
+        for name, template in (route.get("filters") or {}).items():
+            params[name] = str(template).replace("{query}", query).replace("{max_rank}", str(max_rank))
+    url = f"{BASE_URL}{route['path']}"
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def deep_link_usable(tool: str) -> bool:
+    """False while ``tool``'s direct URL is cooling down after repeated failures."""
+    with _failures_lock:
+        count, last = _failures.get(tool, (0, 0.0))
+    return count < DEEP_LINK_MAX_FAILURES or time.time() - last >= DEEP_LINK_COOLDOWN
+
+
+def record_deep_link(tool: str, ok: bool):
+    with _failures_lock:
+        if ok:
+            _failures.pop(tool, None)
+        else:
+            count, _ = _failures.get(tool, (0, 0.0))
+            _failures[tool] = (count + 1, time.time())
+
+
+def open_tool_page(driver, waiter, tool: str, title: str, ready, via_menu,
+                   query: str = None, max_rank: int = None, grid: bool = False):
+    """Navigate straight to ``tool``'s page and wait for ``ready``; fall back to ``via_menu(driver, waiter)``.
+
+    A tool whose direct URL fails ``DEEP_LINK_MAX_FAILURES`` times in a row goes
+    through the menu for ``DEEP_LINK_COOLDOWN`` seconds, so a moved page costs a few
+    timeouts rather than one per job, while a one-off slow load costs nothing.
+    """
+    url = tool_url(tool, query, max_rank) if DEEP_LINKS_ENABLED and deep_link_usable(tool) else None
+    if url is None:
+        return via_menu(driver, waiter)
+
+    step(f"Step 1: Opening {title} directly...")
+    driver.get(url)
+    try:
+        waiter.visible(ready, timeout=DEEP_LINK_TIMEOUT, label=f"{tool}_deep_link")
+    except TimeoutException:
+        print(f"  ⚠️ {url} did not open {title}, using the menu instead")
+        record_deep_link(tool, ok=False)
+        return via_menu(driver, waiter)
+    record_deep_link(tool, ok=True)
+    waiter.settle(label=f"{tool}_page", grid=grid)
+    print(f"  ✅ {title} opened")
+
+
+class OpenTool(Step):
+    """Workflow step: open ``tool``'s page by its direct URL, running the ``via_menu`` steps if that fails."""
+
+    def __init__(self, tool: str, title: str, ready, via_menu, grid: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.tool = tool
+        self.title = title
+        self.ready = ready
+        self.via_menu = list(via_menu)
+        self.grid = grid
+
+    def run(self, driver, waiter, ctx):
+        open_tool_page(
+            driver, waiter, self.tool, self.title, self.ready,
+            lambda d, w: run_steps(d, w, self.via_menu, ctx),
+            query=ctx.query, max_rank=ctx.max_rank, grid=self.grid,
+        )
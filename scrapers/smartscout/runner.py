@@ -0,0 +1,90 @@
+# scrapper/smartscout/runner.py
+"""
+Runs SmartScout workflow definitions: the HTTP engine first when enabled, then a
+pooled logged-in browser with a private download dir, retries and error artifacts.
+"""
+import os
+import traceback
+
+from .auth import checkout_driver, checkin_driver
+from .http_export import try_http_export
+from .batch import run_batch_session
+from ..waits import PageWaiter
+from ..downloads import create_job_download_dir, remove_job_download_dir
+from ..workflow import Context
+
+# Extra attempts of a single export (from a freshly opened tool page) before it fails
+EXPORT_RETRIES = int(os.getenv("SMARTSCOUT_EXPORT_RETRIES", "0"))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def setup_download_directory(download_path: str = None):
+    """Setup download directory and return path"""
+    if download_path is None:
+        download_path = os.path.join(PROJECT_ROOT, "downloads")
+
+    download_path = os.path.abspath(download_path)
+    os.makedirs(download_path, exist_ok=True)
+    return download_path
+
+
+def run_workflow_export(workflow, query: str, username: str, password: str, download_path: str = None,
+                        max_rank: int = None, retries: int = EXPORT_RETRIES) -> dict:
+    """Export one input with ``workflow`` and return its result dict."""
+    output_path = setup_download_directory(download_path)
+
+    # Browserless engine first when enabled (SMARTSCOUT_EXPORT_ENGINE=http/auto)
+    result = try_http_export(workflow.name, query, username, password, output_path, max_rank=max_rank,
+                             extra=workflow.result(Context(query, max_rank, output_path)))
+    if result is not None:
+        return result
+
+    # Take a logged-in driver from the warm pool
+    driver = checkout_driver(username, password, download_dir=output_path)
+
+    waiter = PageWaiter(driver, timeout=25)
+    job_dir = None
+    failed = False
+
+    try:
+        # Private download directory for this job only
+        job_dir = create_job_download_dir(output_path, driver, prefix=workflow.name)
+
+        workflow.open_page(driver, waiter, query, max_rank, output_path=output_path)
+        for attempt in range(max(0, retries) + 1):
+            try:
+                return workflow.export_item(driver, waiter, query, output_path, job_dir, max_rank)
+            except Exception as e:
+                if attempt >= retries:
+                    raise
+                print(f"  🔁 {workflow.name} '{query}' failed (attempt {attempt + 1}), retrying: {e}")
+                workflow.open_page(driver, waiter, query, max_rank, output_path=output_path)
+
+    except Exception as e:
+        # The browser may be stuck on a dialog or half-loaded page; do not reuse it
+        failed = True
+        error_msg = f"Scraping failed: {str(e)}"
+        print(error_msg)
+        print(f"Traceback:\n{traceback.format_exc()}")
+        raise Exception(error_msg) from e
+
+    finally:
+        remove_job_download_dir(job_dir)
+        checkin_driver(driver, discard=failed)
+
+
+def run_workflow_batch(workflow, inputs: list, username: str, password: str, max_rank: int = None,
+                       download_path: str = None, workers: int = None) -> list:
+    """Export every input with ``workflow``, opening the tool page once per browser."""
+    output_path = setup_download_directory(download_path)
+    return run_batch_session(
+        workflow.name,
+        inputs,
+        username,
+        password,
+        output_path,
+        workflow.open_page,
+        lambda driver, waiter, query, out, job_dir: workflow.export_item(driver, waiter, query, out, job_dir, max_rank),
+        workers=workers
+    )
@@ -1,190 +1,69 @@
 # scrapers/smartscout/scrapers/niche_finder.py
-import traceback
-import time
-import os
-import glob
-import shutil
-from datetime import datetime
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from ..auth import get_authenticated_driver  # Corrected relative import
+from ..auth import BASE_URL
+from ..routes import OpenTool
+from ..runner import run_workflow_export, run_workflow_batch
+from ...workflow import Workflow, Navigate, Click, Type, Export, CollectDownload
 
+FILTERS_BUTTON = (By.XPATH, "//button[.//span[text()='Filters']]")
+SUBCATEGORY_GROUP = (By.XPATH, "//div[.//span[text()='Subcategory'] and contains(@class, 'ag-group-title-bar')]")
+SUBCATEGORY_FILTER_INPUT = (By.XPATH, "//input[contains(@class, 'ag-input-field-input') and @placeholder='Filter...']")
+NICHE_FINDER_TAB = (By.XPATH, "//div[contains(@class, 'mat-tab-label-content') and contains(., 'Niche Finder')]")
+NICHE_FINDER_TAB_ACTIVE = (By.XPATH, "//*[(contains(@class, 'mat-tab-label-active') or contains(@class, 'mdc-tab--active')) and contains(., 'Niche Finder')]")
+EXCEL_SIDE_BUTTON = (By.XPATH, "//button[contains(@class, 'ag-side-button-button') and .//img[contains(@src, 'excel')]]")
+CSV_EXPORT_IMAGE = (By.XPATH, "//img[contains(@src, 'csv.ico') and @mattooltip='Export as CSV']")
 
-def setup_download_directory(download_path: str = None):
-    """Setup download directory and return path"""
-    if download_path is None:
-        # Use project downloads directory
-        download_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "downloads")
-    
-    os.makedirs(download_path, exist_ok=True)
-    return download_path
+# Subcategories page, then its Niche Finder tab (fallback when the direct URL fails)
+OPEN_VIA_TAB = [
+    Navigate(f"{BASE_URL}/app/subcategories", step="Step 1: Loading page...", settle="subcategories_page"),
+    Click(NICHE_FINDER_TAB, step="Step 2: Locating Niche Finder tab...", label="niche_finder_tab",
+          settle="niche_finder_grid", grid=True, done="Niche Finder tab clicked"),
+]
 
-
-def get_latest_downloaded_file(download_dir: str, pattern: str = "*.csv", timeout: int = 20):
-    """Get the most recently downloaded CSV file with timeout"""
-    print(f"  Checking for files in: {download_dir}")
-    
-    # Get initial file count
-    files_before = set(glob.glob(os.path.join(download_dir, pattern)))
-    files_before = {f for f in files_before if not f.endswith('.crdownload')}
-    
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        files_now = set(glob.glob(os.path.join(download_dir, pattern)))
-        files_now = {f for f in files_now if not f.endswith('.crdownload')}
-        
-        # Check if new file appeared
-        new_files = files_now - files_before
-        if new_files:
-            latest_file = max(new_files, key=os.path.getctime)
-            
-            # Verify file is complete (size not changing)
-            size1 = os.path.getsize(latest_file)
-            time.sleep(1)
-            size2 = os.path.getsize(latest_file)
-            
-            if size1 == size2 and size1 > 0:
-                return latest_file
-        
-        time.sleep(1)
-    
-    return None
+NICHE_FINDER = Workflow(
+    "niche_finder",
+    open=[OpenTool("niche_finder", "Niche Finder", NICHE_FINDER_TAB_ACTIVE, OPEN_VIA_TAB, grid=True)],
+    item=[
+        # In a batch the subcategory filter is usually still open from the previous term
+        Click(FILTERS_BUTTON, step="Step 3: Opening Filters panel...", label="filters_button",
+              unless_visible=(SUBCATEGORY_FILTER_INPUT, SUBCATEGORY_GROUP), done="Filters panel opened"),
+        Click(SUBCATEGORY_GROUP, step="Step 4: Clicking 'Subcategory' filter group...",
+              label="subcategory_filter_group", unless_visible=(SUBCATEGORY_FILTER_INPUT,),
+              done="Subcategory filter expanded"),
+        Type(SUBCATEGORY_FILTER_INPUT, "{query}", step="Step 5: Waiting for filter input field...",
+             label="subcategory_filter_input", settle="filtered_grid", grid=True,
+             done="Typed into filter: '{query}'"),
+        Export(
+            Click(EXCEL_SIDE_BUTTON, label="excel_side_button", done="Excel side button clicked"),
+            Click(CSV_EXPORT_IMAGE, label="csv_export_button", done="CSV export clicked"),
+            step="Step 6: Triggering export...",
+        ),
+        CollectDownload(lambda ctx: f"niche_finder_{ctx.query.replace(' ', '_')}", step="Step 7: Waiting for download..."),
+    ],
+    columns=("Subcategory",),
+)
 
 
 def run_niche_finder_export(
-    search_text: str, 
-    username: str, 
+    search_text: str,
+    username: str,
     password: str,
     download_path: str = None,
     cleanup_downloads: bool = True  # Delete from Downloads folder after copying
 ) -> dict:
-    # Get desired output directory
-    output_path = setup_download_directory(download_path)
-    
-    # Get authenticated driver WITH custom download directory and HEADLESS
-    driver = get_authenticated_driver(
-        headless=True, 
-        username=username, 
-        password=password,
-        download_dir=output_path
-    )
-    
-    wait = WebDriverWait(driver, 25)
-    downloaded_file = None
-    final_file_path = None
-
-    try:
-        print("Step 1: Loading page...")
-        driver.get("https://app.smartscout.com/app/subcategories")
-        time.sleep(10)
-        
-        print("Step 2: Locating Niche Finder tab...")
-        niche_tab = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//div[contains(@class, 'mat-tab-label-content') and contains(., 'Niche Finder')]")
-            )
-        )
-        niche_tab.click()
-        time.sleep(10)
-        print("  ✅ Niche Finder tab clicked")
-        
-        print("Step 3: Opening Filters panel...")
-        filters_button = wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Filters']]"))
-        )
-        filters_button.click()
-        time.sleep(10)
-        print("  ✅ Filters panel opened")
-        
-        print("Step 4: Clicking 'Subcategory' filter group...")
-        subcategory_header = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//div[.//span[text()='Subcategory'] and contains(@class, 'ag-group-title-bar')]")
-            )
-        )
-        subcategory_header.click()
-        time.sleep(10)
-        print("  ✅ Subcategory filter expanded")
-        
-        print("Step 5: Waiting for filter input field...")
-        filter_input = wait.until(
-            EC.visibility_of_element_located(
-                (By.XPATH, "//input[contains(@class, 'ag-input-field-input') and @placeholder='Filter...']")
-            )
-        )
-        
-        filter_input.clear()
-        time.sleep(1)
-        filter_input.send_keys(search_text)
-        print(f"  ✅ Typed into filter: '{search_text}'")
-        time.sleep(5)
-        
-        print("Step 6: Triggering export...")
-        
-        print("  Clicking Excel side button...")
-        excel_side_button = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//button[contains(@class, 'ag-side-button-button') and .//img[contains(@src, 'excel')]]")
-            )
-        )
-        excel_side_button.click()
-        time.sleep(5)
-        print("  ✅ Excel side button clicked")
-        
-        print("  Clicking CSV export image...")
-        csv_image = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//img[contains(@src, 'csv.ico') and @mattooltip='Export as CSV']")
-            )
-        )
-        csv_image.click()
-        print("  ✅ CSV export clicked")
-        
-        # Wait for download in output folder
-        print("Step 7: Waiting for download...")
-        # Use longer timeout and start marker for reliability
-        start_marker = time.time()
-        downloaded_file = get_latest_downloaded_file(output_path, timeout=60)
-        
-        if not downloaded_file:
-            raise Exception("No CSV file was downloaded")
-        
-        print(f"  ✅ File downloaded: {os.path.basename(downloaded_file)}")
-        
-        # Rename to final path
-        new_filename = f"niche_finder_{search_text.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        final_file_path = os.path.join(output_path, new_filename)
-        shutil.move(downloaded_file, final_file_path)
-        print(f"  ✅ Renamed to: {final_file_path}")
-        
-        # Delete from Downloads folder if requested
-        if cleanup_downloads:
-            try:
-                os.remove(downloaded_file)
-                print(f"  🗑️ Removed from Downloads folder")
-            except Exception as e:
-                print(f"  ⚠️ Could not remove from Downloads: {e}")
-        
-        file_size = os.path.getsize(final_file_path)
-        
-        result = {
-            "status": "success",
-            "message": f"Export completed for '{search_text}'",
-            "file_path": final_file_path,
-            "file_name": new_filename,
-            "file_size": file_size,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        return result
+    return run_workflow_export(NICHE_FINDER, search_text, username, password, download_path)
 
-    except Exception as e:
-        error_msg = f"Scraping failed: {str(e)}"
-        print(error_msg)
-        print(f"Traceback:\n{traceback.format_exc()}")
-        raise Exception(error_msg) from e
 
-    finally:
-        driver.quit()
\ No newline at end of file
+def run_niche_finder_batch(
+    search_texts: list,
+    username: str,
+    password: str,
+    download_path: str = None,
+    workers: int = None
+) -> list:
+    """
+    Export several search terms in one logged-in session, staying on the Niche Finder
+    page and only re-applying the subcategory filter per term.
+    Inputs are spread over ``workers`` browsers (default: as many as the node can run).
+    """
+    return run_workflow_batch(NICHE_FINDER, search_texts, username, password, None, download_path, workers)
@@ -0,0 +1,112 @@
+# scrapper/smartscout/sessions.py
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class SessionStore:
+    """Per-account SmartScout cookies with an in-memory hot layer.
+
+    Each username gets its own JSON file under ``sessions_dir`` (written atomically
+    via a temp file + rename), so concurrent logins for different accounts never
+    overwrite each other. Reads are served from memory after the first load.
+    A session counts as expired ``margin`` seconds before its earliest auth cookie
+    expiry: the cookies named in ``auth_cookies``, or by default the HttpOnly ones
+    (tracking cookies set from page scripts cannot be HttpOnly and often live for
+    minutes). Session-only cookies (no expiry) are trusted until the site rejects
+    them, which restore_session and the HTTP engine check anyway.
+    """
+
+    def __init__(self, sessions_dir, margin: int = 60, auth_cookies=None):
+        self.sessions_dir = Path(sessions_dir)
+        self.margin = margin
+        self.auth_cookies = set(auth_cookies or ())
+        self._lock = threading.Lock()
+        self._sessions = {}       # username -> {"cookies", "saved_at", "expires_at"}
+        self._login_locks = {}    # username -> Lock serialising fresh logins
+
+    def get(self, username: str):
+        """Return the stored cookies for ``username`` if they are still valid, else None."""
+        if not username:
+            return None
+        key = _normalize(username)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._read(key)
+                if session is not None:
+                    self._sessions[key] = session
+        if session is None:
+            return None
+        if self._expired(session):
+            print(f"⌛ Stored session for {username} has expired")
+            self.invalidate(username)
+            return None
+        return list(session["cookies"])
+
+    def save(self, username: str, cookies: list):
+        key = _normalize(username)
+        expiries = [
+            c["expiry"] for c in cookies
+            if self._is_auth_cookie(c) and isinstance(c.get("expiry"), (int, float))
+        ]
+        session = {
+            "username": key,
+            "cookies": cookies,
+            "saved_at": time.time(),
+            "expires_at": min(expiries) if expiries else None,
+        }
+        with self._lock:
+            self._sessions[key] = session
+            self._write(key, session)
+
+    def invalidate(self, username: str):
+        key = _normalize(username)
+        with self._lock:
+            self._sessions.pop(key, None)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def login_lock(self, username: str) -> threading.Lock:
+        """Lock held while logging ``username`` in, so parallel jobs log in only once."""
+        key = _normalize(username)
+        with self._lock:
+            return self._login_locks.setdefault(key, threading.Lock())
+
+    def _is_auth_cookie(self, cookie: dict) -> bool:
+        if self.auth_cookies:
+            return cookie.get("name") in self.auth_cookies
+        return bool(cookie.get("httpOnly"))
+
+    def _expired(self, session: dict) -> bool:
+        expires_at = session.get("expires_at")
+        return expires_at is not None and time.time() >= expires_at - self.margin
+
+    def _path(self, key: str) -> Path:
+        # Hash the account name so e-mail addresses never end up in file names
+        return self.sessions_dir / f"{hashlib.sha256(key.encode()).hexdigest()[:24]}.json"
+
+    def _read(self, key: str):
+        try:
+            with open(self._path(key)) as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return session if session.get("username") == key else None
+
+    def _write(self, key: str, session: dict):
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(session, f)
+        os.replace(tmp_path, path)
+
+
+def _normalize(username: str) -> str:
+    return username.strip().lower()
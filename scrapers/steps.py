@@ -0,0 +1,41 @@
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def step(message: str):
+    """Print a workflow step and report it to whoever is tracking the current thread."""
+    print(message)
+    for listener in getattr(_local, "listeners", ()):
+        try:
+            listener(message)
+        except Exception as e:
+            print(f"  ⚠️ Step listener failed: {e}")
+
+
+@contextmanager
+def track_steps(listener):
+    """Call ``listener(message)`` for every ``step()`` made by this thread inside the block."""
+    listeners = getattr(_local, "listeners", ())
+    _local.listeners = listeners + (listener,)
+    try:
+        yield
+    finally:
+        _local.listeners = listeners
+
+
+def current_listeners() -> tuple:
+    """Listeners tracking this thread, to hand over to helper threads via ``inherit_steps``."""
+    return getattr(_local, "listeners", ())
+
+
+@contextmanager
+def inherit_steps(listeners: tuple):
+    """Report this thread's ``step()`` calls to listeners captured in another thread."""
+    previous = getattr(_local, "listeners", ())
+    _local.listeners = tuple(listeners)
+    try:
+        yield
+    finally:
+        _local.listeners = previous
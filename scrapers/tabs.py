@@ -0,0 +1,208 @@
+import copy
+import threading
+
+from selenium.webdriver.remote.command import Command
+
+
+class TabMultiplexer:
+    """Serve jobs as tabs of shared browsers instead of one browser per job.
+
+    Browsers come from ``pool`` (so they are logged in for ``key``, health-checked
+    and recycled as usual) and stay checked out while any of their tabs is in use.
+    Each job gets its own CDP target, at most ``tabs_per_browser`` per browser, in a
+    browser context of its own that starts with the browser's cookies (download
+    behavior is per context, see downloads.set_download_dir). The job receives a
+    driver whose commands always run against that tab:
+    every command takes the browser's lock and switches to the tab's window first,
+    so concurrent jobs never act on each other's page. ``on_new_tab(tab)`` applies
+    per-target settings (resource blocking, ...). A browser goes back to the pool
+    once its last tab is closed.
+    """
+
+    def __init__(self, pool, tabs_per_browser: int = 4, on_new_tab=None, name: str = "tab"):
+        self.pool = pool
+        self.tabs_per_browser = max(1, tabs_per_browser)
+        self.on_new_tab = on_new_tab
+        self.name = name
+
+        self._lock = threading.Condition()
+        self._browsers = []      # _Browser objects currently checked out of the pool
+        self._launching = set()  # keys a browser is being checked out for
+
+    def checkout(self, key, *factory_args, **factory_kwargs):
+        """Return a driver bound to a new tab of a browser logged in for ``key``."""
+        while True:
+            with self._lock:
+                browser = self._browser_with_room(key)
+                if browser is not None:
+                    browser.tabs += 1
+                    break
+                # Wait for a tab slot rather than for a browser to drain back into the pool
+                if key in self._launching or len(self._browsers) + len(self._launching) >= self.pool.size:
+                    self._lock.wait()
+                    continue
+                self._launching.add(key)
+
+            try:
+                driver = self.pool.checkout(key, *factory_args, **factory_kwargs)
+            except Exception:
+                with self._lock:
+                    self._launching.discard(key)
+                    self._lock.notify_all()
+                raise
+            with self._lock:
+                self._launching.discard(key)
+                browser = _Browser(key, driver)
+                browser.tabs += 1
+                self._browsers.append(browser)
+                self._lock.notify_all()
+            break
+
+        try:
+            tab = browser.open_tab()
+            if self.on_new_tab is not None:
+                self.on_new_tab(tab)
+            return tab
+        except Exception:
+            browser.broken = True
+            self._release(browser)
+            raise
+
+    def owns(self, driver) -> bool:
+        return isinstance(getattr(driver, "_tab_browser", None), _Browser)
+
+    def checkin(self, tab, discard: bool = False):
+        """Close the job's tab; ``discard`` retires its browser once its other tabs finish."""
+        browser = tab._tab_browser
+        try:
+            browser.close_tab(tab._tab_handle)
+        except Exception as e:
+            print(f"⚠️ Could not close {self.name} for {browser.key}: {e}")
+            discard = True
+        if discard:
+            browser.broken = True
+        self._release(browser)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tabs_per_browser": self.tabs_per_browser,
+                "browsers": len(self._browsers),
+                "tabs": sum(b.tabs for b in self._browsers),
+            }
+
+    def _browser_with_room(self, key):
+        """Fullest healthy browser of ``key`` that can take another tab (packs tabs). Caller holds the lock."""
+        candidates = [b for b in self._browsers if b.key == key and not b.broken and b.tabs < self.tabs_per_browser]
+        return max(candidates, key=lambda b: b.tabs) if candidates else None
+
+    def _release(self, browser):
+        with self._lock:
+            browser.tabs -= 1
+            done = browser.tabs == 0
+            if done:
+                self._browsers.remove(browser)
+            self._lock.notify_all()
+        if done:
+            browser.restore_home()
+            self.pool.checkin(browser.driver, discard=browser.broken)
+
+
+class _Browser:
+    """One pooled browser shared by several tabs, and which window its session currently targets."""
+
+    def __init__(self, key, driver):
+        self.key = key
+        self.driver = driver
+        self.lock = threading.RLock()
+        self.home = driver.current_window_handle
+        self.current = self.home
+        self.tabs = 0
+        self.broken = False
+        self.contexts = {}  # tab handle -> its browser context id
+        self._execute = type(driver).execute
+
+    def command(self, handle, driver, command, params=None):
+        """Run ``command`` as ``driver`` (a tab copy or the original) against window ``handle``."""
+        with self.lock:
+            if self.current != handle:
+                self._execute(driver, Command.SWITCH_TO_WINDOW, {"handle": handle})
+                self.current = handle
+            return self._execute(driver, command, params)
+
+    def cdp(self, cmd: str, params: dict = None):
+        """Browser-wide CDP command (Target, Storage, ...) sent through the home window."""
+        return self.command(self.home, self.driver, "executeCdpCommand", {"cmd": cmd, "params": params or {}})["value"]
+
+    def open_tab(self):
+        with self.lock:
+            context_id, handle = self._new_target()
+            tab = copy.copy(self.driver)
+            # Drop what the copy inherited about the home window's target (hooks installed there, ...)
+            for attr in PER_TARGET_ATTRS:
+                tab.__dict__.pop(attr, None)
+            tab._tab_browser = self
+            tab._tab_handle = handle
+            tab._tab_context = context_id
+            # Elements found through the tab are parented to it, so their clicks switch to it too
+            tab.execute = lambda command, params=None: self.command(handle, tab, command, params)
+            # Held by workflow steps across focus-sensitive actions (click, type, export menus)
+            tab.exclusive = self.lock
+            # Background tabs must behave as focused (menus, inputs, blur handlers)
+            tab.execute_cdp_cmd("Emulation.setFocusEmulationEnabled", {"enabled": True})
+            return tab
+
+    def close_tab(self, handle):
+        with self.lock:
+            try:
+                self.command(handle, self.driver, Command.CLOSE)
+            finally:
+                self.current = None
+                self.restore_home()
+                context_id = self.contexts.pop(handle, None)
+                if context_id is not None:
+                    self.cdp("Target.disposeBrowserContext", {"browserContextId": context_id})
+
+    def restore_home(self):
+        with self.lock:
+            if self.current != self.home:
+                self._execute(self.driver, Command.SWITCH_TO_WINDOW, {"handle": self.home})
+                self.current = self.home
+
+    def _new_target(self):
+        """Open a blank target in a new browser context seeded with the default context's
+        cookies; returns ``(context id, window handle)``."""
+        context_id = self.cdp("Target.createBrowserContext")["browserContextId"]
+        try:
+            cookies = self.cdp("Storage.getCookies").get("cookies") or []
+            if cookies:
+                self.cdp("Storage.setCookies", {
+                    "cookies": [_cookie_param(c) for c in cookies],
+                    "browserContextId": context_id,
+                })
+            before = set(self.command(self.home, self.driver, Command.W3C_GET_WINDOW_HANDLES)["value"])
+            created = self.cdp("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})
+            handles = set(self.command(self.home, self.driver, Command.W3C_GET_WINDOW_HANDLES)["value"])
+            if created.get("targetId") in handles:
+                handle = created["targetId"]
+            elif handles - before:
+                handle = (handles - before).pop()
+            else:
+                raise RuntimeError(f"no window handle for target {created.get('targetId')}")
+        except Exception:
+            self.cdp("Target.disposeBrowserContext", {"browserContextId": context_id})
+            raise
+        self.contexts[handle] = context_id
+        return context_id, handle
+
+
+# Driver attributes that describe its current target rather than the browser (see waits.install_request_tracking)
+PER_TARGET_ATTRS = ("_pending_hook_installed",)
+
+
+def _cookie_param(cookie: dict) -> dict:
+    """Network.Cookie (as read) -> Network.CookieParam (as set)."""
+    param = {k: cookie[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if k in cookie}
+    if not cookie.get("session") and cookie.get("expires", -1) > 0:
+        param["expires"] = cookie["expires"]
+    return param
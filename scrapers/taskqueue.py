@@ -0,0 +1,426 @@
+"""
+Durable task queue between the API tier and browser workers (worker.py).
+
+The API enqueues named tasks (see scrapers/tasks.py); workers on any node claim
+them with a lease, keep the lease alive with heartbeats, upload result files to an
+ArtifactStore and mark the task done. A task whose lease runs out (its worker died)
+is handed to another worker, up to ``max_attempts`` times.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from .steps import step, track_steps
+
+LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "60"))
+HEARTBEAT_SECONDS = int(os.getenv("TASK_HEARTBEAT_SECONDS", "10"))
+MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+# Finished tasks (and their steps) are deleted this long after they end
+RETENTION_SECONDS = int(os.getenv("TASK_RETENTION_SECONDS", str(24 * 3600)))
+PURGE_INTERVAL_SECONDS = int(os.getenv("TASK_PURGE_INTERVAL_SECONDS", "600"))
+
+
+class QueueBackend:
+    """Storage for queued tasks, their leases, step progress and live workers.
+
+    Tasks are dicts with ``id``, ``name``, ``args``, ``kwargs``, ``status``
+    (queued/running/succeeded/failed), ``attempts``, ``worker_id``, ``result``,
+    ``error`` and timestamps. Arguments can hold credentials, so backends drop
+    them as soon as a task has finished. Other backends (Redis, Postgres, ...) subclass this
+    and are registered with ``register_queue_backend``.
+    """
+
+    def enqueue(self, name: str, args: list, kwargs: dict, max_attempts: int = MAX_ATTEMPTS) -> str:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, prefixes=None, lease: float = LEASE_SECONDS):
+        """Lease the oldest queued task (optionally only names starting with ``prefixes``)."""
+        raise NotImplementedError
+
+    def heartbeat(self, worker_id: str, task_ids: list, lease: float = LEASE_SECONDS, info: dict = None):
+        """Record that the worker is alive and extend the leases of its running tasks."""
+        raise NotImplementedError
+
+    def add_step(self, task_id: str, message: str):
+        raise NotImplementedError
+
+    def steps(self, task_id: str, after: int = 0) -> list:
+        """``(seq, message)`` progress entries newer than ``after``."""
+        raise NotImplementedError
+
+    def complete(self, task_id: str, worker_id: str, result: dict) -> bool:
+        """Store the result; False if the lease was lost and the task went to someone else."""
+        raise NotImplementedError
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        raise NotImplementedError
+
+    def get(self, task_id: str):
+        raise NotImplementedError
+
+    def requeue_expired(self) -> int:
+        """Give tasks of dead workers (expired lease) back to the queue; returns how many."""
+        raise NotImplementedError
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished tasks older than ``older_than`` seconds."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class SQLiteQueue(QueueBackend):
+    """QueueBackend in one SQLite file, usable by every process that can open it.
+
+    Fine for workers on one host or on hosts sharing a filesystem with working
+    POSIX locks; claims are atomic through ``BEGIN IMMEDIATE``.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    kwargs TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, created_at);
+                CREATE TABLE IF NOT EXISTS task_steps (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id TEXT NOT NULL,
+                    at REAL NOT NULL,
+                    message TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS task_steps_by_task ON task_steps (task_id, seq);
+                CREATE TABLE IF NOT EXISTS workers (
+                    id TEXT PRIMARY KEY,
+                    info TEXT,
+                    last_seen REAL NOT NULL
+                );
+            """)
+
+    def enqueue(self, name: str, args: list, kwargs: dict, max_attempts: int = MAX_ATTEMPTS) -> str:
+        task_id = uuid.uuid4().hex
+        with self._db() as db:
+            db.execute(
+                "INSERT INTO tasks (id, name, args, kwargs, status, max_attempts, created_at) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (task_id, name, json.dumps(args), json.dumps(kwargs), max_attempts, time.time()),
+            )
+        return task_id
+
+    def claim(self, worker_id: str, prefixes=None, lease: float = LEASE_SECONDS):
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            query = "SELECT id FROM tasks WHERE status = 'queued'"
+            params = []
+            if prefixes:
+                query += " AND (" + " OR ".join("name LIKE ?" for _ in prefixes) + ")"
+                params += [f"{p}%" for p in prefixes]
+            row = db.execute(query + " ORDER BY created_at LIMIT 1", params).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            now = time.time()
+            db.execute(
+                "UPDATE tasks SET status = 'running', worker_id = ?, attempts = attempts + 1, "
+                "lease_expires = ?, started_at = ? WHERE id = ?",
+                (worker_id, now + lease, now, row["id"]),
+            )
+            db.execute("COMMIT")
+            return self._task(db, row["id"])
+        except Exception:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def heartbeat(self, worker_id: str, task_ids: list, lease: float = LEASE_SECONDS, info: dict = None):
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT INTO workers (id, info, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET info = excluded.info, last_seen = excluded.last_seen",
+                (worker_id, json.dumps(info or {}), now),
+            )
+            for task_id in task_ids:
+                db.execute(
+                    "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                    (now + lease, task_id, worker_id),
+                )
+
+    def add_step(self, task_id: str, message: str):
+        with self._db() as db:
+            db.execute("INSERT INTO task_steps (task_id, at, message) VALUES (?, ?, ?)", (task_id, time.time(), message))
+
+    def steps(self, task_id: str, after: int = 0) -> list:
+        with self._db() as db:
+            rows = db.execute(
+                "SELECT seq, message FROM task_steps WHERE task_id = ? AND seq > ? ORDER BY seq", (task_id, after)
+            ).fetchall()
+        return [(row["seq"], row["message"]) for row in rows]
+
+    def complete(self, task_id: str, worker_id: str, result: dict) -> bool:
+        return self._finish(task_id, worker_id, "succeeded", result=json.dumps(result))
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        return self._finish(task_id, worker_id, "failed", error=error)
+
+    def get(self, task_id: str):
+        with self._db() as db:
+            return self._task(db, task_id)
+
+    def requeue_expired(self) -> int:
+        now = time.time()
+        with self._db() as db:
+            requeued = db.execute(
+                "UPDATE tasks SET status = 'queued', worker_id = NULL, lease_expires = NULL "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts < max_attempts",
+                (now,),
+            ).rowcount
+            db.execute(
+                "UPDATE tasks SET status = 'failed', finished_at = ?, args = '[]', kwargs = '{}', "
+                "error = 'Worker stopped responding (' || attempts || ' attempts)' "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+        if requeued:
+            print(f"🔁 Redelivered {requeued} task(s) from unresponsive workers")
+        return requeued
+
+    def purge(self, older_than: float) -> int:
+        cutoff = time.time() - older_than
+        with self._db() as db:
+            db.execute(
+                "DELETE FROM task_steps WHERE task_id IN "
+                "(SELECT id FROM tasks WHERE status IN ('succeeded', 'failed') AND finished_at < ?)",
+                (cutoff,),
+            )
+            db.execute("DELETE FROM workers WHERE last_seen < ?", (cutoff,))
+            return db.execute(
+                "DELETE FROM tasks WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (cutoff,)
+            ).rowcount
+
+    def stats(self) -> dict:
+        alive_since = time.time() - 3 * HEARTBEAT_SECONDS
+        with self._db() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            workers = db.execute("SELECT id, info FROM workers WHERE last_seen >= ?", (alive_since,)).fetchall()
+        return {
+            "backend": f"sqlite://{self.path}",
+            "tasks": counts,
+            "workers": [{"id": w["id"], **json.loads(w["info"] or "{}")} for w in workers],
+        }
+
+    def _finish(self, task_id, worker_id, status, result=None, error=None) -> bool:
+        with self._db() as db:
+            updated = db.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires = NULL, "
+                "args = '[]', kwargs = '{}' "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (status, result, error, time.time(), task_id, worker_id),
+            ).rowcount
+        return updated == 1
+
+    def _task(self, db, task_id):
+        row = db.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        task = dict(row)
+        task["args"] = json.loads(task["args"])
+        task["kwargs"] = json.loads(task["kwargs"])
+        task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    @contextmanager
+    def _db(self):
+        db = self._connect()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _connect(self):
+        # Autocommit; multi-statement updates that must be atomic use BEGIN IMMEDIATE
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        # Cleared arguments (passwords) are overwritten on disk, not just unlinked
+        db.execute("PRAGMA secure_delete=ON")
+        return db
+
+
+QUEUE_BACKENDS = {"sqlite": lambda url: SQLiteQueue(_sqlite_path(url))}
+
+
+def register_queue_backend(scheme: str, factory):
+    """Make ``<scheme>://...`` queue URLs open with ``factory(url)``."""
+    QUEUE_BACKENDS[scheme] = factory
+
+
+def open_queue(url: str) -> QueueBackend:
+    scheme = urlparse(url).scheme
+    if scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unsupported task queue '{url}' (known: {', '.join(QUEUE_BACKENDS)})")
+    return QUEUE_BACKENDS[scheme](url)
+
+
+def _sqlite_path(url: str) -> str:
+    # sqlite:///relative/path.db or sqlite:////absolute/path.db
+    return url[len("sqlite:///"):]
+
+
+class RemoteRunner:
+    """Run a named task on a worker and wait for it, as if it had run in this thread.
+
+    Worker progress is replayed through ``step()`` (so the local Job records it) and
+    the result file is fetched from the artifact store into ``download_dir``.
+    """
+
+    def __init__(self, queue: QueueBackend, artifacts, download_dir: str, timeout: float = 900, poll: float = 0.5):
+        self.queue = queue
+        self.artifacts = artifacts
+        self.download_dir = download_dir
+        self.timeout = timeout
+        self.poll = poll
+
+    def run(self, name: str, *args, **kwargs):
+        task_id = self.queue.enqueue(name, list(args), kwargs)
+        print(f"📤 Sent {name} to the task queue as {task_id}")
+        deadline = time.time() + self.timeout
+        last_step = 0
+        while True:
+            for last_step, message in self.queue.steps(task_id, after=last_step):
+                step(message)
+            task = self.queue.get(task_id)
+            if task["status"] in ("succeeded", "failed"):
+                break
+            if time.time() > deadline:
+                raise TimeoutError(f"Task {task_id} did not finish within {self.timeout}s (status {task['status']})")
+            time.sleep(self.poll)
+
+        if task["status"] == "failed":
+            raise Exception(task["error"])
+        result = task["result"]
+        artifact = result.pop("artifact", None)
+        if artifact:
+            result["file_path"] = self.artifacts.fetch(artifact, self.download_dir)
+            self.artifacts.delete(artifact)
+        return result
+
+
+class Worker:
+    """Claims tasks from the queue and runs them with ``concurrency`` threads."""
+
+    def __init__(self, queue: QueueBackend, artifacts, tasks: dict, concurrency: int = 1, prefixes=None):
+        self.queue = queue
+        self.artifacts = artifacts
+        self.tasks = tasks
+        self.concurrency = max(1, concurrency)
+        self.prefixes = prefixes
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._running = {}  # task_id -> name
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._stopping = threading.Event()
+
+    def run_forever(self, idle_poll: float = 1.0):
+        print(f"👷 Worker {self.id} started ({self.concurrency} slots)")
+        threads = [
+            threading.Thread(target=self._slot_loop, args=(idle_poll,), name=f"worker-slot-{n}", daemon=True)
+            for n in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        while not self._stopping.wait(HEARTBEAT_SECONDS):
+            self._heartbeat()
+        for thread in threads:
+            thread.join()
+        print(f"👷 Worker {self.id} stopped")
+
+    def stop(self):
+        """Stop claiming new tasks; running ones finish first."""
+        self._stopping.set()
+
+    def _heartbeat(self):
+        with self._lock:
+            running = list(self._running)
+        try:
+            self.queue.heartbeat(
+                self.id, running,
+                info={"host": socket.gethostname(), "pid": os.getpid(), "slots": self.concurrency, "running": len(running)},
+            )
+            self.queue.requeue_expired()
+        except Exception as e:
+            print(f"⚠️ Heartbeat failed: {e}")
+        if time.time() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self._last_purge = time.time()
+            try:
+                purged = self.queue.purge(RETENTION_SECONDS)
+                if purged:
+                    print(f"🧹 Purged {purged} finished task(s)")
+            except Exception as e:
+                print(f"⚠️ Task purge failed: {e}")
+
+    def _slot_loop(self, idle_poll: float):
+        self._heartbeat()
+        while not self._stopping.is_set():
+            try:
+                task = self.queue.claim(self.id, self.prefixes)
+            except Exception as e:
+                print(f"⚠️ Could not claim a task: {e}")
+                task = None
+            if task is None:
+                self._stopping.wait(idle_poll)
+                continue
+            with self._lock:
+                self._running[task["id"]] = task["name"]
+            try:
+                self._execute(task)
+            finally:
+                with self._lock:
+                    self._running.pop(task["id"], None)
+
+    def _execute(self, task: dict):
+        task_id = task["id"]
+        print(f"▶️ Running {task['name']} task {task_id} (attempt {task['attempts']})")
+        try:
+            func = self.tasks[task["name"]]
+            with track_steps(lambda message: self.queue.add_step(task_id, message)):
+                result = func(*task["args"], **task["kwargs"])
+            result = dict(result)
+            file_path = result.pop("file_path", None)
+            if file_path:
+                result["artifact"] = self.artifacts.put(file_path, f"{task_id}/{os.path.basename(file_path)}")
+                os.remove(file_path)
+        except Exception as e:
+            print(f"❌ Task {task_id} failed: {e}\n{traceback.format_exc()}")
+            if not self.queue.fail(task_id, self.id, str(e)):
+                print(f"⚠️ Task {task_id} was redelivered elsewhere; dropping this failure")
+            return
+        if not self.queue.complete(task_id, self.id, result):
+            print(f"⚠️ Task {task_id} was redelivered elsewhere; dropping this result")
+            if result.get("artifact"):
+                self.artifacts.delete(result["artifact"])
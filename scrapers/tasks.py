@@ -0,0 +1,35 @@
+"""
+Named scraper tasks: the unit of work the API hands to a local thread or, through
+the task queue, to a worker.py process. Only functions listed in ``TASKS`` can be
+run from a queued message.
+"""
+import os
+
+from .smartscout.scrapers.niche_finder import run_niche_finder_export, run_niche_finder_batch
+from .smartscout.scrapers.rank_maker import run_keyword_tools_export, run_keyword_tools_batch
+from .smartscout.scrapers.product_search import run_product_search_export, run_product_search_batch
+from .smartscout.batch import package_batch_results
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOWNLOADS_DIR = os.path.join(PROJECT_ROOT, "downloads")
+
+# tool -> batch function
+BATCH_FUNCTIONS = {
+    "niche-finder": run_niche_finder_batch,
+    "rank-maker": run_keyword_tools_batch,
+    "product-search": run_product_search_batch,
+}
+
+
+def run_smartscout_batch(tool: str, output: str, *args) -> dict:
+    """Run a batch and bundle its per-input CSVs into one zip or merged CSV."""
+    results = BATCH_FUNCTIONS[tool](*args)
+    return package_batch_results(tool.replace("-", "_"), results, DOWNLOADS_DIR, output)
+
+
+TASKS = {
+    "smartscout/niche-finder": run_niche_finder_export,
+    "smartscout/rank-maker": run_keyword_tools_export,
+    "smartscout/product-search": run_product_search_export,
+    "smartscout/batch": run_smartscout_batch,
+}
@@ -0,0 +1,190 @@
+import time
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from .metrics import WAIT_DURATION
+
+# Injected into every document so we can tell when XHR/fetch traffic has settled
+PENDING_REQUESTS_HOOK = """
+(function () {
+    if (window.__pendingRequests !== undefined) { return; }
+    window.__pendingRequests = 0;
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', function () { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); });
+        return origSend.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            window.__pendingRequests++;
+            return origFetch.apply(this, arguments).finally(function () { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); });
+        };
+    }
+})();
+"""
+
+SPINNER_SELECTORS = (
+    "mat-spinner, mat-progress-spinner, "
+    ".ag-overlay-loading-wrapper, .ant-spin-spinning, .loading-spinner"
+)
+
+GRID_ROWS_SELECTOR = ".ag-center-cols-container .ag-row"
+
+
+class PageWaiter:
+    """Wait for concrete readiness signals instead of sleeping a fixed time.
+
+    Every wait has its own timeout (falling back to ``timeout``) and the real time
+    spent is appended to ``timings`` as ``(label, seconds, ok)`` so slow steps show
+    up in the logs.
+    """
+
+    def __init__(self, driver, timeout: float = 25, poll: float = 0.2):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.timings = []
+        install_request_tracking(driver)
+
+    # --- element waits ---
+
+    def clickable(self, locator, timeout: float = None, label: str = None):
+        return self._until(EC.element_to_be_clickable(locator), timeout, label or "clickable")
+
+    def visible(self, locator, timeout: float = None, label: str = None):
+        return self._until(EC.visibility_of_element_located(locator), timeout, label or "visible")
+
+    def present(self, locator, timeout: float = None, label: str = None):
+        return self._until(EC.presence_of_element_located(locator), timeout, label or "present")
+
+    def url_contains(self, fragment: str, timeout: float = None, label: str = None):
+        return self._until(EC.url_contains(fragment), timeout, label or f"url~{fragment}")
+
+    def url_excludes(self, fragment: str, timeout: float = None, label: str = None):
+        return self._until(lambda d: fragment not in d.current_url, timeout, label or f"url!~{fragment}")
+
+    def is_visible(self, locator) -> bool:
+        """Immediate (non-waiting) check whether any element matching ``locator`` is displayed."""
+        try:
+            return any(el.is_displayed() for el in self.driver.find_elements(*locator))
+        except (StaleElementReferenceException, JavascriptException):
+            return False
+
+    # --- page state waits ---
+
+    def document_ready(self, timeout: float = None, label: str = "document_ready"):
+        return self._until(
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            timeout, label
+        )
+
+    def network_idle(self, timeout: float = None, quiet: float = 0.5, label: str = "network_idle"):
+        """Wait until no XHR/fetch has been pending for ``quiet`` seconds."""
+        state = {"idle_since": None}
+
+        def idle(d):
+            pending = d.execute_script("return window.__pendingRequests")
+            if pending:
+                state["idle_since"] = None
+                return False
+            # Hook missing (e.g. non-Chrome driver) -> treat as idle
+            now = time.time()
+            if state["idle_since"] is None:
+                state["idle_since"] = now
+            return now - state["idle_since"] >= quiet
+
+        return self._until(idle, timeout, label)
+
+    def spinner_gone(self, timeout: float = None, label: str = "spinner_gone"):
+        return self._until(
+            lambda d: not d.execute_script(
+                "return Array.from(document.querySelectorAll(arguments[0]))"
+                ".some(function (el) { return el.offsetParent !== null; });",
+                SPINNER_SELECTORS
+            ),
+            timeout, label
+        )
+
+    def grid_stable(self, timeout: float = None, settle: float = 0.75, label: str = "grid_stable"):
+        """Wait until the ag-grid row count stops changing for ``settle`` seconds."""
+        state = {"count": None, "since": None}
+
+        def stable(d):
+            count = d.execute_script(
+                "if (document.querySelector('.ag-overlay-loading-wrapper')) { return -1; }"
+                "return document.querySelectorAll(arguments[0]).length;",
+                GRID_ROWS_SELECTOR
+            )
+            now = time.time()
+            if count < 0 or count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return now - state["since"] >= settle
+
+        self._until(stable, timeout, label)
+        return state["count"]
+
+    def page_ready(self, timeout: float = None, label: str = "page_ready", quiet: float = 0.5):
+        """Document loaded, XHR settled and no spinner visible."""
+        started = time.time()
+        budget = timeout or self.timeout
+        self.document_ready(budget, label=f"{label}:document")
+        self.network_idle(max(budget - (time.time() - started), self.poll), quiet=quiet, label=f"{label}:network")
+        self.spinner_gone(max(budget - (time.time() - started), self.poll), label=f"{label}:spinner")
+
+    def settle(self, timeout: float = None, label: str = "settle", grid: bool = False, quiet: float = 0.5):
+        """Best-effort page_ready (plus grid_stable when ``grid``): never raises.
+
+        Used after clicks that trigger async UI work where the original flow slept.
+        """
+        try:
+            self.page_ready(timeout, label=label, quiet=quiet)
+            if grid:
+                self.grid_stable(timeout, label=f"{label}:grid")
+        except TimeoutException:
+            print(f"  ⚠️ {label} did not settle within {timeout or self.timeout}s, proceeding...")
+
+    # --- bookkeeping ---
+
+    def total(self) -> float:
+        return sum(seconds for _, seconds, _ in self.timings)
+
+    def _until(self, condition, timeout, label):
+        timeout = timeout or self.timeout
+        started = time.time()
+        ok = False
+        try:
+            result = WebDriverWait(
+                self.driver, timeout, poll_frequency=self.poll,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException, JavascriptException)
+            ).until(condition)
+            ok = True
+            return result
+        finally:
+            elapsed = time.time() - started
+            self.timings.append((label, elapsed, ok))
+            WAIT_DURATION.labels(label, "success" if ok else "timeout").observe(elapsed)
+            print(f"  ⏱️ wait[{label}] {elapsed:.2f}s{'' if ok else ' (timed out)'}")
+
+
+def install_request_tracking(driver):
+    """Register the pending-request hook for every new document (Chrome only)."""
+    if getattr(driver, "_pending_hook_installed", False):
+        return
+    try:
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": PENDING_REQUESTS_HOOK}
+        )
+        # Also cover the document that is already loaded
+        driver.execute_script(PENDING_REQUESTS_HOOK)
+        driver._pending_hook_installed = True
+    except Exception:
+        pass
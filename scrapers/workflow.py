@@ -0,0 +1,270 @@
+"""
+Declarative browser workflows. A scrape is a list of steps (navigate, click, type,
+wait-for, export, collect-download) that one runner executes, so step reporting,
+timing, optional steps and error artifacts are handled in one place for every flow.
+"""
+import contextlib
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+from selenium.webdriver.common.keys import Keys
+
+from .steps import step
+from .downloads import wait_for_download
+
+
+class Context:
+    """State of one run: template values (``{query}``, ``{max_rank}``), where files go, and what happened."""
+
+    def __init__(self, query: str = None, max_rank: int = None, output_path: str = None, job_dir: str = None):
+        self.query = query
+        self.max_rank = max_rank
+        self.output_path = output_path
+        self.job_dir = job_dir
+        self.started = time.time()
+        self.timings = []       # (label, seconds) per executed step
+        self.download = None    # {"file_path", "file_name", "file_size"} once collected
+
+    def format(self, template):
+        """Fill ``{query}``/``{max_rank}`` in a string; call a template that is a function of the context."""
+        if callable(template):
+            return template(self)
+        if isinstance(template, str):
+            return template.format(query=self.query, max_rank=self.max_rank)
+        return template
+
+
+class Step:
+    """One declared action.
+
+    ``step``: progress message reported through ``step()`` (numbered like "Step 4: ...").
+    ``done``: printed as "  ✅ ..." when the action succeeds.
+    ``unless_visible``: skip the step while any of these locators is displayed
+    (e.g. a filter panel left open by the previous batch item).
+    ``optional``: a warning printed instead of failing the workflow.
+    ``settle``/``grid``: PageWaiter.settle label (and grid check) run afterwards.
+    """
+
+    def __init__(self, step: str = None, done: str = None, unless_visible=(), optional: str = None,
+                 settle: str = None, grid: bool = False, label: str = None):
+        self.step = step
+        self.done = done
+        self.unless_visible = tuple(unless_visible)
+        self.optional = optional
+        self.settle = settle
+        self.grid = grid
+        self.label = label
+
+    def execute(self, driver, waiter, ctx: Context):
+        if any(waiter.is_visible(locator) for locator in self.unless_visible):
+            return
+        if self.step:
+            step(ctx.format(self.step))
+        started = time.time()
+        try:
+            self.run(driver, waiter, ctx)
+        except Exception:
+            if self.optional is None:
+                raise
+            print(f"  ⚠️ {ctx.format(self.optional)}")
+        else:
+            if self.done:
+                print(f"  ✅ {ctx.format(self.done)}")
+        finally:
+            ctx.timings.append((self.label or type(self).__name__.lower(), time.time() - started))
+        if self.settle:
+            waiter.settle(label=self.settle, grid=self.grid)
+
+    def run(self, driver, waiter, ctx: Context):
+        raise NotImplementedError
+
+
+def _find(waiter, locator, wait: str, label: str):
+    return getattr(waiter, wait)(locator, label=label)
+
+
+def _exclusive(driver):
+    """Lock a tab driver holds around a focus-sensitive action (click, typing), so other tabs
+    of its browser cannot switch the session away mid-action (no-op for a driver that owns
+    its browser). Element waits run without it."""
+    return getattr(driver, "exclusive", None) or contextlib.nullcontext()
+
+
+class Navigate(Step):
+    """Load ``url`` (a template)."""
+
+    def __init__(self, url, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+
+    def run(self, driver, waiter, ctx):
+        driver.get(ctx.format(self.url))
+
+
+class Click(Step):
+    """Click ``locator`` once it is ``wait`` (clickable/visible/present); ``js`` clicks through JavaScript
+    after scrolling it into view, for headers other elements overlap."""
+
+    def __init__(self, locator, wait: str = "clickable", js: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.locator = locator
+        self.wait = wait
+        self.js = js
+
+    def run(self, driver, waiter, ctx):
+        element = _find(waiter, self.locator, self.wait, self.label)
+        with _exclusive(driver):
+            if self.js:
+                driver.execute_script("arguments[0].scrollIntoView(true);", element)
+                driver.execute_script("arguments[0].click();", element)
+            else:
+                element.click()
+
+
+class Type(Step):
+    """Replace the text of ``locator`` with ``text`` (a template); ``submit`` presses Enter."""
+
+    def __init__(self, locator, text, wait: str = "visible", submit: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.locator = locator
+        self.text = text
+        self.wait = wait
+        self.submit = submit
+
+    def run(self, driver, waiter, ctx):
+        element = _find(waiter, self.locator, self.wait, self.label)
+        with _exclusive(driver):
+            element.clear()
+            element.send_keys(str(ctx.format(self.text)))
+            if self.submit:
+                element.send_keys(Keys.RETURN)
+
+
+class WaitFor(Step):
+    """Wait until ``locator`` is ``wait`` (without a locator, only the ``settle`` wait runs)."""
+
+    def __init__(self, locator=None, wait: str = "present", **kwargs):
+        super().__init__(**kwargs)
+        self.locator = locator
+        self.wait = wait
+
+    def run(self, driver, waiter, ctx):
+        if self.locator is not None:
+            _find(waiter, self.locator, self.wait, self.label)
+
+
+class Export(Step):
+    """The actions that start a download (export button, format menu, ...), run in order.
+
+    In a shared browser each click or keystroke holds the browser only while it runs,
+    not while the next menu item is awaited, so a slow menu does not stall the other
+    tabs (focus emulation keeps the menu open while they act).
+    """
+
+    def __init__(self, *actions, **kwargs):
+        super().__init__(**kwargs)
+        self.actions = actions
+
+    def run(self, driver, waiter, ctx):
+        run_steps(driver, waiter, self.actions, ctx)
+
+
+class CollectDownload(Step):
+    """Wait for the exported file in the job's download dir and move it to
+    ``<output_path>/<name>_<timestamp>_<id><ext>`` (``name`` is a template; the
+    random id keeps concurrent jobs of the same query from overwriting each other)."""
+
+    def __init__(self, name, pattern: str = "*.csv", timeout: float = 60, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.pattern = pattern
+        self.timeout = timeout
+
+    def run(self, driver, waiter, ctx):
+        downloaded_file = wait_for_download(
+            ctx.job_dir, pattern=self.pattern, timeout=self.timeout, since=ctx.started, driver=driver
+        )
+        if not downloaded_file:
+            raise Exception("No CSV file was downloaded")
+        print(f"  ✅ File downloaded: {os.path.basename(downloaded_file)}")
+
+        extension = os.path.splitext(downloaded_file)[1] or ".csv"
+        new_filename = f"{ctx.format(self.name)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}{extension}"
+        final_file_path = os.path.join(ctx.output_path, new_filename)
+        shutil.move(downloaded_file, final_file_path)
+        print(f"  ✅ Renamed to: {final_file_path}")
+        ctx.download = {
+            "file_path": final_file_path,
+            "file_name": new_filename,
+            "file_size": os.path.getsize(final_file_path),
+        }
+
+
+def run_steps(driver, waiter, steps, ctx: Context):
+    for s in steps:
+        s.execute(driver, waiter, ctx)
+
+
+def save_error_screenshot(driver, output_path: str, prefix: str):
+    """Best-effort screenshot of the page a workflow failed on."""
+    try:
+        screenshot_name = f"{prefix}_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        os.makedirs(output_path, exist_ok=True)
+        screenshot_path = os.path.join(output_path, screenshot_name)
+        driver.save_screenshot(screenshot_path)
+        print(f"Captured error screenshot: {screenshot_path}")
+    except Exception:
+        pass
+
+
+class Workflow:
+    """A named scrape.
+
+    ``open`` steps bring a browser to the tool page (done once per session), ``item``
+    steps export one input from there and must end with a CollectDownload.
+    ``result(ctx)`` returns the ``message`` and any tool-specific fields of the
+    result dict. ``columns`` are headers the tool's CSV export has and the cache or
+    history read, which other engines producing the same export must match.
+    """
+
+    def __init__(self, name: str, open, item, result=None, columns=()):
+        self.name = name
+        self.open = list(open)
+        self.item = list(item)
+        self.result = result or (lambda ctx: {"message": f"Export completed for '{ctx.query}'"})
+        self.columns = tuple(columns)
+
+    def open_page(self, driver, waiter, query: str = None, max_rank: int = None, output_path: str = None):
+        """Run the ``open`` steps; a screenshot goes to ``output_path`` (when given) if they fail."""
+        ctx = Context(query, max_rank, output_path)
+        try:
+            run_steps(driver, waiter, self.open, ctx)
+        except Exception:
+            if output_path:
+                save_error_screenshot(driver, output_path, self.name)
+            raise
+
+    def export_item(self, driver, waiter, query: str, output_path: str, job_dir: str, max_rank: int = None) -> dict:
+        """Run the ``item`` steps for one input (tool page already open) and return its result dict."""
+        ctx = Context(query, max_rank, output_path, job_dir)
+        try:
+            run_steps(driver, waiter, self.item, ctx)
+        except Exception:
+            save_error_screenshot(driver, output_path, self.name)
+            raise
+        if ctx.download is None:
+            raise Exception(f"{self.name} workflow finished without collecting a download")
+
+        slowest = sorted(ctx.timings, key=lambda t: t[1], reverse=True)[:3]
+        print(f"  ⏱️ {self.name} '{query}' took {time.time() - ctx.started:.1f}s (slowest: "
+              + ", ".join(f"{label} {seconds:.1f}s" for label, seconds in slowest) + ")")
+
+        extra = self.result(ctx)
+        result = {"status": "success", "message": extra.pop("message")}
+        result.update(ctx.download)
+        result["timestamp"] = datetime.now().isoformat()
+        result.update(extra)
+        return result
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Run from any directory without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main builds its history store and result cache at import time; keep them (and
+# anything else the tests write) out of the checkout
+_STATE_DIR = tempfile.mkdtemp(prefix="scraper-tests-")
+os.environ.setdefault("HISTORY_DB", os.path.join(_STATE_DIR, "history.db"))
+os.environ.setdefault("RESULT_CACHE_DIR", os.path.join(_STATE_DIR, "cache"))
@@ -0,0 +1,13 @@
+"""Without a memory reading, admission is bounded by max_total alone."""
+from scrapers import admission
+from scrapers.admission import AdmissionController
+
+
+def test_unknown_memory_leaves_max_total_as_the_limit(monkeypatch):
+    monkeypatch.setattr(admission, "available_memory_mb", lambda: None)
+    controller = AdmissionController(3)
+
+    assert controller.capacity() == 3
+    assert controller.try_acquire("kalodata", cost=5) == 3
+    assert controller.try_acquire("kalodata") == 0
+    assert controller.stats()["budget_mb"] is None
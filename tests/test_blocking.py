@@ -0,0 +1,44 @@
+"""Allowlisted resources must load even where a blocked pattern matches them."""
+from scrapers import blocking
+
+CAPTCHA_IMAGE = "https://www.kalodata.com/captcha/slide.png"
+
+
+class Driver:
+    def __init__(self, version):
+        self.capabilities = {"browserVersion": version}
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+
+
+def blocked_urls_params(version):
+    driver = Driver(version)
+    blocking.block_resources(driver, "kalodata")
+    return dict(driver.commands)["Network.setBlockedURLs"]
+
+
+def test_images_are_blocked_by_url_not_content_settings():
+    assert not blocking.get_profile("kalodata")["block_images"]
+    assert blocking.url_is_blocked("https://cdn.example.com/product.png", blocking.blocked_url_patterns("kalodata"))
+
+
+def test_allowlist_is_sent_as_exceptions_on_current_chrome():
+    params = blocked_urls_params("145.0.7000.1")
+    assert blocking.url_is_blocked(CAPTCHA_IMAGE, params["urls"])
+    exceptions = [p["urlPattern"] for p in params["urlPatterns"] if p["block"] is False]
+    assert "*://*:*/*captcha*" in exceptions and "*://*:*/api/*" in exceptions
+
+
+def test_allowlisted_url_is_not_blocked_without_exceptions():
+    params = blocked_urls_params("120.0.6099.71")
+    assert "urlPatterns" not in params
+    assert not blocking.url_is_blocked(CAPTCHA_IMAGE, params["urls"])
+    assert not blocking.url_is_blocked("https://www.kalodata.com/api/product/list.json", params["urls"])
+
+
+def test_globs_overlap():
+    assert blocking._globs_overlap("*.png", "*captcha*")
+    assert blocking._globs_overlap("*hotjar.com*", "https://static.hotjar.com/c.js")
+    assert not blocking._globs_overlap("*.woff", "https://x.com/a.woff2")
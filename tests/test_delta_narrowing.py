@@ -0,0 +1,66 @@
+"""A max_rank request narrowed from a wider cached export must diff the rows it served."""
+import csv
+
+import pytest
+
+for module in ("fastapi", "selenium", "prometheus_client", "dotenv", "urllib3"):
+    pytest.importorskip(module)
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Keyword", "Latest Rank"])
+        writer.writerows(rows)
+    return path
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    import main
+    from scrapers.cache import ResultCache
+    from scrapers.history import HistoryStore
+
+    monkeypatch.setattr(main, "DOWNLOADS_DIR", str(tmp_path / "downloads"))
+    monkeypatch.setattr(main, "RESULT_CACHE", ResultCache(str(tmp_path / "cache"), ttl=900))
+    monkeypatch.setattr(main, "HISTORY", HistoryStore(str(tmp_path / "history.db")))
+    return main
+
+
+def test_narrowed_hit_diffs_the_rows_it_served(api, tmp_path, monkeypatch):
+    # Yesterday's max_rank=50 export
+    old_id = api.HISTORY.ingest_csv("rank-maker", "B0X", 50, write_csv(tmp_path / "old.csv", [
+        ["dog toy", "10"],
+        ["cat toy", "40"],
+        ["gone toy", "20"],
+    ]))
+
+    # Today's max_rank=100 export, scraped and cached
+    wide = write_csv(tmp_path / "wide.csv", [
+        ["dog toy", "10"],
+        ["cat toy", "45"],
+        ["new toy", "30"],
+        ["far toy", "80"],
+    ])
+    monkeypatch.setattr(api, "run_task", lambda *args: {"file_path": str(wide), "file_name": "rank_maker_B0X.csv"})
+    api.run_cached_export(api.make_key("rank-maker", "B0X", 100), "smartscout/rank-maker", "B0X")
+
+    request = api.ScrapeRequest(search_text="B0X", username="u", password="p", max_rank=50, delta=True)
+    result = api.lookup_cached_result("rank-maker", request)
+    assert result["narrowed_from_max_rank"] == 100
+    assert [row["Keyword"] for row in read_csv(result["file_path"])] == ["dog toy", "cat toy", "new toy"]
+
+    file_path, _, headers = api.delta_export("rank-maker", "B0X", 50, result)
+    changes = {row["Keyword"]: row["change_type"] for row in read_csv(file_path)}
+    assert changes == {"cat toy": "changed", "new toy": "added", "gone toy": "removed"}
+    assert headers["X-Delta-Base"] == str(old_id)
+
+    # The narrowed copy is now an exact cache hit and still diffs the same export
+    again = api.lookup_cached_result("rank-maker", request)
+    assert "narrowed_from_max_rank" not in again
+    assert again["history_id"] == result["history_id"]
@@ -0,0 +1,26 @@
+"""A download that completes while the wait is still setting up must be found."""
+import os
+import time
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from scrapers import downloads
+
+
+def test_download_finished_before_the_watch_starts(tmp_path, monkeypatch):
+    real_open = downloads._Inotify.open
+
+    def open_after_download(path):
+        # Chrome renames the .crdownload just as the watcher is being set up
+        (tmp_path / "export.csv.crdownload").write_text("Keyword\n")
+        os.rename(tmp_path / "export.csv.crdownload", tmp_path / "export.csv")
+        return real_open(path)
+
+    monkeypatch.setattr(downloads._Inotify, "open", open_after_download)
+    started = time.time()
+    found = downloads.wait_for_download(str(tmp_path), timeout=3, poll=0.1)
+
+    assert found == str(tmp_path / "export.csv")
+    assert time.time() - started < 1
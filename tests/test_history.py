@@ -0,0 +1,43 @@
+"""Export history must accept ragged CSVs and refuse sort columns SQLite cannot address."""
+import pytest
+
+from scrapers.history import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"))
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_line_with_more_fields_than_headers_is_stored(store, tmp_path):
+    export_id = store.ingest_csv("rank-maker", "B0X", 50, write(tmp_path / "ragged.csv",
+                                                             "Keyword,Latest Rank\ndog toy,10,extra\ncat toy,40\n"))
+    found = store.rows(export_id=export_id, sort="Latest Rank")
+    assert [row["data"] for row in found["rows"]] == [
+        {"Keyword": "dog toy", "Latest Rank": 10},
+        {"Keyword": "cat toy", "Latest Rank": 40},
+    ]
+
+
+def test_sort_column_with_a_quote_is_rejected(store, tmp_path):
+    store.ingest_csv("rank-maker", "B0X", 50, write(tmp_path / "export.csv", "Keyword,Latest Rank\ndog toy,10\n"))
+    with pytest.raises(ValueError):
+        store.rows(sort='-Latest "Rank')
+
+
+def test_history_rows_endpoint_answers_400_for_a_bad_sort(tmp_path, monkeypatch):
+    for module in ("fastapi", "selenium", "prometheus_client", "dotenv", "urllib3"):
+        pytest.importorskip(module)
+    from fastapi import HTTPException
+    import asyncio
+    import main
+
+    monkeypatch.setattr(main, "HISTORY", HistoryStore(str(tmp_path / "history.db")))
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main.history_rows(sort='a"b', limit=10, offset=0))
+    assert raised.value.status_code == 400
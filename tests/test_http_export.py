@@ -0,0 +1,50 @@
+"""The HTTP engine must produce the same export as the browser workflows."""
+import csv
+
+import pytest
+
+for module in ("urllib3", "selenium"):
+    pytest.importorskip(module)
+
+from scrapers.smartscout import http_export
+from scrapers.smartscout.scrapers.niche_finder import NICHE_FINDER
+from scrapers.smartscout.scrapers.product_search import PRODUCT_SEARCH
+from scrapers.smartscout.scrapers.rank_maker import RANK_MAKER
+from scrapers.workflow import Context
+
+WORKFLOWS = [NICHE_FINDER, RANK_MAKER, PRODUCT_SEARCH]
+
+
+def api_rows(tool):
+    """One row holding every API field the tool's column table knows."""
+    return [{field: "1" for field in http_export.API_COLUMNS[tool]}]
+
+
+@pytest.mark.parametrize("workflow", WORKFLOWS, ids=lambda w: w.name)
+def test_http_header_has_the_browser_export_columns(workflow, tmp_path):
+    assert workflow.columns
+    http_export.write_csv(api_rows(workflow.name), str(tmp_path / "export.csv"), workflow.name)
+    with open(tmp_path / "export.csv", newline="") as f:
+        header = next(csv.reader(f))
+    assert set(workflow.columns) <= set(header)
+
+
+@pytest.mark.parametrize("workflow", WORKFLOWS, ids=lambda w: w.name)
+def test_http_result_has_the_browser_result_fields(workflow, tmp_path, monkeypatch):
+    monkeypatch.setattr(http_export, "get_session_cookies", lambda username, password: [])
+    monkeypatch.setattr(http_export, "fetch_rows", lambda tool, query, cookies, max_rank: api_rows(tool))
+    extra = workflow.result(Context("garlic press", 50, str(tmp_path)))
+
+    first = http_export.export_via_http(workflow.name, "garlic press", "u", "p", str(tmp_path), 50, dict(extra))
+    second = http_export.export_via_http(workflow.name, "garlic press", "u", "p", str(tmp_path), 50, dict(extra))
+
+    assert first["file_path"] != second["file_path"]
+    assert first["message"] == extra["message"]
+    for key in set(extra) - {"message"}:
+        assert first[key] == extra[key]
+    assert {"status", "file_path", "file_name", "file_size", "timestamp"} <= set(first)
+
+
+def test_unmapped_fields_get_title_cased_headers():
+    assert http_export.column_title("product_search", "monthlyRevenue") == "Monthly Revenue"
+    assert http_export.column_title("product_search", "parent_asin") == "Parent ASIN"
@@ -0,0 +1,15 @@
+"""A job sees how many browsers admission granted it, which batches size themselves by."""
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapers.admission import AdmissionController
+from scrapers.jobs import JobManager, granted_slots
+
+
+def test_job_sees_its_granted_slots():
+    admission = AdmissionController(8, site_limits={"smartscout": 2}, remote_sites=("smartscout",))
+    manager = JobManager(ThreadPoolExecutor(max_workers=2), max_workers=2, admission=admission)
+
+    job = manager.submit("smartscout/rank-maker/batch", granted_slots, cost=5)
+
+    assert job.future.result(timeout=5) == 2
+    assert granted_slots() is None
@@ -0,0 +1,63 @@
+"""One slow tool page must not disable its direct URL for good."""
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import TimeoutException
+
+from scrapers.smartscout import routes
+
+
+class Driver:
+    def __init__(self):
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+
+class Waiter:
+    def __init__(self, timeouts):
+        self.timeouts = timeouts  # how many of the next deep-link waits time out
+
+    def visible(self, locator, timeout=None, label=None):
+        if self.timeouts:
+            self.timeouts -= 1
+            raise TimeoutException("slow")
+
+    def settle(self, label=None, grid=False):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_failures(monkeypatch):
+    monkeypatch.setattr(routes, "_failures", {})
+    monkeypatch.setattr(routes, "DEEP_LINKS_ENABLED", True)
+    monkeypatch.setattr(routes, "DEEP_LINK_MAX_FAILURES", 2)
+
+
+def open_page(driver, waiter, menu_calls):
+    routes.open_tool_page(driver, waiter, "rank_maker", "Rank Maker", None, lambda d, w: menu_calls.append(1))
+
+
+def test_single_timeout_keeps_deep_links():
+    driver, menu_calls = Driver(), []
+    waiter = Waiter(timeouts=1)
+    open_page(driver, waiter, menu_calls)
+    open_page(driver, waiter, menu_calls)
+    assert len(driver.visited) == 2 and len(menu_calls) == 1
+    assert routes.deep_link_usable("rank_maker")
+
+
+def test_repeated_failures_cool_down_then_retry(monkeypatch):
+    driver, menu_calls = Driver(), []
+    waiter = Waiter(timeouts=2)
+    open_page(driver, waiter, menu_calls)
+    open_page(driver, waiter, menu_calls)
+    open_page(driver, waiter, menu_calls)
+    assert len(driver.visited) == 2 and len(menu_calls) == 3  # third job skipped the URL
+
+    monkeypatch.setattr(routes, "DEEP_LINK_COOLDOWN", 0)
+    open_page(driver, waiter, menu_calls)
+    assert len(driver.visited) == 3 and len(menu_calls) == 3  # retried and it worked
+    assert routes._failures == {}
@@ -0,0 +1,51 @@
+"""Retries reopen the tool page with the job's filters; failed browsers are not reused."""
+import pytest
+
+for module in ("selenium", "urllib3", "prometheus_client"):
+    pytest.importorskip(module)
+
+from scrapers.smartscout import runner
+
+
+class Workflow:
+    name = "rank_maker"
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.opened = []
+
+    def open_page(self, driver, waiter, query=None, max_rank=None, output_path=None):
+        self.opened.append((query, max_rank))
+
+    def export_item(self, driver, waiter, query, output_path, job_dir, max_rank=None):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("export menu never opened")
+        return {"status": "success"}
+
+    def result(self, ctx):
+        return {"message": "done"}
+
+
+@pytest.fixture
+def checkins(monkeypatch, tmp_path):
+    checkins = []
+    monkeypatch.setattr(runner, "try_http_export", lambda *args, **kwargs: None)
+    monkeypatch.setattr(runner, "checkout_driver", lambda *args, **kwargs: object())
+    monkeypatch.setattr(runner, "checkin_driver", lambda driver, discard=False: checkins.append(discard))
+    monkeypatch.setattr(runner, "PageWaiter", lambda driver, timeout: None)
+    monkeypatch.setattr(runner, "create_job_download_dir", lambda *args, **kwargs: str(tmp_path / "job"))
+    return checkins
+
+
+def test_retry_reopens_with_the_same_filters(checkins, tmp_path):
+    workflow = Workflow(failures=1)
+    runner.run_workflow_export(workflow, "B0X", "u", "p", str(tmp_path), max_rank=50, retries=1)
+    assert workflow.opened == [("B0X", 50), ("B0X", 50)]
+    assert checkins == [False]
+
+
+def test_failed_export_discards_the_driver(checkins, tmp_path):
+    with pytest.raises(Exception, match="Scraping failed"):
+        runner.run_workflow_export(Workflow(failures=2), "B0X", "u", "p", str(tmp_path), max_rank=50, retries=1)
+    assert checkins == [True]
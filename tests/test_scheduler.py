@@ -0,0 +1,43 @@
+"""Tenant ids must not expose account names, and weights must still find them."""
+from scrapers.scheduler import FairScheduler, account_tenant, parse_weights
+
+
+class Job:
+    def __init__(self, tenant, cost=1, priority="bulk"):
+        self.tenant, self.cost, self.priority = tenant, cost, priority
+
+
+def test_account_tenant_hides_the_username():
+    tenant = account_tenant("Alice@Example.com ")
+    assert tenant.startswith("user:") and "alice" not in tenant
+    assert tenant == account_tenant("alice@example.com")
+
+
+def test_weights_accept_username_or_hashed_id():
+    hashed = account_tenant("bob@example.com")
+    weights = parse_weights(f"alice@example.com=2,{hashed}=3,key:1a2b3c4d5e6f=4")
+    scheduler = FairScheduler(weights)
+
+    for tenant in (account_tenant("alice@example.com"), hashed, "key:1a2b3c4d5e6f"):
+        scheduler.add(Job(tenant))
+    stats = scheduler.stats()
+    assert stats[account_tenant("alice@example.com")]["weight"] == 2
+    assert stats[hashed]["weight"] == 3
+    assert stats["key:1a2b3c4d5e6f"]["weight"] == 4
+    assert not any("@" in tenant for tenant in stats)
+
+
+def test_rejected_tenants_are_not_kept():
+    scheduler = FairScheduler(max_queued=1)
+    for n in range(100):
+        scheduler.refusal(f"key:{n:012x}")
+    assert scheduler.stats() == {}
+
+
+def test_rate_limited_tenants_are_forgotten_once_idle():
+    scheduler = FairScheduler(rate_per_minute=60, burst=1)
+    assert scheduler.refusal("key:a") is None
+    assert scheduler.refusal("key:a") is not None  # bucket spent: still tracked
+    scheduler._tenants["key:a"].bucket.tokens = 1  # refilled
+    scheduler.refusal("key:b")
+    assert "key:a" not in scheduler.stats()
@@ -0,0 +1,28 @@
+"""A short-lived tracking cookie must not expire a stored SmartScout session."""
+import time
+
+from scrapers.smartscout.sessions import SessionStore
+
+NOW = time.time()
+COOKIES = [
+    {"name": "auth", "value": "t", "httpOnly": True, "expiry": int(NOW + 7 * 86400)},
+    {"name": "_tracker", "value": "x", "httpOnly": False, "expiry": int(NOW + 30)},
+]
+
+
+def test_expiry_ignores_tracking_cookies(tmp_path):
+    store = SessionStore(tmp_path)
+    store.save("me@example.com", COOKIES)
+    assert store.get("me@example.com") == COOKIES
+
+
+def test_expiry_follows_named_auth_cookies(tmp_path):
+    store = SessionStore(tmp_path, auth_cookies=["_tracker"])
+    store.save("me@example.com", COOKIES)
+    assert store.get("me@example.com") is None
+
+
+def test_expired_auth_cookie_ends_the_session(tmp_path):
+    store = SessionStore(tmp_path)
+    store.save("me@example.com", [dict(COOKIES[0], expiry=int(NOW + 10))])
+    assert store.get("me@example.com") is None
@@ -0,0 +1,145 @@
+"""Tabs sharing a browser must keep their own target state and download directory."""
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.webdriver.remote.command import Command
+
+from scrapers.downloads import create_job_download_dir
+from scrapers.tabs import TabMultiplexer
+
+DOWNLOAD = "fakeDownload"  # the fake browser's stand-in for clicking an export button
+
+
+class FakeChrome:
+    """What the multiplexer relies on: window handles, the session's current window,
+    and the CDP commands for browser contexts, cookies and download behavior."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows = {"home": None}  # handle -> browser context id (None = default context)
+        self.current = "home"
+        self.download_dirs = {}        # browser context id -> download path
+        self.cookies = {None: [{"name": "sid", "value": "s3cret", "domain": ".smartscout.com", "path": "/",
+                                "secure": True, "httpOnly": True, "session": True, "expires": -1}]}
+        self.disposed = []
+
+    def execute(self, command, params):
+        with self.lock:
+            if command == Command.SWITCH_TO_WINDOW:
+                self.current = params["handle"]
+            elif command == Command.W3C_GET_WINDOW_HANDLES:
+                return {"value": list(self.windows)}
+            elif command == Command.CLOSE:
+                del self.windows[self.current]
+            elif command == DOWNLOAD:
+                context_id = self.windows[self.current]
+                with open(os.path.join(self.download_dirs[context_id], params["name"]), "w") as f:
+                    f.write("Keyword\n")
+            elif command == "executeCdpCommand":
+                return {"value": self.cdp(params["cmd"], params["params"])}
+            return {"value": None}
+
+    def cdp(self, cmd, params):
+        if cmd == "Target.createBrowserContext":
+            context_id = f"ctx{len(self.cookies)}"
+            self.cookies[context_id] = []
+            return {"browserContextId": context_id}
+        if cmd == "Target.disposeBrowserContext":
+            self.disposed.append(params["browserContextId"])
+        elif cmd == "Target.createTarget":
+            handle = f"tab{len(self.windows)}"
+            self.windows[handle] = params.get("browserContextId")
+            return {"targetId": handle}
+        elif cmd == "Storage.getCookies":
+            return {"cookies": self.cookies[params.get("browserContextId")]}
+        elif cmd == "Storage.setCookies":
+            self.cookies[params.get("browserContextId")] = params["cookies"]
+        elif cmd == "Browser.setDownloadBehavior":
+            self.download_dirs[params.get("browserContextId")] = params["downloadPath"]
+        return {}
+
+
+class FakeDriver:
+    def __init__(self, chrome):
+        self.chrome = chrome
+
+    @property
+    def current_window_handle(self):
+        return self.chrome.current
+
+    def execute(self, command, params=None):
+        return self.chrome.execute(command, params)
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+
+
+class FakePool:
+    size = 1
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.checked_in = []
+
+    def checkout(self, key):
+        return self.driver
+
+    def checkin(self, driver, discard=False):
+        self.checked_in.append((driver, discard))
+
+
+@pytest.fixture
+def chrome():
+    return FakeChrome()
+
+
+@pytest.fixture
+def tabs(chrome):
+    return TabMultiplexer(FakePool(FakeDriver(chrome)), tabs_per_browser=2)
+
+
+def test_concurrent_tabs_download_into_their_own_dirs(tabs, chrome, tmp_path):
+    both_dirs_set = threading.Barrier(2)
+    results, errors = {}, []
+
+    def job(name):
+        try:
+            tab = tabs.checkout("acct")
+            job_dir = create_job_download_dir(str(tmp_path), tab)
+            # The second tab sets its directory before the first one downloads
+            both_dirs_set.wait(timeout=5)
+            tab.execute(DOWNLOAD, {"name": f"{name}.csv"})
+            results[name] = sorted(os.listdir(job_dir))
+            tabs.checkin(tab)
+        except Exception as e:  # surfaced below; a thread's exception would be lost
+            errors.append(e)
+
+    threads = [threading.Thread(target=job, args=(name,)) for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert not errors
+    assert results == {"first": ["first.csv"], "second": ["second.csv"]}
+    assert sorted(chrome.disposed) == ["ctx1", "ctx2"]
+    assert chrome.download_dirs.get(None) is None  # the shared default context was never touched
+    assert tabs.stats()["browsers"] == 0
+
+
+def test_tab_starts_with_the_browser_cookies(tabs, chrome):
+    tab = tabs.checkout("acct")
+    assert [c["name"] for c in chrome.cookies[tab._tab_context]] == ["sid"]
+    assert "expires" not in chrome.cookies[tab._tab_context][0]  # a session cookie stays one
+    tabs.checkin(tab)
+
+
+def test_tab_does_not_inherit_the_home_window_request_hook(tabs):
+    tabs.pool.driver._pending_hook_installed = True
+    tab = tabs.checkout("acct")
+    assert not getattr(tab, "_pending_hook_installed", False)
+    tabs.checkin(tab)
@@ -0,0 +1,46 @@
+"""Finished tasks must not keep their (credential-bearing) arguments around."""
+import time
+
+from scrapers.artifacts import FileArtifactStore
+from scrapers.taskqueue import SQLiteQueue
+
+
+def test_finished_task_drops_its_arguments(tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "queue.db"))
+    done = queue.enqueue("smartscout/rank-maker", ["B0X", "me@example.com", "hunter2"], {})
+    failed = queue.enqueue("smartscout/rank-maker", ["B0Y", "me@example.com", "hunter2"], {})
+    queue.claim("w1")
+    queue.claim("w1")
+    assert queue.complete(done, "w1", {"file_name": "x.csv"})
+    assert queue.fail(failed, "w1", "boom")
+
+    for task_id in (done, failed):
+        task = queue.get(task_id)
+        assert task["args"] == [] and task["kwargs"] == {}
+    assert b"hunter2" not in (tmp_path / "queue.db").read_bytes()
+
+
+def test_purge_deletes_finished_tasks(tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "queue.db"))
+    task_id = queue.enqueue("smartscout/rank-maker", [], {})
+    queue.claim("w1")
+    queue.add_step(task_id, "started")
+    queue.complete(task_id, "w1", {})
+    time.sleep(0.01)
+
+    assert queue.purge(0) == 1
+    assert queue.get(task_id) is None
+    assert queue.steps(task_id) == []
+
+
+def test_fetch_keeps_same_named_artifacts_apart(tmp_path):
+    store = FileArtifactStore(str(tmp_path / "store"))
+    for task_id in ("task1", "task2"):
+        source = tmp_path / "export.csv"
+        source.write_text(task_id)
+        store.put(str(source), f"{task_id}/export.csv")
+
+    first = store.fetch("task1/export.csv", str(tmp_path / "downloads"))
+    second = store.fetch("task2/export.csv", str(tmp_path / "downloads"))
+    assert first != second
+    assert open(first).read() == "task1" and open(second).read() == "task2"
@@ -0,0 +1,61 @@
+"""Waiting for an element must not hold a shared browser's lock."""
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from scrapers.workflow import Click, Context, Export
+
+
+def lock_is_free(lock) -> bool:
+    """Whether another tab's thread could take ``lock`` right now."""
+    free = []
+
+    def probe():
+        if lock.acquire(blocking=False):
+            lock.release()
+            free.append(True)
+
+    thread = threading.Thread(target=probe)
+    thread.start()
+    thread.join()
+    return bool(free)
+
+
+class Element:
+    def __init__(self, lock, clicks):
+        self.lock, self.clicks = lock, clicks
+
+    def click(self):
+        self.clicks.append(lock_is_free(self.lock))
+
+
+class Waiter:
+    def __init__(self, lock):
+        self.lock = lock
+        self.waits = []
+        self.clicks = []
+
+    def clickable(self, locator, label=None):
+        self.waits.append(lock_is_free(self.lock))
+        return Element(self.lock, self.clicks)
+
+    def is_visible(self, locator):
+        return False
+
+
+class Tab:
+    def __init__(self, lock):
+        self.exclusive = lock
+
+
+def test_export_waits_without_the_browser_lock():
+    lock = threading.RLock()
+    waiter = Waiter(lock)
+    export = Export(Click(("id", "export")), Click(("id", "csv")))
+
+    export.execute(Tab(lock), waiter, Context("q"))
+
+    assert waiter.waits == [True, True]    # other tabs could act while menus loaded
+    assert waiter.clicks == [False, False]  # but not during the clicks themselves
@@ -0,0 +1,58 @@
+"""
+Browser worker: pulls SmartScout tasks from the task queue and runs them.
+
+Start the API with JOB_BACKEND=queue, then any number of workers on any node that
+can reach the same TASK_QUEUE_URL and ARTIFACT_STORE_URL:
+
+    python worker.py --concurrency 3
+    python worker.py --only smartscout/batch
+"""
+import argparse
+import os
+import signal
+
+from dotenv import load_dotenv
+
+# Load environment variables before the scrapers read their settings
+load_dotenv()
+
+from scrapers.tasks import TASKS
+from scrapers.taskqueue import Worker, open_queue
+from scrapers.artifacts import open_artifact_store
+from scrapers.chromedriver import resolve_chromedriver_path
+from scrapers.smartscout.auth import SMARTSCOUT_POOL, max_parallel_jobs
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scraper tasks from the durable task queue")
+    parser.add_argument(
+        "--concurrency", type=int,
+        default=int(os.getenv("WORKER_CONCURRENCY", "0")) or None,
+        help="tasks run at once (default: what CPU/RAM, SMARTSCOUT_POOL_SIZE and SMARTSCOUT_TABS_PER_BROWSER allow)",
+    )
+    parser.add_argument("--only", action="append", help="only claim tasks whose name starts with this prefix")
+    args = parser.parse_args()
+
+    queue = open_queue(os.getenv("TASK_QUEUE_URL", f"sqlite:///{PROJECT_DIR}/data/task_queue.db"))
+    artifacts = open_artifact_store(os.getenv("ARTIFACT_STORE_URL", f"file://{PROJECT_DIR}/data/artifacts"))
+    concurrency = args.concurrency or max_parallel_jobs()
+
+    try:
+        resolve_chromedriver_path()
+    except Exception as e:
+        print(f"⚠️ Could not resolve chromedriver at startup (will retry on first use): {e}")
+
+    worker = Worker(queue, artifacts, TASKS, concurrency=concurrency, prefixes=args.only)
+    # Finish running tasks on SIGTERM/Ctrl+C instead of abandoning their leases
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    try:
+        worker.run_forever()
+    finally:
+        SMARTSCOUT_POOL.close()
+
+
+if __name__ == "__main__":
+    main()